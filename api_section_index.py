@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Byte-offset Section Index for API_VERIFICATION_LOG.md and All_API_Methods.md
+Builds a sidecar index in one pass that maps each endpoint key ("METHOD /path")
+to the byte offsets of its section and status line, so tools can read or patch
+a single section through mmap instead of re-scanning the whole document.
+"""
+
+from bisect import bisect_left, bisect_right
+import hashlib
+import json
+import mmap
+import os
+import re
+
+from pipeline_metrics import add_metrics_arguments, cache, count, metrics_session
+
+INDEX_SUFFIX = '.index.json'
+INDEX_VERSION = 1
+
+LOG_HEADER_RE = re.compile(rb'^### ([A-Z]+) (/\S*)')
+DOCS_METHOD_RE = re.compile(rb'^\*\*Method:\*\* `([A-Z]+)`')
+DOCS_ENDPOINT_RE = re.compile(rb'^\*\*Endpoint:\*\* `([^`]*)`')
+PATH_PARAM_RE = re.compile(r'\{(\w+)\}')
+STATUS_PREFIX = b'**Status:**'
+
+
+def endpoint_key(method, path):
+    """Build the index key for an endpoint, e.g. 'POST /auth/login'"""
+    return f"{method.upper()} {normalize_path(path)}"
+
+
+def normalize_path(path):
+    """Normalize a raw or templated URL to the ':param' path form used in the log"""
+    path = path.replace('{{base_url}}', '').replace('BASE_URL', '')
+    path = path.split('?', 1)[0]
+    path = PATH_PARAM_RE.sub(r':\1', path)
+    if not path.startswith('/'):
+        path = '/' + path
+    return path
+
+
+def index_path_for(doc_path):
+    """Return the sidecar index path for a document"""
+    return doc_path + INDEX_SUFFIX
+
+
+def file_sha256(path):
+    """Hash a file in chunks without loading it whole"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def detect_kind(path):
+    """Guess whether a document is the verification log or the generated docs"""
+    return 'docs' if os.path.basename(path) == 'All_API_Methods.md' else 'log'
+
+
+def scan_sections(data, kind='log'):
+    """
+    Scan document bytes once and return {key: [start, end, status_start, status_end]}.
+    Status offsets are None for documents without **Status:** lines.
+    """
+    sections = {}
+    duplicates = []
+    current = None  # [key, start, status_start, status_end]
+    pending_docs = None  # [start, method] for a docs section awaiting its Endpoint line
+
+    def close(end):
+        nonlocal current
+        if current is None:
+            return
+        key, start, status_start, status_end = current
+        if key in sections:
+            duplicates.append(key)
+        else:
+            sections[key] = [start, end, status_start, status_end]
+        current = None
+
+    offset = 0
+    size = len(data)
+    while offset < size:
+        newline = data.find(b'\n', offset)
+        line_end = size if newline == -1 else newline
+        next_offset = line_end + 1
+        line = data[offset:line_end]
+
+        if line.startswith(b'## ') or line.startswith(b'### '):
+            close(offset)
+            pending_docs = None
+            if kind == 'log':
+                match = LOG_HEADER_RE.match(line)
+                if match:
+                    key = endpoint_key(match.group(1).decode(), match.group(2).decode())
+                    current = [key, offset, None, None]
+            elif line.startswith(b'### '):
+                pending_docs = [offset, None]
+        elif kind == 'docs' and (line.startswith(b'- [ ] ') or line == b'---'):
+            # Checklist entries and rules belong to the next section, not this one
+            close(offset)
+            pending_docs = None
+        elif current is not None and current[2] is None and line.startswith(STATUS_PREFIX):
+            current[2] = offset
+            current[3] = line_end
+        elif pending_docs is not None:
+            match = DOCS_METHOD_RE.match(line)
+            if match:
+                pending_docs[1] = match.group(1).decode()
+            else:
+                match = DOCS_ENDPOINT_RE.match(line)
+                if match and pending_docs[1]:
+                    key = endpoint_key(pending_docs[1], match.group(1).decode())
+                    current = [key, pending_docs[0], None, None]
+                    pending_docs = None
+        offset = next_offset
+
+    close(size)
+    return sections, duplicates
+
+
+def build_section_index(doc_path, kind=None):
+    """Build the section index for a document and write the sidecar file"""
+    kind = kind or detect_kind(doc_path)
+    with open(doc_path, 'rb') as f:
+        data = f.read()
+    count('bytes_read', len(data))
+    stat = os.stat(doc_path)
+    sections, duplicates = scan_sections(data, kind)
+    index = {
+        'version': INDEX_VERSION,
+        'source': os.path.basename(doc_path),
+        'kind': kind,
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sections': sections,
+        'duplicates': duplicates,
+    }
+    save_section_index(doc_path, index)
+    return index
+
+
+def save_section_index(doc_path, index):
+    """Write the sidecar index next to the document"""
+    with open(index_path_for(doc_path), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+
+
+def load_section_index(doc_path, kind=None):
+    """
+    Load the sidecar index, rebuilding it when the document hash no longer matches.
+    Size and mtime are checked first so an untouched document is not re-hashed.
+    """
+    sidecar = index_path_for(doc_path)
+    index = None
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except ValueError:
+            index = None
+
+    if index is None or index.get('version') != INDEX_VERSION:
+        cache('section_index', False)
+        return build_section_index(doc_path, kind)
+
+    stat = os.stat(doc_path)
+    if stat.st_size == index['size'] and stat.st_mtime_ns == index['mtime_ns']:
+        cache('section_index', True)
+        return index
+    if stat.st_size == index['size'] and file_sha256(doc_path) == index['sha256']:
+        cache('section_index', True)
+        index['mtime_ns'] = stat.st_mtime_ns
+        save_section_index(doc_path, index)
+        return index
+    cache('section_index', False)
+    return build_section_index(doc_path, kind)
+
+
+def read_section(doc_path, key, index=None):
+    """Read a single endpoint section through mmap; returns None if the key is unknown"""
+    index = index or load_section_index(doc_path)
+    entry = index['sections'].get(key)
+    if entry is None:
+        return None
+    with open(doc_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[entry[0]:entry[1]].decode('utf-8')
+
+
+def read_status(doc_path, key, index=None):
+    """Read the **Status:** line of an endpoint section"""
+    index = index or load_section_index(doc_path)
+    entry = index['sections'].get(key)
+    if entry is None or entry[2] is None:
+        return None
+    with open(doc_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[entry[2]:entry[3]].decode('utf-8')
+
+
+def splice(data, edits):
+    """
+    Apply sorted, non-overlapping (start, end, replacement) edits in one pass.
+    Returns (new bytes, shift), where shift(offset, inclusive=False) maps an
+    offset outside the edited ranges to its position in the new bytes; with
+    inclusive, an offset equal to an edit's end moves as well.
+    """
+    parts = []
+    cursor = 0
+    bounds = []
+    deltas = []
+    delta = 0
+    for start, end, replacement in edits:
+        parts.append(data[cursor:start])
+        parts.append(replacement)
+        cursor = end
+        delta += len(replacement) - (end - start)
+        bounds.append(end)
+        deltas.append(delta)
+    parts.append(data[cursor:])
+
+    def shift(offset, inclusive=False):
+        # Offsets past an edit move by the delta accumulated up to it
+        count_before = bisect_right(bounds, offset) if inclusive else bisect_left(bounds, offset)
+        return offset + (deltas[count_before - 1] if count_before else 0)
+
+    return b''.join(parts), shift
+
+
+def splice_statuses(data, index, patches):
+    """
+    Replace the status lines named in patches ({key: replacement text}) in one pass.
+    Returns (new bytes, shifted sections, keys patched). Patches whose replacement
+    text is already present in the section are skipped so reruns are idempotent.
+    """
+    sections = index['sections']
+    edits = []
+    for key, text in patches.items():
+        entry = sections.get(key)
+        if entry is None or entry[2] is None:
+            continue
+        replacement = text.encode('utf-8')
+        if data.find(replacement, entry[0], entry[1]) != -1:
+            continue
+        edits.append((entry[2], entry[3], replacement, key))
+    edits.sort()
+    new_data, shift = splice(data, [(start, end, replacement) for start, end, replacement, _ in edits])
+
+    patched = {key for _, _, _, key in edits}
+    # A multi-line replacement only keeps its first line as the indexed status line
+    replaced = {key: len(replacement.split(b'\n', 1)[0]) for _, _, replacement, key in edits}
+
+    new_sections = {}
+    for key, (start, end, status_start, status_end) in sections.items():
+        new_start = shift(start)
+        new_end = shift(end, inclusive=True)
+        if status_start is None:
+            new_sections[key] = [new_start, new_end, None, None]
+            continue
+        new_status_start = shift(status_start)
+        if key in patched:
+            new_status_end = new_status_start + replaced[key]
+        else:
+            new_status_end = shift(status_end)
+        new_sections[key] = [new_start, new_end, new_status_start, new_status_end]
+
+    return new_data, new_sections, sorted(patched)
+
+
+def patch_statuses(doc_path, patches, kind=None):
+    """Patch several status lines of a document and keep its sidecar index current"""
+    index = load_section_index(doc_path, kind)
+    with open(doc_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            new_data, new_sections, patched = splice_statuses(mm, index, patches)
+
+    if not patched:
+        return patched
+
+    with open(doc_path, 'wb') as f:
+        f.write(new_data)
+    count('bytes_written', len(new_data))
+    stat = os.stat(doc_path)
+    index.update({
+        'sha256': hashlib.sha256(new_data).hexdigest(),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sections': new_sections,
+    })
+    save_section_index(doc_path, index)
+    return patched
+
+
+def replace_sections(doc_path, replacements, kind=None, finalize=None):
+    """
+    Replace whole endpoint sections ({key: new section text}) in one pass and keep
+    the sidecar index current. Offsets of untouched sections are shifted; only the
+    replaced sections are rescanned. finalize(bytes) -> bytes may then rewrite text
+    after the last section, such as a summary footer.
+    """
+    kind = kind or detect_kind(doc_path)
+    index = load_section_index(doc_path, kind)
+    sections = index['sections']
+    edits = sorted(
+        (sections[key][0], sections[key][1], text.encode('utf-8'), key)
+        for key, text in replacements.items() if key in sections
+    )
+    if not edits:
+        return []
+
+    with open(doc_path, 'rb') as f:
+        data = f.read()
+    count('bytes_read', len(data))
+
+    new_data, shift = splice(data, [(start, end, replacement) for start, end, replacement, _ in edits])
+
+    new_sections = {}
+    replaced = {key: (start, replacement) for start, _, replacement, key in edits}
+    for key, entry in sections.items():
+        if key in replaced:
+            start, replacement = replaced[key]
+            new_start = shift(start, inclusive=True)
+            scanned, _ = scan_sections(replacement, kind)
+            rel = scanned.get(key) or [0, len(replacement), None, None]
+            new_sections[key] = [new_start, new_start + len(replacement),
+                                 None if rel[2] is None else new_start + rel[2],
+                                 None if rel[3] is None else new_start + rel[3]]
+        else:
+            new_sections[key] = [None if value is None else shift(value, inclusive=True) for value in entry]
+
+    if finalize is not None:
+        last_end = max((entry[1] for entry in new_sections.values()), default=0)
+        finalized = finalize(new_data)
+        if finalized[:last_end] != new_data[:last_end]:
+            raise ValueError(f"finalize may only change text after the last section of {doc_path}")
+        new_data = finalized
+
+    with open(doc_path, 'wb') as f:
+        f.write(new_data)
+    count('bytes_written', len(new_data))
+    stat = os.stat(doc_path)
+    index.update({
+        'sha256': hashlib.sha256(new_data).hexdigest(),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sections': new_sections,
+    })
+    save_section_index(doc_path, index)
+    return [key for _, _, _, key in edits]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build byte-offset section indexes')
+    parser.add_argument('paths', nargs='*', default=['API_VERIFICATION_LOG.md', 'All_API_Methods.md'])
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    with metrics_session(args.metrics, args.profile):
+        for doc_path in args.paths:
+            if not os.path.exists(doc_path):
+                print(f"Error: Document not found at {doc_path}")
+                exit(1)
+            index = build_section_index(doc_path)
+            print(f"Indexed {len(index['sections'])} sections in {doc_path}")
+            if index['duplicates']:
+                print(f"Duplicate endpoint keys (first occurrence indexed): {len(index['duplicates'])}")
+            print(f"Index file: {index_path_for(doc_path)}")
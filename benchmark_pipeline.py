@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Synthetic-scale Benchmarks for the API Artifact Pipeline
+Generates Postman collections with 300 to 300k endpoints and realistic nested
+response bodies, times every pipeline stage (wall and CPU) and records peak
+memory, then writes the results as JSON so runs can be compared across commits.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from api_section_index import build_section_index, endpoint_key, patch_statuses
+from generate_api_documentation import analyze_data_structure, document_endpoint, generate_markdown_documentation
+from generate_postman_collection import create_endpoint_item
+from generate_verification_log import extract_endpoints_from_postman, generate_verification_log
+from update_auth_status import update_auth_status_in_log
+from update_webhook_status import update_webhook_status_in_log
+
+DEFAULT_SIZES = [300, 3000, 30000, 300000]
+DEFAULT_OUTPUT = 'bench_results.json'
+
+CATEGORIES = [
+    'Authentication', 'Profile', 'Matching', 'Likes', 'Chat', 'Group Chat', 'Notifications',
+    'Stories', 'Feeds', 'Payments', 'Subscriptions', 'Superlikes', 'Reference Data', 'Safety',
+    'Verification', 'Calls', 'Community Forum', 'Gamification', 'Analytics', 'Settings',
+]
+RESOURCES = ['users', 'profiles', 'matches', 'messages', 'groups', 'stories', 'feeds', 'plans', 'reports', 'badges']
+ACTIONS = ['list', 'show', 'create', 'update', 'delete', 'history', 'send-message', 'like', 'settings', 'stats']
+METHODS = {'list': 'GET', 'show': 'GET', 'history': 'GET', 'stats': 'GET', 'settings': 'PUT',
+           'create': 'POST', 'send-message': 'POST', 'like': 'POST', 'update': 'PATCH', 'delete': 'DELETE'}
+
+# Endpoints the status updaters look for, so they have real work at every size
+FIXED_ENDPOINTS = [
+    ('Authentication', 'Register', 'POST', '/auth/register'),
+    ('Authentication', 'Login', 'POST', '/auth/login'),
+    ('Authentication', 'Login with Password', 'POST', '/auth/login-password'),
+    ('Authentication', 'Logout', 'POST', '/auth/logout'),
+    ('Authentication', 'Delete Account', 'DELETE', '/auth/delete-account'),
+    ('Webhooks (Public - No Auth)', 'Stripe Webhook', 'POST', '/stripe/webhook'),
+    ('Webhooks (Public - No Auth)', 'PayPal Webhook', 'POST', '/paypal/webhook'),
+]
+
+
+def synthetic_user(rng, user_id):
+    """A user object shaped like the API's profile payloads"""
+    return {
+        'id': user_id,
+        'first_name': rng.choice(['Alex', 'Sam', 'Jordan', 'Taylor', 'Robin', 'Kai']),
+        'email': f'user{user_id}@example.com',
+        'birth_date': f'199{rng.randint(0, 9)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}',
+        'profile_bio': 'Love traveling and music!',
+        'gender': {'id': rng.randint(1, 6), 'title': 'Non-binary'},
+        'interests': [{'id': i, 'title': f'Interest {i}'} for i in rng.sample(range(1, 40), 3)],
+        'images': [{'id': i, 'url': f'https://cdn.example.com/u/{user_id}/{i}.jpg', 'is_primary': i == 0}
+                   for i in range(2)],
+        'location': {'city': 'Berlin', 'country': 'Germany', 'lat': 52.52, 'lng': 13.405},
+    }
+
+
+def synthetic_responses(rng, method, index):
+    """Recorded response examples: a success body plus the shared error bodies"""
+    if method == 'GET':
+        data = {'items': [synthetic_user(rng, index * 10 + i) for i in range(3)],
+                'current_page': 1, 'per_page': 15, 'total': 3, 'last_page': 1}
+    else:
+        data = {'user': synthetic_user(rng, index), 'created_at': '2024-01-01T12:00:00Z'}
+    responses = [
+        {'name': 'Success', 'status': 'OK', 'code': 200,
+         'body': json.dumps({'status': True, 'message': 'Operation successful', 'data': data}, indent=2)},
+        {'name': 'Unauthenticated', 'status': 'Unauthorized', 'code': 401,
+         'body': json.dumps({'message': 'Unauthenticated'}, indent=2)},
+    ]
+    if method != 'GET':
+        responses.append({'name': 'Validation Error', 'status': 'Unprocessable Entity', 'code': 422,
+                          'body': json.dumps({'status': False, 'message': 'Validation error',
+                                              'errors': {'email': ['The email field is required.']}}, indent=2)})
+    return responses
+
+
+def synthetic_registry(size, seed=0):
+    """Endpoint tuples grouped by category, in the registry format of generate_postman_collection.py"""
+    rng = random.Random(seed)
+    registry = {}
+    for category, name, method, path in FIXED_ENDPOINTS:
+        registry.setdefault(category, []).append((name, method, path, name, None, not category.startswith('Webhooks')))
+    for i in range(size - len(FIXED_ENDPOINTS)):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        resource = RESOURCES[(i // len(CATEGORIES)) % len(RESOURCES)]
+        action = ACTIONS[i % len(ACTIONS)]
+        method = METHODS[action]
+        path = f"/{category.lower().replace(' ', '-')}/{resource}/{i}/{action}"
+        if action in ('show', 'update', 'delete'):
+            path += '/{id}'
+        body = None
+        if method in ('POST', 'PUT', 'PATCH'):
+            body = {'user_id': rng.randint(1, 10 ** 6), 'message': 'Hello!', 'tags': ['a', 'b']}
+        registry.setdefault(category, []).append(
+            (f"{action.title()} {resource} {i}", method, path, f"{action} {resource}", body, True))
+    return registry
+
+
+def build_collection(registry, seed=0, response_ratio=0.3):
+    """Turn a registry into a Postman collection, attaching responses to a share of endpoints"""
+    rng = random.Random(seed)
+    collection = {
+        'info': {'name': 'Synthetic LGBTinder API', 'schema': 'https://schema.getpostman.com/json/collection/v2.1.0/collection.json'},
+        'item': [],
+    }
+    index = 0
+    for category, endpoints in registry.items():
+        folder = {'name': category, 'item': []}
+        for name, method, path, description, body, requires_auth in endpoints:
+            item = create_endpoint_item(name, method, path, description, body, requires_auth)
+            if rng.random() < response_ratio:
+                item['response'] = synthetic_responses(rng, method, index)
+            folder['item'].append(item)
+            index += 1
+        collection['item'].append(folder)
+    return collection
+
+
+def all_items(collection):
+    """Flatten the collection into (category, item) pairs"""
+    for folder in collection['item']:
+        for item in folder['item']:
+            yield folder['name'], item
+
+
+def legacy_status_patch(content, keys, status):
+    """The pre-index status update: a content.find scan and full string rebuild per endpoint"""
+    for key in keys:
+        section_start = content.find(f'### {key}')
+        if section_start != -1:
+            status_start = content.find('**Status:**', section_start)
+            if status_start != -1:
+                status_end = content.find('\n', status_start)
+                content = content[:status_start] + status + content[status_end:]
+    return content
+
+
+def measure(func, memory=True):
+    """Time func() with wall and CPU clocks, then rerun under tracemalloc for peak memory"""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        func()
+        result = {'wall_s': time.perf_counter() - wall_start, 'cpu_s': time.process_time() - cpu_start}
+        if memory:
+            tracemalloc.start()
+            try:
+                func()
+                result['peak_mem_bytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result
+
+
+def benchmark_size(size, workdir, seed=0, memory=True, skip=()):
+    """Run every stage at one collection size; returns {stage: measurement}"""
+    results = {}
+    registry = synthetic_registry(size, seed)
+    collection_path = os.path.join(workdir, f'collection_{size}.json')
+    docs_path = os.path.join(workdir, f'docs_{size}.md')
+    log_path = os.path.join(workdir, f'log_{size}.md')
+    scratch_log = os.path.join(workdir, f'log_{size}_scratch.md')
+    state = {}
+
+    def stage(name, func, setup=None):
+        if name in skip:
+            results[name] = {'skipped': True}
+            return
+        if setup:
+            setup()
+        results[name] = measure(func, memory)
+
+    def create_items():
+        state['collection'] = build_collection(registry, seed)
+
+    stage('create_endpoint_item', create_items)
+    if 'collection' not in state:
+        create_items()
+    collection = state['collection']
+    with open(collection_path, 'w', encoding='utf-8') as f:
+        json.dump(collection, f, indent=2, ensure_ascii=False)
+    results['_collection_bytes'] = os.path.getsize(collection_path)
+
+    def extract():
+        state['endpoints'] = extract_endpoints_from_postman(collection_path)
+
+    stage('extract_endpoints_from_postman', extract)
+    if 'endpoints' not in state:
+        extract()
+
+    bodies = [json.loads(response['body']) for _, item in all_items(collection) for response in item['response']]
+    stage('analyze_data_structure', lambda: [analyze_data_structure(body) for body in bodies])
+    stage('document_endpoint', lambda: [document_endpoint(item, category) for category, item in all_items(collection)])
+    stage('generate_markdown_documentation', lambda: generate_markdown_documentation(collection_path, docs_path))
+    stage('generate_verification_log', lambda: generate_verification_log(state['endpoints'], log_path))
+    if not os.path.exists(log_path):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_verification_log(state['endpoints'], log_path)
+    results['_log_bytes'] = os.path.getsize(log_path)
+
+    def fresh_log():
+        shutil.copyfile(log_path, scratch_log)
+
+    stage('build_section_index', lambda: build_section_index(log_path), fresh_log)
+
+    # Patch one endpoint in ten: O(endpoints x log size) with find, one pass with the index
+    keys = [endpoint_key(e['method'], e['path']) for e in state['endpoints'][::10]]
+    status = '**Status:** ✅ Verified'
+    with open(log_path, 'r', encoding='utf-8') as f:
+        log_content = f.read()
+    stage('status_patch_legacy_find', lambda: legacy_status_patch(log_content, keys, status))
+
+    def indexed_patch():
+        fresh_log()
+        patch_statuses(scratch_log, {key: status for key in keys}, kind='log')
+
+    stage('status_patch_indexed', indexed_patch)
+
+    def auth_update():
+        fresh_log()
+        update_auth_status_in_log(scratch_log)
+
+    def webhook_update():
+        fresh_log()
+        update_webhook_status_in_log(scratch_log)
+
+    stage('update_auth_status', auth_update)
+    stage('update_webhook_status', webhook_update)
+    return results
+
+
+def scaling_exponents(runs):
+    """Estimate k in time ~ n^k between consecutive sizes; k well above 1 is superlinear"""
+    sizes = sorted(runs, key=int)
+    exponents = {}
+    for smaller, larger in zip(sizes, sizes[1:]):
+        for name, small in runs[smaller].items():
+            large = runs[larger].get(name)
+            if name.startswith('_') or not large or 'wall_s' not in small or 'wall_s' not in large:
+                continue
+            if small['wall_s'] <= 0 or large['wall_s'] <= 0:
+                continue
+            k = math.log(large['wall_s'] / small['wall_s']) / math.log(int(larger) / int(smaller))
+            exponents.setdefault(name, {})[f'{smaller}->{larger}'] = round(k, 2)
+    return exponents
+
+
+def git_revision():
+    """Current commit, so results files can be matched to the tree they measured"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(previous, current):
+    """Print wall-time ratios current/previous per size and stage"""
+    for size, stages in current['runs'].items():
+        old_stages = previous.get('runs', {}).get(size, {})
+        for name, result in stages.items():
+            old = old_stages.get(name)
+            if name.startswith('_') or not old or 'wall_s' not in result or 'wall_s' not in old:
+                continue
+            ratio = result['wall_s'] / old['wall_s'] if old['wall_s'] else float('inf')
+            print(f"{size:>7} {name:<34} {old['wall_s']:9.3f}s -> {result['wall_s']:9.3f}s  x{ratio:.2f}")
+
+
+def projected_wall(points, size):
+    """
+    Extrapolate a stage's wall time to size from its measured growth, assuming at
+    least linear scaling, so superlinear stages are dropped before they stall a run.
+    """
+    last_size, last_wall = points[-1]
+    exponent = 1.0
+    if len(points) >= 2:
+        prev_size, prev_wall = points[-2]
+        if prev_wall > 0 and last_wall > 0 and last_size != prev_size:
+            exponent = max(1.0, math.log(last_wall / prev_wall) / math.log(last_size / prev_size))
+    return last_wall * (size / last_size) ** exponent
+
+
+def run_benchmarks(sizes, output_path, seed=0, memory=True, stage_budget=30.0):
+    """Run every size, skipping a stage once its projected time exceeds the per-stage budget"""
+    report = {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'memory_tracked': memory,
+        'runs': {},
+    }
+    history = {}  # stage -> [(size, wall_s), ...]
+    with tempfile.TemporaryDirectory(prefix='lgbtinder_bench_') as workdir:
+        for size in sizes:
+            skip = {name for name, points in history.items()
+                    if projected_wall(points, size) > stage_budget}
+            print(f"Benchmarking {size} endpoints...")
+            results = benchmark_size(size, workdir, seed, memory, skip=skip)
+            report['runs'][str(size)] = results
+            for name, result in results.items():
+                if name.startswith('_'):
+                    continue
+                if 'wall_s' not in result:
+                    print(f"  {name:<34} skipped (projected over {stage_budget:.0f}s budget)")
+                    continue
+                peak = result.get('peak_mem_bytes')
+                peak_text = f"  peak {peak / 1e6:8.1f} MB" if peak is not None else ''
+                print(f"  {name:<34} {result['wall_s']:9.3f}s wall {result['cpu_s']:9.3f}s cpu{peak_text}")
+                history.setdefault(name, []).append((size, result['wall_s']))
+            for name in os.listdir(workdir):
+                os.unlink(os.path.join(workdir, name))
+
+    report['scaling_exponents'] = scaling_exponents(report['runs'])
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark each API pipeline stage on synthetic collections')
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=DEFAULT_SIZES,
+                        help='comma-separated endpoint counts (default: 300,3000,30000,300000)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--stage-budget', type=float, default=20.0,
+                        help='skip a stage at sizes where its projected wall time exceeds this many seconds')
+    parser.add_argument('--compare', metavar='RESULTS_JSON', help='print ratios against an earlier run')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.output, args.seed, not args.no_memory, args.stage_budget)
+    for name, exponents in sorted(report['scaling_exponents'].items()):
+        worst = max(exponents.values())
+        flag = '  <- superlinear' if worst > 1.3 else ''
+        print(f"{name:<34} n^{worst:.2f}{flag}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(json.load(f), report)
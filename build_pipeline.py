@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Content-hash Build Pipeline for the API Artifacts
+Knows the registry -> Postman collection -> docs / verification log -> status
+update chain, records input and output content hashes per stage, skips stages
+that are up to date and runs independent stages in parallel processes.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from lgbtinder_api import DEFAULT_COLLECTION, DEFAULT_DOCS, DEFAULT_LOG
+from pipeline_metrics import cache, count
+
+STATE_FILE = '.pipeline_state.json'
+STATE_VERSION = 1
+
+
+def pipeline_stages(collection=DEFAULT_COLLECTION, docs=DEFAULT_DOCS, log=DEFAULT_LOG):
+    """
+    Describe the build graph. Each stage lists its dependencies, the files whose
+    content decides whether it must rerun, the files it writes and the CLI argv
+    that builds it. The status stage edits the log in place, so the log is both
+    its input and its output.
+    """
+    return {
+        'collection': {
+            'deps': [],
+            'inputs': ['generate_postman_collection.py'],
+            'outputs': [collection],
+            'argv': ['collection', '-o', collection],
+        },
+        'docs': {
+            'deps': ['collection'],
+            'inputs': [collection, 'generate_api_documentation.py'],
+            'outputs': [docs],
+            'argv': ['docs', '-c', collection, '-o', docs],
+        },
+        'verify-log': {
+            'deps': ['collection'],
+            'inputs': [collection, 'generate_verification_log.py'],
+            'outputs': [log],
+            'argv': ['verify-log', '-c', collection, '-o', log],
+        },
+        'status': {
+            'deps': ['verify-log'],
+            'inputs': [log, 'update_auth_status.py', 'update_webhook_status.py', 'api_section_index.py'],
+            'outputs': [log],
+            'argv': ['status', 'all', '-l', log],
+        },
+    }
+
+
+def load_state(state_path):
+    """Load recorded stage hashes; a missing or stale state file means rebuild all"""
+    if not os.path.exists(state_path):
+        return {'version': STATE_VERSION, 'files': {}, 'stages': {}}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except ValueError:
+        state = {}
+    if state.get('version') != STATE_VERSION:
+        return {'version': STATE_VERSION, 'files': {}, 'stages': {}}
+    return state
+
+
+def save_state(state_path, state):
+    """Write recorded stage hashes"""
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def content_hash(path, file_cache):
+    """
+    Hash a file's content, reusing the cached digest while size and mtime are
+    unchanged so a no-op rebuild does not re-read every artifact.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    cached = file_cache.get(path)
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        cache('content_hash', True)
+        return cached['sha256']
+    cache('content_hash', False)
+    count('bytes_read', stat.st_size)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    file_cache[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return file_cache[path]['sha256']
+
+
+def snapshot(paths, file_cache):
+    """Map each path to its current content hash"""
+    return {path: content_hash(path, file_cache) for path in paths}
+
+
+def is_up_to_date(name, stage, state):
+    """A stage is up to date when its inputs and outputs still hash as recorded"""
+    recorded = state['stages'].get(name)
+    if not recorded:
+        return False
+    files = state['files']
+    if any(content_hash(path, files) is None for path in stage['outputs']):
+        return False
+    return (recorded['inputs'] == snapshot(stage['inputs'], files)
+            and recorded['outputs'] == snapshot(stage['outputs'], files))
+
+
+def run_stage_process(argv):
+    """Run one stage's CLI command in a worker process"""
+    from lgbtinder_api import run
+
+    return run(argv)
+
+
+def run_pipeline(stages, state_path=STATE_FILE, targets=None, force=False, jobs=None, dry_run=False):
+    """
+    Build the requested targets (default: every stage) and their dependencies.
+    Returns {stage: 'skipped' | 'built' | 'failed' | 'blocked' | 'would build'}.
+    """
+    wanted = set()
+
+    def collect(name):
+        if name not in stages:
+            raise KeyError(f"Unknown stage: {name}")
+        if name not in wanted:
+            wanted.add(name)
+            for dep in stages[name]['deps']:
+                collect(dep)
+
+    for name in targets or stages:
+        collect(name)
+
+    state = load_state(state_path)
+    results = {}
+    pending = {name for name in stages if name in wanted}
+    running = {}
+
+    def ready(name):
+        return all(results.get(dep) in ('skipped', 'built', 'would build') for dep in stages[name]['deps'])
+
+    def blocked(name):
+        return any(results.get(dep) in ('failed', 'blocked') for dep in stages[name]['deps'])
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in sorted(pending):
+                stage = stages[name]
+                if blocked(name):
+                    results[name] = 'blocked'
+                    pending.discard(name)
+                elif ready(name):
+                    pending.discard(name)
+                    if dry_run and any(results[dep] == 'would build' for dep in stage['deps']):
+                        results[name] = 'would build'
+                    elif not force and is_up_to_date(name, stage, state):
+                        results[name] = 'skipped'
+                    elif dry_run:
+                        results[name] = 'would build'
+                    else:
+                        # Record inputs before running; in-place stages re-record after
+                        inputs_before = snapshot(stage['inputs'], state['files'])
+                        running[pool.submit(run_stage_process, stage['argv'])] = (name, inputs_before)
+
+            if not running:
+                if pending and not any(ready(name) or blocked(name) for name in pending):
+                    raise RuntimeError(f"Dependency cycle among stages: {sorted(pending)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, inputs_before = running.pop(future)
+                stage = stages[name]
+                try:
+                    code = future.result()
+                except Exception as e:
+                    print(f"[{name}] Error: {e}")
+                    code = 1
+                if code:
+                    results[name] = 'failed'
+                    state['stages'].pop(name, None)
+                    continue
+                outputs = snapshot(stage['outputs'], state['files'])
+                inputs = inputs_before
+                for path in stage['inputs']:
+                    if path in outputs:
+                        # Edited in place: the producing stage's output moves with it
+                        inputs[path] = outputs[path]
+                        for other, recorded in state['stages'].items():
+                            if other != name and path in recorded['outputs']:
+                                recorded['outputs'][path] = outputs[path]
+                state['stages'][name] = {'inputs': inputs, 'outputs': outputs}
+                results[name] = 'built'
+            save_state(state_path, state)
+
+    save_state(state_path, state)
+    return results
+
+
+if __name__ == '__main__':
+    from lgbtinder_api import main
+
+    sys.exit(main(['build'] + sys.argv[1:]))
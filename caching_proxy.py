@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Caching Reverse Proxy Stand-in
+An asyncio reverse proxy placed between the app (or a load harness) and the
+backend or a mock, to measure the hit rate client caching could reach before
+building it. Cache policies come from the registry: only GET endpoints are
+cacheable, TTLs default per category, authenticated responses are cached per
+Authorization header, and a write to a category invalidates its cached GETs.
+Stale entries with an ETag or Last-Modified are revalidated; identical
+in-flight GETs are coalesced so only one reaches the upstream. Entries are
+keyed by Accept as well and honour the response's Vary header.
+
+Upstream connections are kept alive and reused, as the app's HTTP client
+does, so latency saved compares against a warm connection; only the first
+request on each pooled connection includes connect (and TLS) time.
+
+Stats per endpoint (hits, revalidations, coalesced requests, bytes and latency
+saved) are served at /__proxy/stats and written with -o on shutdown.
+"""
+
+import asyncio
+import json
+import ssl
+import time
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from api_section_index import endpoint_key
+from endpoint_router import EndpointRouter
+from lgbtinder_api import DEFAULT_COLLECTION
+
+DEFAULT_LISTEN = '127.0.0.1:8088'
+DEFAULT_TTL_S = 30
+STATS_PATH = '/__proxy/stats'
+MAX_CACHE_BYTES = 256 << 20
+MAX_IDLE_UPSTREAM = 16
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'te', 'trailer', 'upgrade'}
+
+# Default TTLs by registry category; categories not listed use DEFAULT_TTL_S
+CATEGORY_TTL_S = {
+    'Reference Data': 3600,
+    'Locales': 3600,
+    'Plans': 600,
+    'Sub Plans': 600,
+    'Superlike Packs': 600,
+    'Profile Wizard': 300,
+    'Safety': 300,
+    'Profile': 60,
+    'Matching': 30,
+    'Feeds': 15,
+    'Stories': 15,
+    'Chat': 0,
+    'Group Chat': 0,
+    'Calls': 0,
+    'Call Management': 0,
+    'Notifications': 5,
+    'Authentication': 0,
+    'Sessions': 0,
+    '2FA': 0,
+}
+
+
+class CachePolicy:
+    """Cacheability, TTL and invalidation scope of each registry endpoint"""
+
+    def __init__(self, endpoints, overrides=None, default_ttl=DEFAULT_TTL_S):
+        self.rules = {}
+        for endpoint in endpoints:
+            key = endpoint_key(endpoint['method'], endpoint['path'])
+            category = endpoint['category']
+            ttl = CATEGORY_TTL_S.get(category, default_ttl) if endpoint['method'].upper() == 'GET' else 0
+            self.rules[key] = {'category': category, 'ttl': ttl, 'revalidate': True,
+                               'per_user': bool(endpoint.get('auth_required', True))}
+        for key, rule in (overrides or {}).items():
+            self.rules.setdefault(key, {'category': 'Unknown', 'ttl': 0, 'revalidate': True, 'per_user': True})
+            self.rules[key].update(rule)
+
+    def rule(self, key):
+        return self.rules.get(key)
+
+
+class CacheEntry:
+    __slots__ = ('status', 'headers', 'body', 'stored', 'expires', 'etag', 'last_modified', 'upstream_s', 'vary')
+
+    def __init__(self, status, headers, body, ttl, upstream_s, vary=()):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored = time.monotonic()
+        self.expires = self.stored + ttl
+        self.etag = header(headers, 'etag')
+        self.last_modified = header(headers, 'last-modified')
+        self.upstream_s = upstream_s
+        self.vary = vary
+
+    def matches(self, request_headers):
+        """Whether the request headers named by the response's Vary are the ones this entry was stored for"""
+        return all(header(request_headers, name) == value for name, value in self.vary)
+
+
+def header(headers, name):
+    """First value of a header in a [(name, value)] list, case-insensitively"""
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+async def read_message(reader, is_response=False, request_method='GET'):
+    """Read an HTTP/1.1 start line, headers and body (Content-Length, chunked or to EOF)"""
+    start = await reader.readline()
+    if not start:
+        return None
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers.append((name.strip(), value.strip()))
+
+    status = None
+    if is_response:
+        parts = start.decode('latin-1').split(' ', 2)
+        status = int(parts[1])
+    no_body = is_response and (request_method == 'HEAD' or status in (204, 304) or 100 <= status < 200)
+    length = header(headers, 'content-length')
+    if no_body:
+        body = b''
+    elif (header(headers, 'transfer-encoding') or '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif length is not None:
+        body = await reader.readexactly(int(length))
+    elif is_response:
+        body = await reader.read()
+    else:
+        body = b''
+    return start.decode('latin-1').rstrip('\r\n'), headers, body, status
+
+
+def vary_fields(response_headers, request_headers):
+    """((header, request value), ...) for the response's Vary header, or None for Vary: *"""
+    names = [name.strip().lower() for name in (header(response_headers, 'vary') or '').split(',') if name.strip()]
+    if '*' in names:
+        return None
+    return tuple((name, header(request_headers, name)) for name in names)
+
+
+def reason_phrase(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ''
+
+
+def end_to_end(headers):
+    """Headers without the hop-by-hop ones a proxy must not forward"""
+    return [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP]
+
+
+def render_message(start, headers, body):
+    """Serialise a message with a Content-Length body (bodies are held de-chunked)"""
+    lines = [start] + [f'{name}: {value}' for name, value in headers
+                       if name.lower() not in ('content-length', 'transfer-encoding')]
+    lines.append(f'Content-Length: {len(body)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+class EndpointStats:
+    __slots__ = ('requests', 'hits', 'revalidated', 'misses', 'coalesced', 'uncacheable', 'invalidations',
+                 'bytes_served', 'bytes_saved', 'latency_saved_s', 'upstream_s')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self.__slots__}
+        cacheable = self.requests - self.uncacheable
+        result['hit_ratio'] = round((self.hits + self.coalesced) / cacheable, 4) if cacheable else None
+        result['latency_saved_s'] = round(self.latency_saved_s, 3)
+        result['upstream_s'] = round(self.upstream_s, 3)
+        return result
+
+
+class CachingProxy:
+    """Forwards requests to one upstream origin, caching per the registry policy"""
+
+    def __init__(self, upstream, router, policy, max_bytes=MAX_CACHE_BYTES):
+        parts = urlsplit(upstream)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == 'https' else 80)
+        self.prefix = parts.path.rstrip('/')
+        self.router = router
+        self.policy = policy
+        self.max_bytes = max_bytes
+        self.cache = {}
+        self.cache_bytes = 0
+        self.inflight = {}
+        self.idle = []
+        self.stats = {}
+        self.started = time.time()
+
+    def stats_for(self, key):
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = EndpointStats()
+        return stats
+
+    async def connect(self):
+        context = ssl.create_default_context() if self.scheme == 'https' else None
+        return await asyncio.open_connection(self.host, self.port, ssl=context)
+
+    async def upstream(self, method, target, headers, body):
+        """
+        One request to the upstream over a pooled keep-alive connection; returns
+        (status line, headers, body, status, seconds). A pooled connection the
+        upstream already closed is retried once on a fresh one.
+        """
+        started = time.perf_counter()
+        forwarded = [(name, value) for name, value in end_to_end(headers) if name.lower() != 'host']
+        forwarded.append(('Host', self.host if self.port in (80, 443) else f'{self.host}:{self.port}'))
+        request = render_message(f'{method} {self.prefix}{target} HTTP/1.1', forwarded, body)
+        while True:
+            reused = bool(self.idle)
+            reader, writer = self.idle.pop() if reused else await self.connect()
+            try:
+                writer.write(request)
+                await writer.drain()
+                message = await read_message(reader, True, method)
+                if message is None:
+                    raise ConnectionResetError('upstream closed the connection')
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            break
+        start, response_headers, response_body, status = message
+        framed = header(response_headers, 'content-length') is not None or method == 'HEAD' or \
+            status in (204, 304) or (header(response_headers, 'transfer-encoding') or '').lower() == 'chunked'
+        keep = framed and start.startswith('HTTP/1.1') and \
+            (header(response_headers, 'connection') or '').lower() != 'close'
+        if keep and len(self.idle) < MAX_IDLE_UPSTREAM:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+        return start, response_headers, response_body, status, time.perf_counter() - started
+
+    def _store(self, cache_key, entry):
+        previous = self.cache.pop(cache_key, None)
+        if previous is not None:
+            self.cache_bytes -= len(previous.body)
+        # Evict oldest entries (dicts keep insertion order) to stay under the byte budget
+        while self.cache and self.cache_bytes + len(entry.body) > self.max_bytes:
+            self.cache_bytes -= len(self.cache.pop(next(iter(self.cache))).body)
+        self.cache[cache_key] = entry
+        self.cache_bytes += len(entry.body)
+
+    def invalidate(self, category):
+        """Drop cached GETs of a category after a write to it"""
+        stale = [cache_key for cache_key in self.cache if cache_key[0] == category]
+        for cache_key in stale:
+            self.cache_bytes -= len(self.cache.pop(cache_key).body)
+        return len(stale)
+
+    async def fetch(self, key, rule, cache_key, target, headers):
+        """Serve a cacheable GET from cache, by revalidation or from the upstream"""
+        stats = self.stats_for(key)
+        entry = self.cache.get(cache_key)
+        if entry is not None and not entry.matches(headers):
+            entry = None
+        now = time.monotonic()
+        if entry is not None and now < entry.expires:
+            stats.hits += 1
+            stats.bytes_saved += len(entry.body)
+            stats.latency_saved_s += entry.upstream_s
+            return entry.status, entry.headers, entry.body, 'HIT'
+
+        conditional = list(headers)
+        if entry is not None and rule.get('revalidate', True):
+            if entry.etag:
+                conditional.append(('If-None-Match', entry.etag))
+            elif entry.last_modified:
+                conditional.append(('If-Modified-Since', entry.last_modified))
+        _, response_headers, body, status, elapsed = await self.upstream('GET', target, conditional, b'')
+        stats.upstream_s += elapsed
+
+        if status == 304 and entry is not None:
+            stats.revalidated += 1
+            stats.bytes_saved += len(entry.body)
+            entry.expires = time.monotonic() + rule['ttl']
+            return entry.status, entry.headers, entry.body, 'REVALIDATED'
+
+        stats.misses += 1
+        cache_control = (header(response_headers, 'cache-control') or '').lower()
+        # `private` responses are fine to keep when entries are already per user
+        vary = vary_fields(response_headers, headers)
+        if status == 200 and 'no-store' not in cache_control and vary is not None and \
+                (rule.get('per_user') or 'private' not in cache_control):
+            self._store(cache_key, CacheEntry(status, response_headers, body, rule['ttl'], elapsed, vary))
+        return status, response_headers, body, 'MISS'
+
+    async def coalesced_fetch(self, key, rule, cache_key, target, headers):
+        """Singleflight: concurrent identical GETs share one fetch"""
+        pending = self.inflight.get(cache_key)
+        if pending is not None:
+            status, response_headers, body, _ = await asyncio.shield(pending)
+            stats = self.stats_for(key)
+            stats.coalesced += 1
+            stats.bytes_saved += len(body)
+            return status, response_headers, body, 'COALESCED'
+        task = asyncio.ensure_future(self.fetch(key, rule, cache_key, target, headers))
+        self.inflight[cache_key] = task
+        try:
+            return await task
+        finally:
+            self.inflight.pop(cache_key, None)
+
+    async def handle_request(self, method, target, headers, body):
+        """Route one client request; returns (status, headers, body, cache outcome)"""
+        key = self.router.match(method, target)
+        rule = self.policy.rule(key) if key else None
+        stats = self.stats_for(key or f'{method} (unregistered)')
+        stats.requests += 1
+
+        if method == 'GET' and rule and rule['ttl'] > 0:
+            authorization = header(headers, 'authorization') if rule.get('per_user') else None
+            cache_key = (rule['category'], target, authorization, header(headers, 'accept'))
+            status, response_headers, response_body, outcome = \
+                await self.coalesced_fetch(key, rule, cache_key, target, headers)
+        else:
+            stats.uncacheable += 1
+            _, response_headers, response_body, status, elapsed = await self.upstream(method, target, headers, body)
+            stats.upstream_s += elapsed
+            outcome = 'BYPASS'
+            if method not in ('GET', 'HEAD', 'OPTIONS') and rule and status < 400:
+                stats.invalidations += self.invalidate(rule['category'])
+        stats.bytes_served += len(response_body)
+        return status, response_headers, response_body, outcome
+
+    def report(self):
+        totals = EndpointStats()
+        for stats in self.stats.values():
+            for name in EndpointStats.__slots__:
+                setattr(totals, name, getattr(totals, name) + getattr(stats, name))
+        return {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'uptime_s': round(time.time() - self.started, 1),
+            'cache_entries': len(self.cache),
+            'cache_bytes': self.cache_bytes,
+            'totals': totals.as_dict(),
+            'endpoints': {key: stats.as_dict() for key, stats in
+                          sorted(self.stats.items(), key=lambda item: -item[1].requests)},
+        }
+
+    async def serve_client(self, reader, writer):
+        """Keep-alive loop for one client connection"""
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                start, headers, body, _ = message
+                method, target, version = start.split(' ', 2)
+                if target.startswith('http://') or target.startswith('https://'):
+                    parts = urlsplit(target)
+                    target = parts.path + (f'?{parts.query}' if parts.query else '')
+                if target == STATS_PATH:
+                    payload = json.dumps(self.report(), indent=2).encode('utf-8')
+                    status, response_headers, response_body, outcome = \
+                        200, [('Content-Type', 'application/json')], payload, 'LOCAL'
+                else:
+                    try:
+                        status, response_headers, response_body, outcome = \
+                            await self.handle_request(method.upper(), target, headers, body)
+                    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                        status, response_headers, response_body, outcome = \
+                            502, [('Content-Type', 'text/plain')], f'upstream error: {e}\n'.encode('utf-8'), 'ERROR'
+                close = (header(headers, 'connection') or '').lower() == 'close' or version == 'HTTP/1.0'
+                response_headers = end_to_end(response_headers) + [('X-Cache', outcome)]
+                if close:
+                    response_headers.append(('Connection', 'close'))
+                writer.write(render_message(f'HTTP/1.1 {status} {reason_phrase(status)}', response_headers,
+                                            response_body))
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_policy(collection_path, overrides_path=None, default_ttl=DEFAULT_TTL_S, base_path='/api'):
+    """Router and cache policy from the registry collection (plus optional JSON overrides)"""
+    from generate_verification_log import extract_endpoints_from_postman
+
+    endpoints = extract_endpoints_from_postman(collection_path)
+    overrides = None
+    if overrides_path:
+        with open(overrides_path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    policy = CachePolicy(endpoints, overrides, default_ttl)
+    return EndpointRouter(policy.rules, base_path), policy
+
+
+async def run_proxy(proxy, host, port):
+    server = await asyncio.start_server(proxy.serve_client, host, port)
+    print(f"Proxying http://{host}:{port}/ -> {proxy.scheme}://{proxy.host}:{proxy.port}{proxy.prefix}")
+    print(f"Stats at http://{host}:{port}{STATS_PATH}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description='Caching reverse proxy to measure client cache payoff')
+    parser.add_argument('upstream', help='backend or mock origin, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--listen', default=DEFAULT_LISTEN, help='host:port to listen on')
+    parser.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    parser.add_argument('--policy', help='JSON file of per-endpoint overrides: {"GET /path": {"ttl": 60}}')
+    parser.add_argument('--default-ttl', type=float, default=DEFAULT_TTL_S)
+    parser.add_argument('--base-path', default='/api')
+    parser.add_argument('--max-cache-mb', type=float, default=MAX_CACHE_BYTES / (1 << 20))
+    parser.add_argument('-o', '--output', help='write the stats report as JSON on shutdown')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.collection):
+        print(f"Error: Postman collection not found at {args.collection}")
+        sys.exit(1)
+
+    router, policy = load_policy(args.collection, args.policy, args.default_ttl, args.base_path)
+    proxy = CachingProxy(args.upstream, router, policy, int(args.max_cache_mb * (1 << 20)))
+    host, _, port = args.listen.rpartition(':')
+    try:
+        asyncio.run(run_proxy(proxy, host or '127.0.0.1', int(port)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report = proxy.report()
+        totals = report['totals']
+        print(f"\nRequests: {totals['requests']}  hits: {totals['hits']}  revalidated: {totals['revalidated']}  "
+              f"coalesced: {totals['coalesced']}  hit ratio: {totals['hit_ratio']}")
+        print(f"Bytes saved: {totals['bytes_saved']}  latency saved: {totals['latency_saved_s']}s")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Output file: {args.output}")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+N+1 and Chatty-call Detector for Recorded Client Traffic
+Groups recorded requests (HAR or JSON-lines logs, as read by traffic_analyzer)
+by session, orders them in time and looks for:
+  - fan-out: a call followed by N calls to one parameterised template such as
+    GET /profile/:id (list screen loading each item separately)
+  - repeated identical GETs within a short window
+  - runs of sequential GETs that do not overlap and could be issued together
+Each finding becomes a batching, caching or prefetch candidate with the
+round-trips it would save.
+"""
+
+import json
+import os
+from collections import namedtuple
+
+from lgbtinder_api import DEFAULT_COLLECTION
+from pipeline_metrics import stage
+from traffic_analyzer import TrafficAnalyzer, iter_traffic, parse_timestamp
+
+DEFAULT_FANOUT_WINDOW_S = 2.0
+DEFAULT_MIN_FANOUT = 3
+DEFAULT_REPEAT_WINDOW_S = 30.0
+DEFAULT_SEQUENTIAL_GAP_MS = 50.0
+DEFAULT_MIN_SEQUENTIAL = 3
+
+Call = namedtuple('Call', 'start end method key url')
+
+
+def is_item_template(key):
+    """Per-item templates carry a path parameter, e.g. GET /profile/:id/feeds"""
+    return '/:' in key
+
+
+def load_sessions(paths, router):
+    """Session id -> calls sorted by start time; unmatched and untimed requests are dropped"""
+    sessions = {}
+    dropped = 0
+    for path in paths:
+        with stage(f'load:{os.path.basename(path)}'):
+            for record in iter_traffic(path):
+                start = parse_timestamp(record['timestamp'])
+                key = router.match(record['method'], record['url'])
+                if start is None or key is None:
+                    dropped += 1
+                    continue
+                duration = (record['duration_ms'] or 0) / 1000
+                method = record['method'].upper()
+                sessions.setdefault(record['session'] or 'default', []).append(
+                    Call(start, start + duration, method, key, router.path_of(record['url'])))
+    for calls in sessions.values():
+        calls.sort()
+    return sessions, dropped
+
+
+def find_fanouts(calls, window=DEFAULT_FANOUT_WINDOW_S, min_fanout=DEFAULT_MIN_FANOUT):
+    """
+    Yield (trigger key, item key, item count) for bursts of GETs to one item
+    template within `window` seconds after a trigger call ends. The trigger is
+    the latest non-item call before the burst.
+    """
+    trigger = None
+    i = 0
+    while i < len(calls):
+        call = calls[i]
+        if call.method == 'GET' and is_item_template(call.key) and trigger is not None \
+                and call.start - trigger.end <= window:
+            urls = set()
+            j = i
+            while j < len(calls) and calls[j].start - trigger.end <= window:
+                if calls[j].method == 'GET' and calls[j].key == call.key:
+                    urls.add(calls[j].url)
+                j += 1
+            if len(urls) >= min_fanout:
+                yield trigger.key, call.key, len(urls)
+                # Skip the burst so it is counted once
+                while i < len(calls) and calls[i].start - trigger.end <= window:
+                    i += 1
+                continue
+        if not is_item_template(call.key):
+            trigger = call
+        i += 1
+
+
+def find_repeats(calls, window=DEFAULT_REPEAT_WINDOW_S):
+    """Yield (key, url) for each GET that repeats the same URL within `window` seconds"""
+    last_seen = {}
+    for call in calls:
+        if call.method != 'GET':
+            continue
+        previous = last_seen.get(call.url)
+        if previous is not None and call.start - previous <= window:
+            yield call.key, call.url
+        last_seen[call.url] = call.start
+
+
+def find_sequential(calls, gap_ms=DEFAULT_SEQUENTIAL_GAP_MS, min_length=DEFAULT_MIN_SEQUENTIAL):
+    """
+    Yield (keys, serial seconds, parallel seconds) for runs of GETs to distinct
+    templates where each starts only after the previous one finished, within
+    `gap_ms`. Issued together the run would cost about its slowest call.
+    """
+    run = []
+
+    def flush():
+        if len(run) >= min_length:
+            durations = [call.end - call.start for call in run]
+            yield tuple(call.key for call in run), sum(durations), max(durations)
+
+    for call in calls:
+        if call.method == 'GET' and run and call.key not in {c.key for c in run} \
+                and 0 <= (call.start - run[-1].end) * 1000 <= gap_ms:
+            run.append(call)
+            continue
+        yield from flush()
+        run = [call] if call.method == 'GET' else []
+    yield from flush()
+
+
+def detect(sessions, window=DEFAULT_FANOUT_WINDOW_S, min_fanout=DEFAULT_MIN_FANOUT,
+           repeat_window=DEFAULT_REPEAT_WINDOW_S, gap_ms=DEFAULT_SEQUENTIAL_GAP_MS,
+           min_sequential=DEFAULT_MIN_SEQUENTIAL):
+    """Aggregate the patterns over all sessions into ranked candidates"""
+    fanouts, repeats, sequences = {}, {}, {}
+    for session, calls in sessions.items():
+        for trigger, item, size in find_fanouts(calls, window, min_fanout):
+            entry = fanouts.setdefault((trigger, item), {'occurrences': 0, 'item_calls': 0, 'sessions': set()})
+            entry['occurrences'] += 1
+            entry['item_calls'] += size
+            entry['sessions'].add(session)
+        for key, url in find_repeats(calls, repeat_window):
+            entry = repeats.setdefault(key, {'repeats': 0, 'urls': set(), 'sessions': set()})
+            entry['repeats'] += 1
+            if len(entry['urls']) < 5:
+                entry['urls'].add(url)
+            entry['sessions'].add(session)
+        for keys, serial, parallel in find_sequential(calls, gap_ms, min_sequential):
+            entry = sequences.setdefault(keys, {'occurrences': 0, 'serial_s': 0.0, 'parallel_s': 0.0,
+                                                'sessions': set()})
+            entry['occurrences'] += 1
+            entry['serial_s'] += serial
+            entry['parallel_s'] += parallel
+            entry['sessions'].add(session)
+
+    candidates = []
+    for (trigger, item), entry in fanouts.items():
+        candidates.append({
+            'pattern': 'fan-out',
+            'trigger': trigger,
+            'endpoint': item,
+            'occurrences': entry['occurrences'],
+            'sessions': len(entry['sessions']),
+            'avg_fanout': round(entry['item_calls'] / entry['occurrences'], 1),
+            # One batched request (or embedding the items in the trigger response) replaces the burst
+            'round_trips_saved': entry['item_calls'] - entry['occurrences'],
+            'suggestion': f"batch {item} (e.g. ids[] query) or embed the items in {trigger}",
+        })
+    for key, entry in repeats.items():
+        candidates.append({
+            'pattern': 'repeated-get',
+            'endpoint': key,
+            'occurrences': entry['repeats'],
+            'sessions': len(entry['sessions']),
+            'example_urls': sorted(entry['urls']),
+            'round_trips_saved': entry['repeats'],
+            'suggestion': f"cache {key} client-side for at least {repeat_window:g}s or honour ETag",
+        })
+    for keys, entry in sequences.items():
+        candidates.append({
+            'pattern': 'sequential',
+            'endpoints': list(keys),
+            'occurrences': entry['occurrences'],
+            'sessions': len(entry['sessions']),
+            'round_trips_saved': (len(keys) - 1) * entry['occurrences'],
+            'latency_saved_s': round(entry['serial_s'] - entry['parallel_s'], 3),
+            'suggestion': 'issue together with Future.wait or prefetch on the previous screen',
+        })
+    candidates.sort(key=lambda candidate: -candidate['round_trips_saved'])
+    return candidates
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Find N+1 fan-out, repeated and sequential call patterns')
+    parser.add_argument('inputs', nargs='+', help='.har files or JSON-lines request logs with session ids')
+    parser.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    parser.add_argument('--base-path', default='/api')
+    parser.add_argument('--window', type=float, default=DEFAULT_FANOUT_WINDOW_S,
+                        help='seconds after a list call in which item calls count as its fan-out')
+    parser.add_argument('--min-fanout', type=int, default=DEFAULT_MIN_FANOUT)
+    parser.add_argument('--repeat-window', type=float, default=DEFAULT_REPEAT_WINDOW_S)
+    parser.add_argument('--gap-ms', type=float, default=DEFAULT_SEQUENTIAL_GAP_MS,
+                        help='max idle time between calls of a sequential run')
+    parser.add_argument('--min-sequential', type=int, default=DEFAULT_MIN_SEQUENTIAL)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('-o', '--output', help='write all candidates as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    for path in [args.collection] + args.inputs:
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        router = TrafficAnalyzer.from_collection(args.collection, args.base_path).router
+        sessions, dropped = load_sessions(args.inputs, router)
+        with stage('detect'):
+            candidates = detect(sessions, args.window, args.min_fanout, args.repeat_window,
+                                args.gap_ms, args.min_sequential)
+
+    total = sum(len(calls) for calls in sessions.values())
+    print(f"Sessions: {len(sessions)}  calls: {total}  dropped (unmatched or untimed): {dropped}")
+    print(f"Candidates: {len(candidates)}  round-trips saved: {sum(c['round_trips_saved'] for c in candidates)}")
+    print()
+    for candidate in candidates[:args.top]:
+        target = candidate.get('endpoint') or ' -> '.join(candidate['endpoints'])
+        if candidate['pattern'] == 'fan-out':
+            target = f"{candidate['trigger']} -> {target} x{candidate['avg_fanout']}"
+        print(f"[{candidate['pattern']}] {target}")
+        print(f"    {candidate['occurrences']} times in {candidate['sessions']} sessions, "
+              f"saves {candidate['round_trips_saved']} round-trips: {candidate['suggestion']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': len(sessions), 'calls': total, 'candidates': candidates}, f, indent=2)
+        print(f"\nOutput file: {args.output}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Warm Command Server for lgbtinder_api.py
+Keeps generator modules imported in one long-lived process and runs CLI commands
+sent over a Unix socket, so editor and pre-commit hooks skip interpreter and
+import start-up on every call.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+# Commands share the process cwd and stdout, so they run one at a time
+_run_lock = threading.Lock()
+
+
+def _read_message(sock_file):
+    """Read one newline-terminated JSON message"""
+    line = sock_file.readline()
+    if not line:
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+def _write_message(sock_file, message):
+    """Write one newline-terminated JSON message"""
+    sock_file.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+    sock_file.flush()
+
+
+def serve(socket_path, runner):
+    """Serve runner(argv) over a Unix socket until interrupted"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    class CommandHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = _read_message(self.rfile)
+            if request is None:
+                return
+            output = io.StringIO()
+            with _run_lock:
+                previous_cwd = os.getcwd()
+                try:
+                    os.chdir(request.get('cwd') or previous_cwd)
+                    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                        code = runner(request.get('argv', []))
+                except Exception as e:
+                    output.write(f"Error: {e}\n")
+                    code = 1
+                finally:
+                    os.chdir(previous_cwd)
+            _write_message(self.wfile, {'exit': code or 0, 'output': output.getvalue()})
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, CommandHandler)
+    server.daemon_threads = True
+    print(f"Serving on {socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def forward(socket_path, argv):
+    """Send argv to a warm server, print its output and return its exit code"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError as e:
+        print(f"Error: could not connect to server at {socket_path}: {e}")
+        return 1
+    with client, client.makefile('rwb') as sock_file:
+        _write_message(sock_file, {'argv': argv, 'cwd': os.getcwd()})
+        response = _read_message(sock_file)
+    if response is None:
+        print("Error: server closed the connection without a response")
+        return 1
+    sys.stdout.write(response['output'])
+    return response['exit']
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Binary Build Cache for Parsed Collection and OpenAPI Documents
+Stores parsed (and derived, normalized) forms of the Postman collection and
+api_docs.json in a compact binary file keyed by the source's content hash.
+Strings are interned in one table; containers are laid out so a reader can mmap
+the file and decode only the fields it touches, and a marshal snapshot of the
+same tree serves full loads without re-parsing JSON.
+"""
+
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping, Sequence
+
+from pipeline_metrics import cache, count, load_json
+
+DEFAULT_CACHE_DIR = '.build_cache'
+MANIFEST_NAME = 'manifest.json'
+ENV_VAR = 'LGBTINDER_BUILD_CACHE'
+MAGIC = b'LGBC'
+FORMAT_VERSION = 2
+# The marshal snapshot is only readable by the interpreter line and marshal format that wrote it
+RUNTIME = (*sys.version_info[:2], marshal.version)
+# Version of the identity build used for plain parsed JSON
+JSON_VERSION = 1
+
+# magic, version, flags, python major, python minor, marshal version, string count,
+# string index offset, string data offset, node region offset, root node offset
+# (relative to the node region), marshal snapshot offset, marshal snapshot length
+HEADER = struct.Struct('<4sHHBBHIIIIIII')
+U32 = struct.Struct('<I')
+I64 = struct.Struct('<q')
+F64 = struct.Struct('<d')
+
+TAG_NULL, TAG_FALSE, TAG_TRUE, TAG_INT, TAG_FLOAT, TAG_STR, TAG_LIST, TAG_DICT, TAG_BIGINT = range(9)
+
+_enabled = os.environ.get(ENV_VAR, '') not in ('', '0')
+
+
+def enable(flag=True):
+    """Turn the build cache on or off for load_source_json / load_derived callers"""
+    global _enabled
+    _enabled = flag
+
+
+def enabled():
+    return _enabled
+
+
+class _Writer:
+    """Serializes a JSON-like tree into the binary node layout"""
+
+    def __init__(self):
+        self.strings = {}
+        self.nodes = bytearray()
+
+    def intern(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def write(self, value):
+        """Write value's children, then value itself; returns its offset in the node region"""
+        if isinstance(value, dict):
+            children = [(self.intern(key), self.write(child)) for key, child in value.items()]
+            keys = [key.encode('utf-8') for key in value]
+            # Permutation of entries sorted by key bytes, for binary-search lookups
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            offset = len(self.nodes)
+            self.nodes += bytes([TAG_DICT]) + U32.pack(len(children))
+            for key_index, child_offset in children:
+                self.nodes += U32.pack(key_index) + U32.pack(child_offset)
+            for i in order:
+                self.nodes += U32.pack(i)
+            return offset
+        if isinstance(value, (list, tuple)):
+            children = [self.write(child) for child in value]
+            offset = len(self.nodes)
+            self.nodes += bytes([TAG_LIST]) + U32.pack(len(children))
+            for child_offset in children:
+                self.nodes += U32.pack(child_offset)
+            return offset
+
+        offset = len(self.nodes)
+        if value is None:
+            self.nodes.append(TAG_NULL)
+        elif value is True:
+            self.nodes.append(TAG_TRUE)
+        elif value is False:
+            self.nodes.append(TAG_FALSE)
+        elif isinstance(value, int):
+            if -(1 << 63) <= value < (1 << 63):
+                self.nodes += bytes([TAG_INT]) + I64.pack(value)
+            else:
+                self.nodes += bytes([TAG_BIGINT]) + U32.pack(self.intern(str(value)))
+        elif isinstance(value, float):
+            self.nodes += bytes([TAG_FLOAT]) + F64.pack(value)
+        elif isinstance(value, str):
+            self.nodes += bytes([TAG_STR]) + U32.pack(self.intern(value))
+        else:
+            raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+        return offset
+
+
+def _interned(value):
+    """Copy a tree with sys.intern'd strings so marshal writes each string once"""
+    if isinstance(value, dict):
+        return {sys.intern(key): _interned(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [_interned(child) for child in value]
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def encode(value):
+    """Encode a JSON-like tree into cache file bytes"""
+    writer = _Writer()
+    root = writer.write(value)
+    encoded = [text.encode('utf-8') for text in writer.strings]
+    string_index = bytearray()
+    position = 0
+    for data in encoded:
+        string_index += U32.pack(position)
+        position += len(data)
+    string_index += U32.pack(position)
+    snapshot = marshal.dumps(_interned(value))
+
+    string_index_offset = HEADER.size
+    string_data_offset = string_index_offset + len(string_index)
+    nodes_offset = string_data_offset + position
+    marshal_offset = nodes_offset + len(writer.nodes)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, *RUNTIME, len(encoded), string_index_offset, string_data_offset,
+                         nodes_offset, root, marshal_offset, len(snapshot))
+    return b''.join([header, bytes(string_index), b''.join(encoded), bytes(writer.nodes), snapshot])
+
+
+class CacheFile:
+    """An mmap'd cache file; `root` decodes lazily, `load()` returns the full tree"""
+
+    def __init__(self, path):
+        # The mapping keeps its own descriptor, so lazy views outlive the file object
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a build cache file")
+        (magic, version, _, major, minor, marshal_version, self._string_count, self._string_index,
+         self._string_data, self._nodes, self._root, self._marshal_offset,
+         self._marshal_length) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or (major, minor, marshal_version) != RUNTIME:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} build cache file for this Python")
+        self._strings = {}
+
+    def string(self, index):
+        """Decode an interned string once and reuse it"""
+        text = self._strings.get(index)
+        if text is None:
+            start, end = struct.unpack_from('<II', self._mm, self._string_index + index * 4)
+            text = self._strings[index] = self._mm[self._string_data + start:self._string_data + end].decode('utf-8')
+        return text
+
+    def string_bytes(self, index):
+        start, end = struct.unpack_from('<II', self._mm, self._string_index + index * 4)
+        return self._mm[self._string_data + start:self._string_data + end]
+
+    def node(self, offset):
+        """Decode a scalar, or wrap a container in a lazy view; offset is node-region relative"""
+        offset += self._nodes
+        tag = self._mm[offset]
+        if tag == TAG_DICT:
+            return LazyDict(self, offset)
+        if tag == TAG_LIST:
+            return LazyList(self, offset)
+        if tag == TAG_STR:
+            return self.string(U32.unpack_from(self._mm, offset + 1)[0])
+        if tag == TAG_INT:
+            return I64.unpack_from(self._mm, offset + 1)[0]
+        if tag == TAG_FLOAT:
+            return F64.unpack_from(self._mm, offset + 1)[0]
+        if tag == TAG_BIGINT:
+            return int(self.string(U32.unpack_from(self._mm, offset + 1)[0]))
+        return {TAG_NULL: None, TAG_FALSE: False, TAG_TRUE: True}[tag]
+
+    @property
+    def root(self):
+        return self.node(self._root)
+
+    def load(self):
+        """Full tree from the marshal snapshot (C speed, strings already interned)"""
+        start = self._marshal_offset
+        return marshal.loads(self._mm[start:start + self._marshal_length])
+
+    def close(self):
+        self._mm.close()
+
+
+class LazyDict(Mapping):
+    """Read-only dict view over a cached object; values decode on access"""
+
+    __slots__ = ('_cache', '_offset', '_count')
+
+    def __init__(self, cache_file, offset):
+        self._cache = cache_file
+        self._offset = offset
+        self._count = U32.unpack_from(cache_file._mm, offset + 1)[0]
+
+    def _entry(self, i):
+        return struct.unpack_from('<II', self._cache._mm, self._offset + 5 + i * 8)
+
+    def __getitem__(self, key):
+        target = key.encode('utf-8')
+        perm_base = self._offset + 5 + self._count * 8
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            i = U32.unpack_from(self._cache._mm, perm_base + middle * 4)[0]
+            key_index, child = self._entry(i)
+            candidate = self._cache.string_bytes(key_index)
+            if candidate == target:
+                return self._cache.node(child)
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        raise KeyError(key)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._cache.string(self._entry(i)[0])
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f"LazyDict({len(self)} keys)"
+
+
+class LazyList(Sequence):
+    """Read-only list view over a cached array; items decode on access"""
+
+    __slots__ = ('_cache', '_offset', '_count')
+
+    def __init__(self, cache_file, offset):
+        self._cache = cache_file
+        self._offset = offset
+        self._count = U32.unpack_from(cache_file._mm, offset + 1)[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._cache.node(U32.unpack_from(self._cache._mm, self._offset + 5 + index * 4)[0])
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f"LazyList({len(self)} items)"
+
+
+def materialize(value):
+    """Turn a lazy view into plain dicts and lists"""
+    if isinstance(value, LazyDict):
+        return {key: materialize(value[key]) for key in value}
+    if isinstance(value, LazyList):
+        return [materialize(item) for item in value]
+    return value
+
+
+def _manifest_path(cache_dir):
+    return os.path.join(cache_dir, MANIFEST_NAME)
+
+
+def source_digest(source, cache_dir=DEFAULT_CACHE_DIR):
+    """sha256 of a source file, memoized by size and mtime in the cache manifest"""
+    stat = os.stat(source)
+    manifest_path = _manifest_path(cache_dir)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except ValueError:
+            manifest = {}
+    key = os.path.abspath(source)
+    entry = manifest.get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    manifest[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    os.makedirs(cache_dir, exist_ok=True)
+    # Parallel pipeline steps hash sources concurrently; readers must never see a partial manifest
+    temporary = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary, manifest_path)
+    return manifest[key]['sha256']
+
+
+def cache_path_for(source, kind, version, digest, cache_dir=DEFAULT_CACHE_DIR):
+    """Cache file name: <source name>.<kind>.v<version>.<hash prefix>.py<major><minor>m<marshal version>.lgbc"""
+    runtime = 'py{}{}m{}'.format(*RUNTIME)
+    return os.path.join(cache_dir, f"{os.path.basename(source)}.{kind}.v{version}.{digest[:16]}.{runtime}.lgbc")
+
+
+def write_cache(value, path):
+    """Atomically write a cache file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = encode(value)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+    count('bytes_written', len(data))
+
+
+def _prune(source, kind, keep, cache_dir):
+    """Remove cache files for older sources or builder versions of the same kind"""
+    prefix = f"{os.path.basename(source)}.{kind}."
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and name.endswith('.lgbc') and path != keep:
+            os.unlink(path)
+
+
+def load_derived(source, kind, build, version, lazy=False, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Return build(parsed source JSON) from the cache, computing and storing it on a
+    miss. Bump version whenever build changes its output. With lazy=True the result
+    is an mmap-backed LazyDict/LazyList.
+    """
+    digest = source_digest(source, cache_dir)
+    path = cache_path_for(source, kind, version, digest, cache_dir)
+    cache_file = None
+    if os.path.exists(path):
+        try:
+            cache_file = CacheFile(path)
+        except ValueError:
+            pass
+    if cache_file is not None:
+        cache('build_cache', True)
+        count('bytes_read', os.path.getsize(path))
+        if lazy:
+            return cache_file.root
+        try:
+            return cache_file.load()
+        finally:
+            cache_file.close()
+
+    cache('build_cache', False)
+    value = build(load_json(source))
+    write_cache(value, path)
+    _prune(source, kind, path, cache_dir)
+    if lazy:
+        return CacheFile(path).root
+    return value
+
+
+def load_source_json(source, lazy=False, cache_dir=DEFAULT_CACHE_DIR):
+    """Parsed JSON for a source file, through the build cache when it is enabled"""
+    if not _enabled and not lazy:
+        return load_json(source)
+    return load_derived(source, 'json', lambda value: value, JSON_VERSION, lazy, cache_dir)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Warm or inspect the binary build cache')
+    parser.add_argument('sources', nargs='*', default=['LGBTinder_API_Postman_Collection_Updated.json', 'api_docs.json'])
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    for source in args.sources:
+        if not os.path.exists(source):
+            print(f"Error: {source} not found")
+            exit(1)
+        started = time.perf_counter()
+        with open(source, 'r', encoding='utf-8') as f:
+            json.load(f)
+        json_ms = (time.perf_counter() - started) * 1000
+
+        load_derived(source, 'json', lambda value: value, JSON_VERSION, cache_dir=args.cache_dir)
+        path = cache_path_for(source, 'json', JSON_VERSION, source_digest(source, args.cache_dir), args.cache_dir)
+        started = time.perf_counter()
+        load_derived(source, 'json', lambda value: value, JSON_VERSION, cache_dir=args.cache_dir)
+        full_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        root = load_derived(source, 'json', lambda value: value, JSON_VERSION, lazy=True, cache_dir=args.cache_dir)
+        lazy_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{source}: {os.path.getsize(source)} bytes JSON -> {os.path.getsize(path)} bytes cache")
+        print(f"  json.load {json_ms:.2f} ms, cached full load {full_ms:.2f} ms, lazy open {lazy_ms:.2f} ms ({len(root)} top-level keys)")
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Response Contract Validation against api_docs.json
+Every response schema in the OpenAPI document is resolved ($ref included) and
+compiled once into a specialised validator closure, so recorded or mock
+responses are checked without interpreting the schema per document. Large JSONL
+captures are split by byte range and validated in parallel processes.
+"""
+
+import functools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import collection_cache
+from api_section_index import endpoint_key
+from endpoint_router import ROUTE_CACHE_SIZE, URL_ORIGIN_RE, EndpointRouter
+from pipeline_metrics import count, stage
+
+DEFAULT_OPENAPI = 'api_docs.json'
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'patch', 'head', 'options')
+MAX_FAILURE_SAMPLES = 5
+# Bump when extract_response_schemas output changes so cached schemas are rebuilt
+SCHEMAS_CACHE_VERSION = 1
+
+PYTHON_TYPES = {
+    'string': lambda value: type(value) is str,
+    'integer': lambda value: type(value) is int or (type(value) is float and value.is_integer()),
+    'number': lambda value: type(value) in (int, float),
+    'boolean': lambda value: type(value) is bool,
+    'null': lambda value: value is None,
+    'object': lambda value: type(value) is dict,
+    'array': lambda value: type(value) is list,
+}
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+FORMAT_CHECKS = {
+    'email': EMAIL_RE.match,
+    'date-time': re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}').match,
+    'date': re.compile(r'^\d{4}-\d{2}-\d{2}$').match,
+    'uuid': re.compile(r'^[0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}$').match,
+}
+
+
+def resolve_pointer(document, ref):
+    """Follow a local JSON pointer such as #/components/responses/AuthenticationException"""
+    if not ref.startswith('#/'):
+        raise ValueError(f"Only local $ref values are supported: {ref}")
+    node = document
+    for part in ref[2:].split('/'):
+        node = node[part.replace('~1', '/').replace('~0', '~')]
+    return node
+
+
+def resolve_refs(node, document, _seen=()):
+    """Inline every $ref; a reference back into its own chain is left as-is"""
+    if isinstance(node, dict):
+        ref = node.get('$ref')
+        if isinstance(ref, str):
+            if ref in _seen:
+                return node
+            return resolve_refs(resolve_pointer(document, ref), document, _seen + (ref,))
+        return {key: resolve_refs(value, document, _seen) for key, value in node.items()}
+    if isinstance(node, list):
+        return [resolve_refs(value, document, _seen) for value in node]
+    return node
+
+
+def extract_response_schemas(document):
+    """
+    Map "METHOD /path" -> {status: resolved JSON schema or None} for every
+    operation. Paths use the same :param form as the rest of the tooling.
+    """
+    schemas = {}
+    for path, operations in document.get('paths', {}).items():
+        for method, operation in operations.items():
+            if method not in HTTP_METHODS:
+                continue
+            responses = {}
+            for status, response in operation.get('responses', {}).items():
+                response = resolve_refs(response, document)
+                content = response.get('content') or {}
+                media = content.get('application/json') or next(iter(content.values()), {})
+                responses[str(status)] = media.get('schema')
+            schemas[endpoint_key(method, path)] = responses
+    return schemas
+
+
+def _fail(message):
+    """Validator for a schema that can never pass (e.g. `false`)"""
+    return lambda value: message
+
+
+def _accept(value):
+    return None
+
+
+def compile_schema(schema):
+    """
+    Compile a resolved JSON schema into validate(value) -> None | error string.
+    Errors carry a JSON-pointer-like path to the first failing value. Only the
+    keywords a schema actually uses become checks, so the common
+    {"type": "string"} compiles to a single type test.
+    """
+    if schema is True or schema is None or schema == {}:
+        return _accept
+    if schema is False:
+        return _fail('schema does not allow any value')
+
+    checks = []
+
+    types = schema.get('type')
+    if isinstance(types, str):
+        types = [types]
+    if schema.get('nullable') and types and 'null' not in types:
+        types = list(types) + ['null']
+    if types:
+        type_tests = [PYTHON_TYPES[name] for name in types if name in PYTHON_TYPES]
+        expected = ' or '.join(types)
+        if len(type_tests) == 1:
+            only = type_tests[0]
+            checks.append(lambda value: None if only(value) else f"expected {expected}, got {type(value).__name__}")
+        elif type_tests:
+            checks.append(lambda value: None if any(test(value) for test in type_tests)
+                          else f"expected {expected}, got {type(value).__name__}")
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+        checks.append(lambda value: None if value in allowed else f"{value!r} not in enum")
+    if 'const' in schema:
+        constant = schema['const']
+        checks.append(lambda value: None if value == constant else f"expected constant {constant!r}")
+
+    checks.extend(_string_checks(schema))
+    checks.extend(_number_checks(schema))
+    checks.extend(_object_checks(schema))
+    checks.extend(_array_checks(schema))
+    checks.extend(_combinator_checks(schema))
+
+    if not checks:
+        return _accept
+    if len(checks) == 1:
+        return checks[0]
+    checks = tuple(checks)
+
+    def validate(value):
+        for check in checks:
+            error = check(value)
+            if error is not None:
+                return error
+        return None
+
+    return validate
+
+
+def _string_checks(schema):
+    checks = []
+    min_length, max_length = schema.get('minLength'), schema.get('maxLength')
+    if min_length is not None or max_length is not None:
+        low = min_length or 0
+        high = max_length if max_length is not None else float('inf')
+        checks.append(lambda value: None if type(value) is not str or low <= len(value) <= high
+                      else f"length {len(value)} outside [{low}, {high}]")
+    if 'pattern' in schema:
+        search = re.compile(schema['pattern']).search
+        checks.append(lambda value: None if type(value) is not str or search(value)
+                      else f"does not match pattern {schema['pattern']!r}")
+    match = FORMAT_CHECKS.get(schema.get('format'))
+    if match is not None:
+        name = schema['format']
+        checks.append(lambda value: None if type(value) is not str or match(value) else f"not a valid {name}")
+    return checks
+
+
+def _number_checks(schema):
+    checks = []
+    bounds = [(keyword, schema[keyword]) for keyword in ('minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum')
+              if isinstance(schema.get(keyword), (int, float)) and not isinstance(schema.get(keyword), bool)]
+    for keyword, limit in bounds:
+        test = {
+            'minimum': lambda value, limit=limit: value >= limit,
+            'maximum': lambda value, limit=limit: value <= limit,
+            'exclusiveMinimum': lambda value, limit=limit: value > limit,
+            'exclusiveMaximum': lambda value, limit=limit: value < limit,
+        }[keyword]
+        checks.append(lambda value, test=test, keyword=keyword, limit=limit:
+                      None if type(value) not in (int, float) or test(value) else f"{value} violates {keyword} {limit}")
+    return checks
+
+
+def _object_checks(schema):
+    checks = []
+    required = tuple(schema.get('required') or ())
+    if required:
+        def check_required(value):
+            if type(value) is dict:
+                for key in required:
+                    if key not in value:
+                        return f"missing required property {key!r}"
+            return None
+        checks.append(check_required)
+
+    properties = tuple((key, compile_schema(sub)) for key, sub in (schema.get('properties') or {}).items())
+    properties = tuple((key, validator) for key, validator in properties if validator is not _accept)
+    if properties:
+        def check_properties(value):
+            if type(value) is dict:
+                for key, validator in properties:
+                    if key in value:
+                        error = validator(value[key])
+                        if error is not None:
+                            return f"/{key}{error if error.startswith('/') else ': ' + error}"
+            return None
+        checks.append(check_properties)
+
+    additional = schema.get('additionalProperties')
+    if additional is not None and additional is not True:
+        known = frozenset(schema.get('properties') or ())
+        extra_validator = compile_schema(additional)
+
+        def check_additional(value):
+            if type(value) is dict:
+                for key, item in value.items():
+                    if key not in known:
+                        error = extra_validator(item)
+                        if error is not None:
+                            return f"/{key}{error if error.startswith('/') else ': ' + error}"
+            return None
+        checks.append(check_additional)
+    return checks
+
+
+def _array_checks(schema):
+    checks = []
+    min_items, max_items = schema.get('minItems'), schema.get('maxItems')
+    if min_items is not None or max_items is not None:
+        low = min_items or 0
+        high = max_items if max_items is not None else float('inf')
+        checks.append(lambda value: None if type(value) is not list or low <= len(value) <= high
+                      else f"{len(value)} items outside [{low}, {high}]")
+
+    # prefixItems (2020-12) or tuple-form items, followed by items/additionalItems for the rest
+    prefix = schema.get('prefixItems')
+    rest = schema.get('items')
+    if isinstance(rest, list):
+        prefix, rest = rest, schema.get('additionalItems')
+    elif prefix is not None and rest is None:
+        rest = schema.get('additionalItems')
+    prefix_validators = tuple(compile_schema(sub) for sub in prefix or ())
+    rest_validator = compile_schema(rest) if rest is not None else _accept
+    start = len(prefix_validators)
+
+    if prefix_validators or rest_validator is not _accept:
+        def check_items(value):
+            if type(value) is not list:
+                return None
+            for index, validator in enumerate(prefix_validators[:len(value)]):
+                error = validator(value[index])
+                if error is not None:
+                    return f"/{index}{error if error.startswith('/') else ': ' + error}"
+            if rest_validator is not _accept:
+                for index in range(start, len(value)):
+                    error = rest_validator(value[index])
+                    if error is not None:
+                        return f"/{index}{error if error.startswith('/') else ': ' + error}"
+            return None
+        checks.append(check_items)
+    return checks
+
+
+def _combinator_checks(schema):
+    checks = []
+    for sub in schema.get('allOf') or ():
+        checks.append(compile_schema(sub))
+    for keyword in ('anyOf', 'oneOf'):
+        if keyword not in schema:
+            continue
+        options = tuple(compile_schema(sub) for sub in schema[keyword])
+        if keyword == 'anyOf':
+            checks.append(lambda value, options=options:
+                          None if any(option(value) is None for option in options) else "matches no anyOf option")
+        else:
+            checks.append(lambda value, options=options:
+                          None if sum(option(value) is None for option in options) == 1
+                          else "does not match exactly one oneOf option")
+    if 'not' in schema:
+        negated = compile_schema(schema['not'])
+        checks.append(lambda value: "matches a `not` schema" if negated(value) is None else None)
+    return checks
+
+
+class ContractRegistry:
+    """Compiled validators for every documented operation and status"""
+
+    def __init__(self, schemas, base_path='/api'):
+        self.validators = {}
+        # Identical resolved schemas (shared error responses) compile once
+        compiled = {}
+        for key, responses in schemas.items():
+            self.validators[key] = {}
+            for status, schema in responses.items():
+                fingerprint = json.dumps(schema, sort_keys=True)
+                if fingerprint not in compiled:
+                    compiled[fingerprint] = compile_schema(schema) if schema is not None else None
+                self.validators[key][status] = compiled[fingerprint]
+        self.unique_validators = len(compiled)
+        self.router = EndpointRouter(self.validators, base_path)
+        self.base_path = self.router.base_path
+        self.match = self.router.match
+        self.validator_for = functools.lru_cache(maxsize=ROUTE_CACHE_SIZE)(self.validator_for)
+
+    @classmethod
+    def from_openapi(cls, openapi_path=DEFAULT_OPENAPI):
+        """Load resolved schemas (through the build cache) and compile them"""
+        with stage('load_schemas'):
+            schemas = collection_cache.load_derived(openapi_path, 'response_schemas', extract_response_schemas,
+                                                    SCHEMAS_CACHE_VERSION)
+            document = collection_cache.load_source_json(openapi_path, lazy=True)
+            servers = document.get('servers') or [{}]
+            base_path = URL_ORIGIN_RE.sub('', servers[0].get('url', '')) if servers else ''
+        with stage('compile_validators'):
+            return cls(schemas, base_path or '/api')
+
+    def validator_for(self, key, status):
+        """Validator for a status, falling back to 2XX-style ranges and default"""
+        responses = self.validators.get(key, {})
+        status = str(status)
+        for candidate in (status, status[:1] + 'XX', 'default'):
+            if candidate in responses:
+                return True, responses[candidate]
+        return False, None
+
+
+class ValidationReport:
+    """Per-operation pass/fail counts with a few failure samples"""
+
+    def __init__(self):
+        self.operations = {}
+        self.totals = {'documents': 0, 'valid': 0, 'invalid': 0, 'unmatched': 0,
+                       'undocumented_status': 0, 'no_schema': 0, 'unparseable': 0}
+
+    def record(self, key, status, error):
+        stats = self.operations.setdefault(key, {'valid': 0, 'invalid': 0, 'failures': []})
+        if error is None:
+            stats['valid'] += 1
+            self.totals['valid'] += 1
+        else:
+            stats['invalid'] += 1
+            self.totals['invalid'] += 1
+            if len(stats['failures']) < MAX_FAILURE_SAMPLES:
+                stats['failures'].append({'status': status, 'error': error})
+
+    def merge(self, other):
+        for name, value in other['totals'].items():
+            self.totals[name] += value
+        for key, stats in other['operations'].items():
+            mine = self.operations.setdefault(key, {'valid': 0, 'invalid': 0, 'failures': []})
+            mine['valid'] += stats['valid']
+            mine['invalid'] += stats['invalid']
+            mine['failures'] = (mine['failures'] + stats['failures'])[:MAX_FAILURE_SAMPLES]
+
+    def as_dict(self):
+        return {'totals': self.totals, 'operations': self.operations}
+
+
+def validate_record(registry, report, record):
+    """
+    Validate one recorded response {method, url|path, status, body}. `body` is
+    the decoded JSON value; a record may instead carry the undecoded text as
+    `raw_body`, as Postman collections do.
+    """
+    report.totals['documents'] += 1
+    key = registry.match(record.get('method', 'GET'), record.get('url') or record.get('path', ''))
+    if key is None:
+        report.totals['unmatched'] += 1
+        return
+    status = record.get('status', 200)
+    documented, validator = registry.validator_for(key, status)
+    if not documented:
+        report.totals['undocumented_status'] += 1
+        return
+    if validator is None:
+        report.totals['no_schema'] += 1
+        return
+    if 'raw_body' in record:
+        try:
+            body = json.loads(record['raw_body'])
+        except (TypeError, ValueError):
+            report.totals['unparseable'] += 1
+            return
+    else:
+        body = record.get('body')
+    report.record(key, str(status), validator(body))
+
+
+def iter_collection_records(collection):
+    """Recorded responses from a Postman collection, as validation records"""
+    def walk(item):
+        if 'item' in item:
+            for sub_item in item['item']:
+                yield from walk(sub_item)
+            return
+        request = item.get('request', {})
+        url = request.get('url', {})
+        raw = url.get('raw', '') if isinstance(url, dict) else url
+        for response in item.get('response', []):
+            original = response.get('originalRequest', request)
+            original_url = original.get('url', raw)
+            yield {
+                'method': original.get('method', request.get('method', 'GET')),
+                'url': original_url.get('raw', raw) if isinstance(original_url, dict) else original_url,
+                'status': response.get('code', 200),
+                'raw_body': response.get('body'),
+            }
+
+    for item in collection.get('item', []):
+        yield from walk(item)
+
+
+def _byte_ranges(path, parts):
+    """Split a JSONL file into newline-aligned byte ranges"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def validate_jsonl_range(openapi_path, path, start, end):
+    """Worker: compile validators and check the records in [start, end) of a JSONL file"""
+    registry = ContractRegistry.from_openapi(openapi_path)
+    report = ValidationReport()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    report.totals['documents'] += 1
+                    report.totals['unparseable'] += 1
+                    continue
+                validate_record(registry, report, record)
+    return report.as_dict()
+
+
+def validate_jsonl(openapi_path, path, jobs=None):
+    """Validate a JSONL capture, fanning out across processes when jobs > 1"""
+    jobs = jobs or os.cpu_count() or 1
+    ranges = _byte_ranges(path, jobs)
+    report = ValidationReport()
+    count('bytes_read', os.path.getsize(path))
+    if len(ranges) <= 1:
+        for start, end in ranges:
+            report.merge(validate_jsonl_range(openapi_path, path, start, end))
+        return report
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(validate_jsonl_range, openapi_path, path, start, end) for start, end in ranges]
+        for future in futures:
+            report.merge(future.result())
+    return report
+
+
+def example_instance(schema):
+    """A minimal document that satisfies a resolved schema, used for mock traffic"""
+    if not isinstance(schema, dict):
+        return None
+    if 'example' in schema and not isinstance(schema['example'], (dict, list)):
+        candidate = schema['example']
+        if compile_schema(schema)(candidate) is None:
+            return candidate
+    if 'enum' in schema:
+        return schema['enum'][0]
+    if 'const' in schema:
+        return schema['const']
+    for keyword in ('anyOf', 'oneOf'):
+        if schema.get(keyword):
+            return example_instance(schema[keyword][0])
+    types = schema.get('type')
+    kind = types[0] if isinstance(types, list) else types
+    if kind == 'object' or 'properties' in schema:
+        return {key: example_instance(sub) for key, sub in (schema.get('properties') or {}).items()}
+    if kind == 'array':
+        prefix = schema.get('prefixItems') or (schema['items'] if isinstance(schema.get('items'), list) else [])
+        items = [example_instance(sub) for sub in prefix]
+        extra = schema.get('items') if isinstance(schema.get('items'), dict) else None
+        while len(items) < (schema.get('minItems') or 0):
+            items.append(example_instance(extra or {}))
+        return items
+    if kind == 'string':
+        text = {'email': 'user@example.com', 'date-time': '2024-01-01T00:00:00Z', 'date': '2024-01-01',
+                'uuid': '00000000-0000-0000-0000-000000000000'}.get(schema.get('format'), 'text')
+        return text.ljust(schema.get('minLength') or 0, 'x')
+    if kind in ('integer', 'number'):
+        return max(schema.get('minimum', 1), 1) if 'maximum' not in schema else schema['maximum']
+    if kind == 'boolean':
+        return True
+    return None
+
+
+def mock_records(registry, schemas, total):
+    """Yield `total` mock records cycling through every documented response schema"""
+    pool = []
+    for key, responses in schemas.items():
+        method, path = key.split(' ', 1)
+        url = registry.base_path + re.sub(r':[^/]+', '1', path)
+        for status, schema in responses.items():
+            if schema is not None:
+                pool.append({'method': method, 'url': url, 'status': int(status) if status.isdigit() else 200,
+                             'body': example_instance(schema)})
+    for i in range(total):
+        yield pool[i % len(pool)]
+
+
+def benchmark(openapi_path, total):
+    """Compile validators and time validation of `total` mock documents on one core"""
+    started = time.perf_counter()
+    registry = ContractRegistry.from_openapi(openapi_path)
+    compile_s = time.perf_counter() - started
+    schemas = collection_cache.load_derived(openapi_path, 'response_schemas', extract_response_schemas,
+                                            SCHEMAS_CACHE_VERSION)
+    records = list(mock_records(registry, schemas, total))
+
+    # Raw validator throughput, without routing
+    pairs = [registry.validator_for(registry.match(r['method'], r['url']), r['status'])[1] for r in records]
+    started = time.perf_counter()
+    for validator, record in zip(pairs, records):
+        validator(record['body'])
+    validate_s = time.perf_counter() - started
+
+    report = ValidationReport()
+    started = time.perf_counter()
+    for record in records:
+        validate_record(registry, report, record)
+    routed_s = time.perf_counter() - started
+    return {
+        'operations': len(registry.validators),
+        'unique_validators': registry.unique_validators,
+        'compile_s': round(compile_s, 4),
+        'documents': total,
+        'validate_docs_per_s': round(total / validate_s) if validate_s else None,
+        'routed_docs_per_s': round(total / routed_s) if routed_s else None,
+        'invalid_mocks': report.totals['invalid'],
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Validate recorded responses against api_docs.json schemas')
+    parser.add_argument('inputs', nargs='*', help='JSONL captures ({method, url, status, body} per line) '
+                                                  'or Postman collections with recorded responses')
+    parser.add_argument('--openapi', default=DEFAULT_OPENAPI)
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes for JSONL captures')
+    parser.add_argument('-o', '--output', help='write the full report as JSON')
+    parser.add_argument('--bench', type=int, metavar='N', help='validate N mock documents and report throughput')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.openapi):
+        print(f"Error: OpenAPI document not found at {args.openapi}")
+        sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        if args.bench:
+            print(json.dumps(benchmark(args.openapi, args.bench), indent=2))
+            sys.exit(0)
+        if not args.inputs:
+            parser.error('give at least one input, or --bench N')
+
+        report = ValidationReport()
+        registry = None
+        for path in args.inputs:
+            with stage(f'validate:{os.path.basename(path)}'):
+                if path.endswith('.jsonl'):
+                    report.merge(validate_jsonl(args.openapi, path, args.jobs).as_dict())
+                else:
+                    registry = registry or ContractRegistry.from_openapi(args.openapi)
+                    for record in iter_collection_records(collection_cache.load_source_json(path)):
+                        validate_record(registry, report, record)
+
+    totals = report.totals
+    print(f"Documents: {totals['documents']}")
+    print(f"Valid: {totals['valid']}  Invalid: {totals['invalid']}  Unmatched: {totals['unmatched']}  "
+          f"Undocumented status: {totals['undocumented_status']}  No schema: {totals['no_schema']}  "
+          f"Unparseable: {totals['unparseable']}")
+    for key, stats in sorted(report.operations.items()):
+        for failure in stats['failures'][:1] if stats['invalid'] else ():
+            print(f"  {key} [{failure['status']}] {stats['invalid']} invalid, e.g. {failure['error']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report.as_dict(), f, indent=2)
+        print(f"Output file: {args.output}")
+    sys.exit(1 if totals['invalid'] else 0)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Lightweight Dart Source Scanner
+Regex and brace-matching parser for the Flutter app's lib/ sources: imports and
+exports, classes with their superclass, fields and method bodies, top-level
+functions and string constants. It is not a Dart parser; it is enough to follow
+imports and calls between app files without the Dart SDK. Comments and string
+contents are masked first, so braces inside them do not confuse the matching.
+"""
+
+import os
+import re
+
+DART_EXTENSION = '.dart'
+
+IMPORT_RE = re.compile(r"^\s*(import|export|part)\s+'([^']+)'(\s+deferred)?(\s+as\s+\w+)?", re.MULTILINE)
+CLASS_RE = re.compile(r'\b(?:abstract\s+)?(?:class|mixin)\s+(\w+)(?:<[^{]*?>)?'
+                      r'(?:\s+extends\s+(\w+))?[^{;]*\{')
+CALLABLE_RE = re.compile(r'(?<![\w.])(\w+)\s*(?:<[^<>(){};]*>)?\s*\(')
+BODY_START_RE = re.compile(r'\s*(async\*?|sync\*)?\s*(\{|=>)')
+FIELD_RE = re.compile(r'\b([A-Z]\w*)(?:<[^;=(){}]*>)?\??\s+(_?\w+)\s*(?:=|;)')
+FIELD_INIT_RE = re.compile(r'\b(?:final|var|late)\s+(_?\w+)\s*=\s*(?:const\s+|new\s+)?([A-Z]\w*)(?:<[^;=(){}]*>)?\s*[.(]')
+STRING_CONST_RE = re.compile(r"\bconst\s+(?:String\s+)?(\w+)\s*=\s*'([^']*)'\s*;")
+NOT_FUNCTIONS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'assert', 'super', 'this', 'on', 'await',
+                 'Function', 'throw', 'else', 'try', 'do', 'new', 'const', 'print', 'in'}
+WIDGET_BASES = {'StatelessWidget', 'StatefulWidget', 'ConsumerWidget', 'ConsumerStatefulWidget', 'InheritedWidget'}
+
+
+def mask_source(text):
+    """
+    Copy of text with comments blanked and string contents replaced by spaces
+    (quotes kept), preserving every offset so positions map back to the source.
+    """
+    out = list(text)
+    i, length = 0, len(text)
+    while i < length:
+        ch = text[i]
+        if text.startswith('//', i):
+            end = text.find('\n', i)
+            end = length if end == -1 else end
+            out[i:end] = ' ' * (end - i)
+            i = end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            out[i:end] = [c if c == '\n' else ' ' for c in text[i:end]]
+            i = end
+        elif ch in '\'"':
+            raw = i > 0 and text[i - 1] == 'r'
+            quote = text[i:i + 3] if text[i:i + 3] in ("'''", '"""') else ch
+            j = i + len(quote)
+            while j < length and not text.startswith(quote, j):
+                if text[j] == '\\' and not raw:
+                    j += 1
+                elif len(quote) == 1 and text[j] == '\n':
+                    break
+                j += 1
+            for k in range(i + len(quote), min(j, length)):
+                if out[k] != '\n':
+                    out[k] = ' '
+            i = j + len(quote)
+        else:
+            i += 1
+    return ''.join(out)
+
+
+def block_end(masked, open_brace):
+    """Offset just past the brace matching the one at open_brace"""
+    depth = 0
+    for i in range(open_brace, len(masked)):
+        if masked[i] == '{':
+            depth += 1
+        elif masked[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(masked)
+
+
+def expression_end(masked, start):
+    """Offset just past the `;` ending an arrow body, ignoring nested brackets"""
+    depth = 0
+    for i in range(start, len(masked)):
+        ch = masked[i]
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            if depth == 0:
+                return i
+            depth -= 1
+        elif ch == ';' and depth == 0:
+            return i + 1
+    return len(masked)
+
+
+def line_of(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def top_level_spans(masked, start, end):
+    """(start, end) spans inside [start, end) at brace depth zero, i.e. outside nested blocks"""
+    spans, depth, span_start = [], 0, start
+    for i in range(start, end):
+        ch = masked[i]
+        if ch == '{':
+            if depth == 0:
+                spans.append((span_start, i + 1))
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                span_start = i
+    spans.append((span_start, end))
+    return spans
+
+
+def paren_end(masked, open_paren):
+    """Offset just past the parenthesis matching the one at open_paren"""
+    depth = 0
+    for i in range(open_paren, len(masked)):
+        if masked[i] == '(':
+            depth += 1
+        elif masked[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(masked)
+
+
+def find_functions(masked, start, end):
+    """
+    Functions and methods declared at depth zero of [start, end): name ->
+    {'start', 'end', 'async', 'decl'} where start/end delimit the body.
+    """
+    functions = {}
+    depth = 0
+    position = start
+    while True:
+        match = CALLABLE_RE.search(masked, position, end)
+        if match is None:
+            break
+        segment = masked[position:match.start()]
+        depth += segment.count('{') - segment.count('}')
+        close = paren_end(masked, match.end() - 1)
+        name = match.group(1)
+        body = BODY_START_RE.match(masked, close)
+        if depth == 0 and body and name not in NOT_FUNCTIONS:
+            if body.group(2) == '{':
+                body_start = body.end() - 1
+                body_end = block_end(masked, body_start)
+            else:
+                body_start = body.end()
+                body_end = expression_end(masked, body_start)
+            functions.setdefault(name, {'start': body_start, 'end': body_end, 'async': bool(body.group(1)),
+                                        'decl': match.start()})
+            position = max(body_end, match.end())
+        else:
+            # Calls and parameter lists (which may hold {required ...} braces) are balanced; skip them whole
+            position = close
+    return functions
+
+
+def parse_dart(text):
+    """Parse Dart source text into imports, classes, functions and string constants"""
+    masked = mask_source(text)
+    imports = []
+    for match in IMPORT_RE.finditer(text):
+        if masked[match.start(2) - 1] != "'":
+            continue
+        imports.append({'kind': match.group(1), 'uri': match.group(2), 'deferred': bool(match.group(3)),
+                        'line': line_of(text, match.start())})
+
+    classes = {}
+    class_spans = []
+    for match in CLASS_RE.finditer(masked):
+        body_start = match.end() - 1
+        if any(start < match.start() < end for start, end in class_spans):
+            continue
+        body_end = block_end(masked, body_start)
+        class_spans.append((body_start, body_end))
+        name = match.group(1)
+        fields = {}
+        for span_start, span_end in top_level_spans(masked, body_start + 1, body_end - 1):
+            segment = masked[span_start:span_end]
+            for field in FIELD_RE.finditer(segment):
+                if field.group(1) not in ('return', 'await'):
+                    fields.setdefault(field.group(2), field.group(1))
+            for field in FIELD_INIT_RE.finditer(segment):
+                fields.setdefault(field.group(1), field.group(2))
+        classes[name] = {
+            'extends': match.group(2),
+            'start': body_start,
+            'end': body_end,
+            'line': line_of(text, match.start()),
+            'fields': fields,
+            'methods': find_functions(masked, body_start + 1, body_end - 1),
+        }
+
+    functions = {}
+    outside = 0
+    for start, end in sorted(class_spans) + [(len(masked), len(masked))]:
+        functions.update(find_functions(masked, outside, start))
+        outside = end
+
+    constants = {name: value for name, value in STRING_CONST_RE.findall(text)}
+    return {'imports': imports, 'classes': classes, 'functions': functions, 'constants': constants}
+
+
+def parse_dart_file(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    result = parse_dart(text)
+    result['size'] = len(text.encode('utf-8'))
+    return result
+
+
+def resolve_import(importer, uri, lib_dir, package_name=None):
+    """Path of an app file imported by `importer`, or None for SDK and third-party packages"""
+    if uri.startswith('dart:'):
+        return None
+    if uri.startswith('package:'):
+        package, _, rest = uri[len('package:'):].partition('/')
+        if package_name is None or package != package_name:
+            return None
+        return os.path.normpath(os.path.join(lib_dir, rest))
+    return os.path.normpath(os.path.join(os.path.dirname(importer), uri))
+
+
+def package_name_of(project_dir):
+    """The `name:` from pubspec.yaml, used to resolve package: imports of the app itself"""
+    pubspec = os.path.join(project_dir, 'pubspec.yaml')
+    if os.path.exists(pubspec):
+        with open(pubspec, 'r', encoding='utf-8') as f:
+            for line in f:
+                match = re.match(r'name:\s*(\S+)', line)
+                if match:
+                    return match.group(1)
+    return None
+
+
+def dart_files(root):
+    """Every .dart file under root, sorted"""
+    found = []
+    for directory, _, names in os.walk(root):
+        found.extend(os.path.join(directory, name) for name in names if name.endswith(DART_EXTENSION))
+    return sorted(found)
+
+
+def is_widget_class(classes, name):
+    """True if the class extends a widget base, directly or via other app classes"""
+    seen = set()
+    while name in classes and name not in seen:
+        seen.add(name)
+        base = classes[name]['extends']
+        if base in WIDGET_BASES:
+            return True
+        name = base
+    return False
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Endpoint Router
+Maps concrete request URLs from traffic, logs and live events to the
+registry's endpoint keys ('METHOD /path/:param'), shared by the traffic
+analyzer, contract validator, metrics collector, caching proxy and startup
+waterfall.
+"""
+
+import functools
+import re
+
+URL_ORIGIN_RE = re.compile(r'^[a-z]+://[^/]+')
+ROUTE_CACHE_SIZE = 1 << 16
+
+
+class EndpointRouter:
+    """
+    Map concrete request URLs (full URLs or paths, with or without the /api base
+    path) to endpoint keys such as 'GET /profile/:id'. Literal paths win over
+    templates, and templates with fewer parameters win over more general ones.
+    """
+
+    def __init__(self, keys, base_path='/api'):
+        self.base_path = base_path.rstrip('/')
+        self._literal = {}
+        self._templates = {}
+        for key in keys:
+            method, path = key.split(' ', 1)
+            segments = path.strip('/').split('/')
+            if any(segment.startswith(':') for segment in segments):
+                self._templates.setdefault((method, len(segments)), []).append((segments, key))
+            else:
+                self._literal[(method, path.rstrip('/') or '/')] = key
+        for templates in self._templates.values():
+            templates.sort(key=lambda entry: sum(part.startswith(':') for part in entry[0]))
+        # Traffic repeats the same URLs heavily; memoize per instance
+        self.match = functools.lru_cache(maxsize=ROUTE_CACHE_SIZE)(self.match)
+
+    def path_of(self, url):
+        """Strip origin, query string and base path from a URL"""
+        path = URL_ORIGIN_RE.sub('', url.split('?', 1)[0]).rstrip('/') or '/'
+        if self.base_path and path.startswith(self.base_path + '/'):
+            path = path[len(self.base_path):]
+        return path
+
+    def match(self, method, url):
+        """Endpoint key for a request, or None if no registered endpoint matches"""
+        path = self.path_of(url)
+        method = method.upper()
+        key = self._literal.get((method, path))
+        if key is not None:
+            return key
+        segments = path.strip('/').split('/')
+        for template, key in self._templates.get((method, len(segments)), ()):
+            if all(part.startswith(':') or part == segment for part, segment in zip(template, segments)):
+                return key
+        return None
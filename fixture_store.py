@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+"""
+Synthetic Fixture Store for the Mock Backend
+Generates realistic users, profiles, image metadata, likes, matches and chat
+messages at million-user scale and writes them to a memory-mapped columnar
+store, so list and paginated endpoints can be served from realistic volumes
+instead of one canned example.
+
+Profiles follow the POST /complete-registration body: gender,
+preferred_genders, interests, music_genres, relation_goals, educations, jobs,
+languages, age preferences, height, weight, smoke/drink/gym, country, city
+and a location clustered around the city. Matches are mutual likes, likes
+include both directions of every match, and messages belong to matches.
+
+Columns are generated in bulk, with NumPy when it is installed and with the
+stdlib `random`/`array` modules otherwise (same distributions, different
+streams for the same seed). Each column is one little-endian file; list
+columns are offsets plus values, and likes, matches, images and messages are
+grouped by user or match with an offsets column (CSR), so a page of a user's
+matches or a chat's history is a contiguous slice of the mmap'd files.
+"""
+
+import json
+import mmap
+import os
+import random
+import sys
+from array import array
+from datetime import datetime, timezone
+from itertools import accumulate, chain
+from statistics import NormalDist
+
+from pipeline_metrics import count, stage
+
+DEFAULT_STORE = 'build/fixtures'
+DEFAULT_USERS = 1_000_000
+DEFAULT_SEED = 2024
+DEFAULT_LIKES_PER_USER = 8
+DEFAULT_MATCHES_PER_USER = 2
+DEFAULT_MESSAGES_PER_MATCH = 6
+DEFAULT_PER_PAGE = 20
+CHUNK = 1 << 16
+QUANTILES = 4096
+COMBINATION_POOL = 4096
+STORE_VERSION = 2
+REFERENCE_TIME = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+DAY = 86400
+MEDIA_BASE_URL = 'https://lg.abolfazlnajafi.com/storage/images'
+
+# Typecodes shared by array, memoryview.cast and the NumPy dtypes below
+NUMPY_TYPES = {'B': '<u1', 'H': '<u2', 'I': '<u4', 'i': '<i4', 'f': '<f4', 'Q': '<u8'}
+
+# Reference-data id ranges and list lengths for the complete-registration list fields
+LIST_FIELDS = {
+    'preferred_genders': {'ids': 5, 'lengths': (1, 2, 3), 'weights': (55, 30, 15)},
+    'interests': {'ids': 60, 'lengths': (3, 4, 5, 6, 7, 8), 'weights': (10, 20, 25, 20, 15, 10)},
+    'music_genres': {'ids': 24, 'lengths': (1, 2, 3, 4, 5), 'weights': (15, 30, 30, 15, 10)},
+    'relation_goals': {'ids': 6, 'lengths': (1, 2), 'weights': (70, 30)},
+    'educations': {'ids': 10, 'lengths': (1, 2), 'weights': (80, 20)},
+    'jobs': {'ids': 40, 'lengths': (1, 2), 'weights': (85, 15)},
+    'languages': {'ids': 30, 'lengths': (1, 2, 3), 'weights': (50, 35, 15)},
+}
+GENDERS = (1, 2, 3, 4, 5)
+GENDER_WEIGHTS = (38, 38, 12, 7, 5)
+# (country id, city id, name, latitude, longitude, weight)
+CITIES = (
+    (1, 1, 'Berlin', 52.520, 13.405, 9), (1, 2, 'Hamburg', 53.551, 9.994, 4),
+    (2, 3, 'Toronto', 43.653, -79.383, 8), (2, 4, 'Montreal', 45.502, -73.567, 5),
+    (3, 5, 'Amsterdam', 52.368, 4.904, 6), (4, 6, 'San Francisco', 37.775, -122.419, 8),
+    (4, 7, 'New York', 40.713, -74.006, 12), (4, 8, 'Los Angeles', 34.052, -118.244, 9),
+    (5, 9, 'Madrid', 40.417, -3.704, 6), (5, 10, 'Barcelona', 41.385, 2.173, 5),
+    (6, 11, 'London', 51.507, -0.128, 11), (6, 12, 'Manchester', 53.481, -2.243, 3),
+    (7, 13, 'Sydney', -33.869, 151.209, 6), (8, 14, 'Tehran', 35.689, 51.389, 5),
+    (9, 15, 'Sao Paulo', -23.551, -46.633, 7), (10, 16, 'Mexico City', 19.433, -99.133, 6),
+)
+LOCATION_SPREAD_DEG = 0.08
+NAMES = ('Alex', 'Sam', 'Jordan', 'Taylor', 'Riley', 'Casey', 'Morgan', 'Jamie', 'Avery', 'Quinn', 'Rowan', 'Skyler',
+         'Charlie', 'Dakota', 'Emerson', 'Finley', 'Harper', 'Hayden', 'Jesse', 'Kai', 'Logan', 'Parker', 'Reese',
+         'River', 'Sage', 'Shay', 'Blake', 'Cameron', 'Drew', 'Eden', 'Frankie', 'Gray', 'Indigo', 'Jules', 'Kendall',
+         'Lane', 'Marlowe', 'Noa', 'Oakley', 'Peyton', 'Remy', 'Robin', 'Sasha', 'Sidney', 'Tatum', 'Wren', 'Zion')
+WORDS = ('love', 'traveling', 'music', 'coffee', 'hiking', 'books', 'art', 'dancing', 'cooking', 'movies', 'yoga',
+         'pride', 'concerts', 'beach', 'cats', 'dogs', 'photography', 'gaming', 'brunch', 'theatre', 'running',
+         'climbing', 'wine', 'vinyl', 'poetry', 'road', 'trips', 'sunsets', 'drag', 'shows', 'karaoke', 'plants')
+CHAT_WORDS = ('hey', 'how', 'are', 'you', 'doing', 'today', 'coffee', 'this', 'weekend', 'sounds', 'great', 'love',
+              'that', 'movie', 'haha', 'really', 'want', 'to', 'meet', 'soon', 'what', 'about', 'dinner', 'yes',
+              'maybe', 'later', 'send', 'me', 'your', 'playlist', 'hike', 'sunday', 'morning', 'night')
+BIO_VARIANTS = 8192
+PHRASE_VARIANTS = 4096
+MESSAGE_TYPES = ('text', 'image', 'video', 'audio', 'file')
+MESSAGE_TYPE_WEIGHTS = (85, 8, 2, 4, 1)
+IMAGE_COUNTS = (1, 2, 3, 4, 5, 6)
+IMAGE_COUNT_WEIGHTS = (10, 20, 25, 20, 15, 10)
+IMAGE_SIZES = ((1080, 1350), (1080, 1080), (1440, 1800), (720, 900), (1170, 1560))
+LIKE, SUPERLIKE = 1, 2
+
+
+class PythonBackend:
+    """Bulk column generation with the stdlib random module, returning arrays"""
+
+    name = 'python'
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def ints(self, low, high, n, code):
+        return array(code, self.rng.choices(range(low, high + 1), k=n))
+
+    def weighted(self, values, weights, n, code):
+        return array(code, self.rng.choices(values, weights, k=n))
+
+    def normal(self, mean, sd, n, code, low, high):
+        # Sampled from a quantile table of the clipped distribution, so the per-value work stays in choices()
+        distribution = NormalDist(mean, sd)
+        table = [min(max(distribution.inv_cdf((i + 0.5) / QUANTILES), low), high) for i in range(QUANTILES)]
+        if code != 'f':
+            table = [round(value) for value in table]
+        return array(code, self.rng.choices(table, k=n))
+
+    def chance(self, probability, n):
+        rnd = self.rng.random
+        return array('B', (rnd() < probability for _ in range(n)))
+
+    def lists(self, n, ids, lengths, weights):
+        """
+        (counts, values): n sorted lists of distinct ids in 1..ids. Each list is
+        picked from a pool of COMBINATION_POOL random combinations of its length.
+        """
+        population = range(1, ids + 1)
+        pools = {length: [tuple(sorted(self.rng.sample(population, length))) for _ in range(COMBINATION_POOL)]
+                 for length in lengths}
+        choices = [pool for length in lengths for pool in pools[length]]
+        picked = self.rng.choices(range(len(choices)), [weight / COMBINATION_POOL for weight in weights
+                                                         for _ in range(COMBINATION_POOL)], k=n)
+        lists = list(map(choices.__getitem__, picked))
+        return array('B', map(len, lists)), array('B' if ids < 256 else 'H', chain.from_iterable(lists))
+
+    def geometric(self, mean, n, cap):
+        """Counts with the given mean (at least 1), capped"""
+        expovariate = self.rng.expovariate
+        return array('H', (min(cap, 1 + int(expovariate(1 / max(mean - 1, 1e-9)))) for _ in range(n)))
+
+    def offsets(self, counts, code='Q'):
+        return array(code, accumulate(counts, initial=0))
+
+    def repeat(self, values, counts, code):
+        result = array(code)
+        for value, times in zip(values, counts):
+            result.extend([value] * times)
+        return result
+
+    def positions(self, counts):
+        """0..count-1 for every group, concatenated"""
+        result = array('H')
+        for times in counts:
+            result.extend(range(times))
+        return result
+
+    def group_by(self, keys, groups, columns):
+        """Counting sort of the rows by key (0..groups-1): (offsets, reordered columns)"""
+        counts = [0] * groups
+        for key in keys:
+            counts[key] += 1
+        offsets = array('Q', accumulate(counts, initial=0))
+        cursor = list(offsets[:-1])
+        order = [0] * len(keys)
+        for row, key in enumerate(keys):
+            order[cursor[key]] = row
+            cursor[key] += 1
+        return offsets, [array(column.typecode, map(column.__getitem__, order)) for column in columns]
+
+    def concat(self, *parts):
+        result = array(parts[0].typecode)
+        for part in parts:
+            result.extend(part)
+        return result
+
+    def arange(self, n, code):
+        return array(code, range(n))
+
+    def combine(self, function, code, *columns):
+        """Elementwise function of columns (written with arithmetic only, so NumPy can run it on whole arrays)"""
+        return array(code, map(function, *columns))
+
+    def clip(self, values, low, high, code):
+        return array(code, (min(max(value, low), high) for value in values))
+
+    def lookup(self, table, indexes, code):
+        return array(code, map(table.__getitem__, indexes))
+
+    def total(self, values):
+        return sum(values)
+
+
+class NumpyBackend:
+    """The same primitives as PythonBackend, vectorised with NumPy"""
+
+    name = 'numpy'
+
+    def __init__(self, seed):
+        import numpy
+
+        self.np = numpy
+        self.rng = numpy.random.default_rng(seed)
+
+    def ints(self, low, high, n, code):
+        return self.rng.integers(low, high + 1, n).astype(NUMPY_TYPES[code])
+
+    def weighted(self, values, weights, n, code):
+        np = self.np
+        p = np.asarray(weights, dtype=float)
+        return self.rng.choice(np.asarray(values), n, p=p / p.sum()).astype(NUMPY_TYPES[code])
+
+    def normal(self, mean, sd, n, code, low, high):
+        values = self.np.clip(self.rng.normal(mean, sd, n), low, high)
+        return (values if code == 'f' else self.np.rint(values)).astype(NUMPY_TYPES[code])
+
+    def chance(self, probability, n):
+        return (self.rng.random(n) < probability).astype('<u1')
+
+    def lists(self, n, ids, lengths, weights):
+        np = self.np
+        counts = self.weighted(lengths, weights, n, 'B')
+        longest = max(lengths)
+        parts = []
+        for start in range(0, n, CHUNK):
+            chunk = counts[start:start + CHUNK]
+            # First `count` entries of a random permutation of the ids, per row
+            picked = np.argsort(self.rng.random((len(chunk), ids)), axis=1)[:, :longest] + 1
+            keep = np.arange(longest) < chunk[:, None]
+            picked = np.sort(np.where(keep, picked, ids + 1), axis=1)
+            parts.append(picked[np.arange(longest) < chunk[:, None]])
+        values = np.concatenate(parts) if parts else np.zeros(0)
+        return counts, values.astype('<u1' if ids < 256 else '<u2')
+
+    def geometric(self, mean, n, cap):
+        return self.np.minimum(cap, self.rng.geometric(1 / max(mean, 1), n)).astype('<u2')
+
+    def offsets(self, counts, code='Q'):
+        np = self.np
+        return np.concatenate(([0], np.cumsum(counts, dtype=np.uint64))).astype(NUMPY_TYPES[code])
+
+    def repeat(self, values, counts, code):
+        return self.np.repeat(self.np.asarray(values), self.np.asarray(counts, dtype=self.np.int64)) \
+            .astype(NUMPY_TYPES[code])
+
+    def positions(self, counts):
+        np = self.np
+        counts = np.asarray(counts, dtype=np.int64)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        return (np.arange(int(counts.sum())) - starts).astype('<u2')
+
+    def group_by(self, keys, groups, columns):
+        np = self.np
+        order = np.argsort(keys, kind='stable')
+        offsets = self.offsets(np.bincount(keys, minlength=groups))
+        return offsets, [column[order] for column in columns]
+
+    def concat(self, *parts):
+        return self.np.concatenate(parts)
+
+    def arange(self, n, code):
+        return self.np.arange(n, dtype=NUMPY_TYPES[code])
+
+    def combine(self, function, code, *columns):
+        np = self.np
+        wide = [column.astype(np.float64 if column.dtype.kind == 'f' else np.int64) for column in columns]
+        return np.asarray(function(*wide)).astype(NUMPY_TYPES[code])
+
+    def clip(self, values, low, high, code):
+        return self.np.clip(values.astype(self.np.int64), low, high).astype(NUMPY_TYPES[code])
+
+    def lookup(self, table, indexes, code):
+        return self.np.asarray(table)[indexes].astype(NUMPY_TYPES[code])
+
+    def total(self, values):
+        return int(values.sum())
+
+
+def make_backend(seed, prefer_numpy=True):
+    if prefer_numpy:
+        try:
+            return NumpyBackend(seed)
+        except ImportError:
+            pass
+    return PythonBackend(seed)
+
+
+class StoreWriter:
+    """Writes column files and builds the manifest"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tables = {}
+        os.makedirs(path, exist_ok=True)
+
+    def column(self, table, name, values, code=None):
+        code = code or getattr(values, 'typecode', None) or _code_of(values)
+        file_name = f'{table}.{name}.bin'
+        with open(os.path.join(self.path, file_name), 'wb') as f:
+            if isinstance(values, array) and sys.byteorder != 'little':
+                values = array(values.typecode, values)
+                values.byteswap()
+            values.tofile(f)
+        self.tables.setdefault(table, {'rows': None, 'columns': {}})['columns'][name] = {'type': code,
+                                                                                        'file': file_name}
+        count('bytes_written', len(values) * array(code).itemsize)
+
+    def rows(self, table, rows, **extra):
+        self.tables.setdefault(table, {'rows': None, 'columns': {}})['rows'] = rows
+        self.tables[table].update(extra)
+
+    def finish(self, meta, dictionaries):
+        manifest = dict(meta, version=STORE_VERSION, tables=self.tables, dictionaries=dictionaries)
+        temporary = os.path.join(self.path, f'manifest.json.{os.getpid()}.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temporary, os.path.join(self.path, 'manifest.json'))
+        return manifest
+
+
+def _code_of(values):
+    """array typecode for a NumPy array"""
+    for code, dtype in NUMPY_TYPES.items():
+        if values.dtype.str == dtype or values.dtype.str == dtype.replace('<', '|'):
+            return code
+    raise ValueError(f'unsupported column type {values.dtype}')
+
+
+def text_variants(rng, words, n, low, high):
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(low, high))).capitalize() for _ in range(n)]
+
+
+def generate(path, users=DEFAULT_USERS, seed=DEFAULT_SEED, likes_per_user=DEFAULT_LIKES_PER_USER,
+             matches_per_user=DEFAULT_MATCHES_PER_USER, messages_per_match=DEFAULT_MESSAGES_PER_MATCH,
+             prefer_numpy=True):
+    """Generate every table into a store directory; returns the manifest"""
+    backend = make_backend(seed, prefer_numpy)
+    writer = StoreWriter(path)
+    text_rng = random.Random(seed)
+    dictionaries = {
+        'names': list(NAMES),
+        'cities': [{'country_id': country, 'city_id': city, 'name': name, 'latitude': lat, 'longitude': lon}
+                   for country, city, name, lat, lon, _ in CITIES],
+        'bios': text_variants(text_rng, WORDS, BIO_VARIANTS, 3, 14),
+        'phrases': text_variants(text_rng, CHAT_WORDS, PHRASE_VARIANTS, 1, 16),
+        'message_types': list(MESSAGE_TYPES),
+    }
+
+    with stage('users'):
+        n = users
+        writer.rows('users', n)
+        writer.column('users', 'name_id', backend.ints(0, len(NAMES) - 1, n, 'B'))
+        writer.column('users', 'gender', backend.weighted(GENDERS, GENDER_WEIGHTS, n, 'B'))
+        ages = backend.normal(31, 8, n, 'B', 18, 75)
+        birth_offsets = backend.ints(0, 364, n, 'H')
+        # ceil(age * 365.25) days back plus under a year, so age() (365.25-day years) reads `age` back
+        birth_days = backend.combine(lambda age, offset: REFERENCE_TIME // DAY - (age * 1461 + 3) // 4 - offset, 'i',
+                                     ages, birth_offsets)
+        writer.column('users', 'birth_day', birth_days)  # days since 1970-01-01
+        writer.column('users', 'min_age_preference',
+                      backend.clip(backend.combine(lambda age: age - 8, 'i', ages), 18, 99, 'B'))
+        writer.column('users', 'max_age_preference',
+                      backend.clip(backend.combine(lambda age: age + 10, 'i', ages), 18, 99, 'B'))
+        writer.column('users', 'height', backend.normal(172, 10, n, 'B', 145, 210))
+        writer.column('users', 'weight', backend.normal(72, 13, n, 'B', 40, 150))
+        for flag, probability in (('smoke', 0.22), ('drink', 0.6), ('gym', 0.45)):
+            writer.column('users', flag, backend.chance(probability, n))
+        city_index = backend.weighted(range(len(CITIES)), [city[5] for city in CITIES], n, 'B')
+        writer.column('users', 'city_index', city_index)
+        writer.column('users', 'latitude', _jitter(backend, city_index, 3, n))
+        writer.column('users', 'longitude', _jitter(backend, city_index, 4, n))
+        writer.column('users', 'bio_id', backend.ints(0, BIO_VARIANTS - 1, n, 'H'))
+        created = backend.ints(REFERENCE_TIME - 730 * DAY, REFERENCE_TIME - DAY, n, 'I')
+        writer.column('users', 'created_at', created)
+        writer.column('users', 'last_active_at', backend.ints(REFERENCE_TIME - 30 * DAY, REFERENCE_TIME, n, 'I'))
+        for field, spec in LIST_FIELDS.items():
+            counts, values = backend.lists(n, spec['ids'], spec['lengths'], spec['weights'])
+            writer.column('users', f'{field}.offsets', backend.offsets(counts, 'I'))
+            writer.column('users', f'{field}.values', values)
+
+    with stage('images'):
+        counts = backend.weighted(IMAGE_COUNTS, IMAGE_COUNT_WEIGHTS, n, 'B')
+        offsets = backend.offsets(counts)
+        total = int(offsets[-1])
+        writer.rows('images', total, grouped_by='users')
+        writer.column('images', 'offsets', offsets)
+        writer.column('images', 'user_id', backend.repeat(range(1, n + 1), counts, 'I'))
+        writer.column('images', 'position', backend.positions(counts), 'H')
+        writer.column('images', 'size_index', backend.ints(0, len(IMAGE_SIZES) - 1, total, 'B'))
+        writer.column('images', 'bytes', backend.normal(260_000, 90_000, total, 'I', 40_000, 2_000_000))
+        dictionaries['image_sizes'] = [list(size) for size in IMAGE_SIZES]
+
+    with stage('matches'):
+        pairs = max(1, n * matches_per_user // 2)
+        first = backend.ints(1, n, pairs, 'I')
+        # Drawn from n - 1 ids and shifted past the first user, so nobody is matched with themselves
+        second = backend.combine(lambda a, b: b + (b >= a), 'I', first, backend.ints(1, n - 1, pairs, 'I'))
+        matched_at = backend.ints(REFERENCE_TIME - 365 * DAY, REFERENCE_TIME - 7 * DAY, pairs, 'I')
+        writer.rows('matches', pairs)
+        writer.column('matches', 'user_a', first)
+        writer.column('matches', 'user_b', second)
+        writer.column('matches', 'matched_at', matched_at)
+        # Both directions, grouped by user: a user's matches are one slice
+        match_ids = backend.arange(pairs, 'I')
+        users_side = backend.concat(first, second)
+        others_side = backend.concat(second, first)
+        keys = backend.combine(lambda user: user - 1, 'I', users_side)
+        offsets, (others, by_user_match) = backend.group_by(keys, n, [others_side,
+                                                                      backend.concat(match_ids, match_ids)])
+        writer.rows('user_matches', len(others), grouped_by='users')
+        writer.column('user_matches', 'offsets', offsets)
+        writer.column('user_matches', 'other_id', others)
+        writer.column('user_matches', 'match_id', by_user_match)
+        count('matches', pairs)
+
+    with stage('likes'):
+        extra = backend.normal(max(likes_per_user - matches_per_user, 0), 3, n, 'H', 0, 200)
+        extra_total = backend.total(extra)
+        likers = backend.concat(users_side, backend.repeat(range(1, n + 1), extra, 'I'))
+        targets = backend.concat(others_side, backend.ints(1, n, extra_total, 'I'))
+        rows = len(likers)
+        kinds = backend.weighted((LIKE, SUPERLIKE), (94, 6), rows, 'B')
+        liked_at = backend.ints(REFERENCE_TIME - 400 * DAY, REFERENCE_TIME, rows, 'I')
+        keys = backend.combine(lambda user: user - 1, 'I', likers)
+        offsets, (targets, kinds, liked_at) = backend.group_by(keys, n, [targets, kinds, liked_at])
+        writer.rows('likes', rows, grouped_by='users')
+        writer.column('likes', 'offsets', offsets)
+        writer.column('likes', 'target_id', targets)
+        writer.column('likes', 'kind', kinds)
+        writer.column('likes', 'created_at', liked_at)
+        count('likes', rows)
+
+    with stage('messages'):
+        counts = backend.geometric(messages_per_match, pairs, 500)
+        offsets = backend.offsets(counts)
+        total = int(offsets[-1])
+        writer.rows('messages', total, grouped_by='matches')
+        writer.column('messages', 'offsets', offsets)
+        position = backend.positions(counts)
+        start = backend.repeat(matched_at, counts, 'I')
+        gap = backend.ints(60, 6 * 3600, total, 'I')
+        # Sender is either side of the match; timestamps increase within a chat
+        from_first = backend.chance(0.5, total)
+        side_a = backend.repeat(first, counts, 'I')
+        side_b = backend.repeat(second, counts, 'I')
+        sent_at = backend.combine(lambda begin, index, jitter: begin + index * 6 * 3600 + jitter, 'I',
+                                  start, position, gap)
+        senders = backend.combine(lambda flag, a, b: a * flag + b * (1 - flag), 'I', from_first, side_a, side_b)
+        writer.column('messages', 'sender_id', senders)
+        writer.column('messages', 'sent_at', sent_at)
+        writer.column('messages', 'phrase_id', backend.ints(0, PHRASE_VARIANTS - 1, total, 'H'))
+        writer.column('messages', 'type', backend.weighted(range(len(MESSAGE_TYPES)), MESSAGE_TYPE_WEIGHTS, total,
+                                                           'B'))
+        writer.column('messages', 'is_read', backend.chance(0.85, total))
+        count('messages', total)
+
+    meta = {'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'backend': backend.name, 'seed': seed,
+            'users': n, 'reference_time': REFERENCE_TIME}
+    return writer.finish(meta, dictionaries)
+
+
+def _jitter(backend, city_index, coordinate, n):
+    centers = backend.lookup([city[coordinate] for city in CITIES], city_index, 'f')
+    noise = backend.normal(0.0, LOCATION_SPREAD_DEG, n, 'f', -1.0, 1.0)
+    return backend.combine(lambda center, offset: center + offset, 'f', centers, noise)
+
+
+class FixtureStore:
+    """
+    Read side: every column mmap'd and exposed as a memoryview (or a NumPy
+    array over the same buffer when NumPy is installed), plus the response
+    shapes the mock backend serves.
+    """
+
+    def __init__(self, path=DEFAULT_STORE, use_numpy=True):
+        with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != STORE_VERSION:
+            raise ValueError(f"{path} has store version {self.manifest.get('version')}, expected {STORE_VERSION}")
+        self.path = path
+        self.dictionaries = self.manifest['dictionaries']
+        self.users = self.manifest['users']
+        self.np = None
+        if use_numpy:
+            try:
+                import numpy
+                self.np = numpy
+            except ImportError:
+                pass
+        self._maps = []
+        self._columns = {}
+
+    def close(self):
+        self._columns.clear()
+        for handle, mapped in self._maps:
+            mapped.close()
+            handle.close()
+        self._maps.clear()
+
+    def rows(self, table):
+        return self.manifest['tables'][table]['rows']
+
+    def column(self, table, name):
+        key = (table, name)
+        if key not in self._columns:
+            spec = self.manifest['tables'][table]['columns'][name]
+            handle = open(os.path.join(self.path, spec['file']), 'rb')
+            if os.fstat(handle.fileno()).st_size == 0:
+                handle.close()
+                self._columns[key] = array(spec['type'])
+                return self._columns[key]
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append((handle, mapped))
+            if self.np is not None:
+                self._columns[key] = self.np.frombuffer(mapped, dtype=NUMPY_TYPES[spec['type']])
+            else:
+                self._columns[key] = memoryview(mapped).cast(spec['type'])
+            count('columns_mapped')
+        return self._columns[key]
+
+    def group(self, table, key_index):
+        """(start, end) row range of a CSR-grouped table for a 0-based user or match index"""
+        offsets = self.column(table, 'offsets')
+        return int(offsets[key_index]), int(offsets[key_index + 1])
+
+    def list_field(self, field, index):
+        offsets = self.column('users', f'{field}.offsets')
+        values = self.column('users', f'{field}.values')
+        return [int(value) for value in values[int(offsets[index]):int(offsets[index + 1])]]
+
+    def check_user(self, user_id):
+        if not 1 <= user_id <= self.users:
+            raise KeyError(f'user {user_id} not in the store (1..{self.users})')
+        return user_id - 1
+
+    def age(self, index):
+        return int((self.manifest['reference_time'] // DAY - int(self.column('users', 'birth_day')[index])) // 365.25)
+
+    def user(self, user_id):
+        """Profile with the complete-registration fields"""
+        index = self.check_user(user_id)
+        column = self.column
+        city = self.dictionaries['cities'][int(column('users', 'city_index')[index])]
+        profile = {
+            'id': user_id,
+            'name': self.dictionaries['names'][int(column('users', 'name_id')[index])],
+            'age': self.age(index),
+            'birth_date': datetime.fromtimestamp(int(column('users', 'birth_day')[index]) * DAY, timezone.utc)
+            .strftime('%Y-%m-%d'),
+            'gender': int(column('users', 'gender')[index]),
+            'country_id': city['country_id'],
+            'city_id': city['city_id'],
+            'city': city['name'],
+            'latitude': round(float(column('users', 'latitude')[index]), 6),
+            'longitude': round(float(column('users', 'longitude')[index]), 6),
+            'min_age_preference': int(column('users', 'min_age_preference')[index]),
+            'max_age_preference': int(column('users', 'max_age_preference')[index]),
+            'profile_bio': self.dictionaries['bios'][int(column('users', 'bio_id')[index])],
+            'height': int(column('users', 'height')[index]),
+            'weight': int(column('users', 'weight')[index]),
+            'smoke': bool(column('users', 'smoke')[index]),
+            'drink': bool(column('users', 'drink')[index]),
+            'gym': bool(column('users', 'gym')[index]),
+        }
+        for field in LIST_FIELDS:
+            profile[field] = self.list_field(field, index)
+        profile['images'] = self.images(user_id)
+        return profile
+
+    def images(self, user_id):
+        start, end = self.group('images', self.check_user(user_id))
+        sizes = self.dictionaries['image_sizes']
+        result = []
+        for row in range(start, end):
+            width, height = sizes[int(self.column('images', 'size_index')[row])]
+            position = int(self.column('images', 'position')[row])
+            result.append({'id': row + 1, 'url': f'{MEDIA_BASE_URL}/{user_id}/{position}.jpg', 'width': width,
+                           'height': height, 'bytes': int(self.column('images', 'bytes')[row]),
+                           'is_primary': position == 0})
+        return result
+
+    def summary(self, user_id):
+        """The MatchUser shape used in match lists"""
+        index = self.check_user(user_id)
+        city = self.dictionaries['cities'][int(self.column('users', 'city_index')[index])]
+        return {'id': user_id, 'name': self.dictionaries['names'][int(self.column('users', 'name_id')[index])],
+                'age': self.age(index), 'avatar_url': f'{MEDIA_BASE_URL}/{user_id}/0.jpg',
+                'profile_bio': self.dictionaries['bios'][int(self.column('users', 'bio_id')[index])],
+                'city': city['name']}
+
+    def message(self, row):
+        return {'message_id': row + 1, 'sender_id': int(self.column('messages', 'sender_id')[row]),
+                'message': self.dictionaries['phrases'][int(self.column('messages', 'phrase_id')[row])],
+                'message_type': self.dictionaries['message_types'][int(self.column('messages', 'type')[row])],
+                'sent_at': _iso(int(self.column('messages', 'sent_at')[row])),
+                'is_read': bool(self.column('messages', 'is_read')[row])}
+
+    def match_partner(self, match_id, user_id):
+        a = int(self.column('matches', 'user_a')[match_id])
+        return int(self.column('matches', 'user_b')[match_id]) if a == user_id else a
+
+    def matches_page(self, user_id, page=1, per_page=DEFAULT_PER_PAGE):
+        """GET /matching/matches for one user: newest matches first, with the last message"""
+        start, end = self.group('user_matches', self.check_user(user_id))
+        match_ids = [int(match_id) for match_id in self.column('user_matches', 'match_id')[start:end]]
+        matched_at = self.column('matches', 'matched_at')
+        match_ids.sort(key=lambda match_id: -int(matched_at[match_id]))
+        items = []
+        for match_id in _page_slice(match_ids, page, per_page):
+            first, last = self.group('messages', match_id)
+            items.append({'match_id': match_id + 1, 'user': self.summary(self.match_partner(match_id, user_id)),
+                          'matched_at': _iso(int(matched_at[match_id])),
+                          'last_message': _last_message(self.message(last - 1)) if last > first else None})
+        return {'status': True, 'data': items, 'pagination': _pagination(len(match_ids), page, per_page, 'total')}
+
+    def chat_history(self, user_id, other_id, page=1, per_page=50):
+        """GET /chat/history between two matched users, newest messages first"""
+        start, end = self.group('user_matches', self.check_user(user_id))
+        match_id = None
+        for row in range(start, end):
+            if int(self.column('user_matches', 'other_id')[row]) == other_id:
+                match_id = int(self.column('user_matches', 'match_id')[row])
+                break
+        if match_id is None:
+            return {'status': False, 'message': 'You can only view messages with users you have matched with'}
+        first, last = self.group('messages', match_id)
+        rows = range(last - 1, first - 1, -1)
+        messages = []
+        for row in _page_slice(rows, page, per_page):
+            message = self.message(row)
+            message['receiver_id'] = other_id if message['sender_id'] == user_id else user_id
+            messages.append(message)
+        return {'status': True, 'data': {'messages': messages,
+                                         'pagination': _pagination(len(rows), page, per_page, 'total_messages')}}
+
+    def likes_page(self, user_id, page=1, per_page=DEFAULT_PER_PAGE):
+        """Likes a user has given, newest first"""
+        start, end = self.group('likes', self.check_user(user_id))
+        created = self.column('likes', 'created_at')
+        rows = sorted(range(start, end), key=lambda row: -int(created[row]))
+        items = [{'like_id': row + 1, 'target_user_id': int(self.column('likes', 'target_id')[row]),
+                  'status': 'superlike' if int(self.column('likes', 'kind')[row]) == SUPERLIKE else 'like',
+                  'created_at': _iso(int(created[row]))} for row in _page_slice(rows, page, per_page)]
+        return {'status': True, 'data': items, 'pagination': _pagination(len(rows), page, per_page, 'total')}
+
+    def users_page(self, page=1, per_page=DEFAULT_PER_PAGE):
+        ids = range(1, self.users + 1)
+        return {'status': True, 'data': [self.summary(user_id) for user_id in _page_slice(ids, page, per_page)],
+                'pagination': _pagination(self.users, page, per_page, 'total')}
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000000Z')
+
+
+def _page_slice(items, page, per_page):
+    start = (max(page, 1) - 1) * per_page
+    return items[start:start + per_page]
+
+
+def _pagination(total, page, per_page, total_name):
+    return {'current_page': page, 'total_pages': max(1, -(-total // per_page)), total_name: total,
+            'per_page': per_page}
+
+
+def _last_message(message):
+    return {'id': message['message_id'], 'message': message['message'], 'sent_at': message['sent_at'],
+            'is_read': message['is_read']}
+
+
+def store_stats(path):
+    """Rows per table and bytes on disk"""
+    with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    tables = {}
+    for name, table in manifest['tables'].items():
+        size = sum(os.path.getsize(os.path.join(path, column['file'])) for column in table['columns'].values())
+        tables[name] = {'rows': table['rows'], 'bytes': size}
+    return {'backend': manifest['backend'], 'users': manifest['users'], 'tables': tables,
+            'bytes': sum(table['bytes'] for table in tables.values())}
+
+
+def print_stats(stats):
+    print(f"{stats['users']:,} users generated with the {stats['backend']} backend")
+    for name, table in stats['tables'].items():
+        print(f"  {name:13} {table['rows']:>13,} rows {table['bytes'] / (1 << 20):>9,.1f} MB")
+    print(f"  {'total':13} {'':>13} {stats['bytes'] / (1 << 20):>14,.1f} MB")
+
+
+QUERIES = {
+    'GET /matching/matches': lambda store, args: store.matches_page(args.user, args.page, args.per_page),
+    'GET /chat/history': lambda store, args: store.chat_history(args.user, args.other, args.page, args.per_page),
+    'GET /likes': lambda store, args: store.likes_page(args.user, args.page, args.per_page),
+    'GET /profile': lambda store, args: store.user(args.user),
+    'GET /users': lambda store, args: store.users_page(args.page, args.per_page),
+}
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Generate and query the synthetic fixture store')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('generate', help='generate the fixture store')
+    build.add_argument('--store', default=DEFAULT_STORE)
+    build.add_argument('-n', '--users', type=int, default=DEFAULT_USERS)
+    build.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    build.add_argument('--likes-per-user', type=float, default=DEFAULT_LIKES_PER_USER)
+    build.add_argument('--matches-per-user', type=int, default=DEFAULT_MATCHES_PER_USER)
+    build.add_argument('--messages-per-match', type=float, default=DEFAULT_MESSAGES_PER_MATCH)
+    build.add_argument('--no-numpy', action='store_true', help='use the stdlib backend even if NumPy is installed')
+    build.add_argument('-o', '--output', help='write table sizes as JSON')
+    add_metrics_arguments(build)
+
+    query = subparsers.add_parser('query', help='print a mock response served from the store')
+    query.add_argument('endpoint', choices=sorted(QUERIES))
+    query.add_argument('--store', default=DEFAULT_STORE)
+    query.add_argument('--user', type=int, default=1)
+    query.add_argument('--other', type=int, help='chat partner for GET /chat/history (default: first match)')
+    query.add_argument('--page', type=int, default=1)
+    query.add_argument('--per-page', type=int, default=DEFAULT_PER_PAGE)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        if args.users < 2:
+            print("Error: --users must be at least 2")
+            sys.exit(1)
+        started = time.perf_counter()
+        with metrics_session(args.metrics, args.profile):
+            generate(args.store, args.users, args.seed, args.likes_per_user, args.matches_per_user,
+                     args.messages_per_match, not args.no_numpy)
+        stats = store_stats(args.store)
+        stats['seconds'] = round(time.perf_counter() - started, 2)
+        print_stats(stats)
+        print(f"Generated in {stats['seconds']}s: {args.store}")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2)
+            print(f"Output file: {args.output}")
+        sys.exit(0)
+
+    if not os.path.exists(os.path.join(args.store, 'manifest.json')):
+        print(f"Error: {args.store} not found; run generate first")
+        sys.exit(1)
+    store = FixtureStore(args.store)
+    try:
+        if args.endpoint == 'GET /chat/history' and args.other is None:
+            start, end = store.group('user_matches', store.check_user(args.user))
+            if start == end:
+                print(f"Error: user {args.user} has no matches")
+                sys.exit(1)
+            args.other = int(store.column('user_matches', 'other_id')[start])
+        print(json.dumps(QUERIES[args.endpoint](store, args), indent=2))
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+    finally:
+        store.close()
@@ -2,6 +2,12 @@ import json
 import re
 from typing import Dict, List, Any, Optional
 
+from collection_cache import load_source_json
+from pipeline_metrics import count, metrics_session_from_argv, stage
+from response_store import ResponseExampleStore, inline_single_references, render_examples_section, render_reference
+
+GENERATED_SIZE_PREFIX = b'- **Documentation Generated:** '
+
 def extract_url_from_request(request: Dict) -> str:
     """Extract the full URL from a request object"""
     url_obj = request.get("url", {})
@@ -102,7 +108,13 @@ def format_response_example(json_body: Any, indent: int = 2) -> str:
     except:
         return str(json_body)
 
-def document_endpoint(endpoint: Dict, category_name: str) -> str:
+def example_block(text: str, examples: Optional[ResponseExampleStore] = None) -> str:
+    """Render a JSON example inline, or as a link into the shared example store"""
+    if examples is None:
+        return "```json\n" + text + "```\n\n"
+    return render_reference(examples.add(text))
+
+def document_endpoint(endpoint: Dict, category_name: str, examples: Optional[ResponseExampleStore] = None) -> str:
     """Document a single endpoint"""
     name = endpoint.get("name", "Unknown")
     request = endpoint.get("request", {})
@@ -124,6 +136,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
         doc += "**Request Body:**\n\n"
         doc += "```json\n"
         try:
+            count('json_parses')
             body_json = json.loads(body)
             doc += json.dumps(body_json, indent=2, ensure_ascii=False)
         except:
@@ -166,11 +179,10 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
             
             if resp_body:
                 try:
+                    count('json_parses')
                     resp_json = json.loads(resp_body)
                     doc += "**Response Structure:**\n\n"
-                    doc += "```json\n"
-                    doc += json.dumps(resp_json, indent=2, ensure_ascii=False)
-                    doc += "\n```\n\n"
+                    doc += example_block(json.dumps(resp_json, indent=2, ensure_ascii=False) + "\n", examples)
                     
                     # Analyze structure
                     structure = analyze_data_structure(resp_json)
@@ -197,9 +209,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
         if method == "GET":
             if "list" in url_lower or "history" in url_lower or "matches" in url_lower:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "Data retrieved successfully",\n  "data": {\n    "items": [],\n    "current_page": 1,\n    "per_page": 15,\n    "total": 0,\n    "last_page": 1\n  }\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "Data retrieved successfully",\n  "data": {\n    "items": [],\n    "current_page": 1,\n    "per_page": 15,\n    "total": 0,\n    "last_page": 1\n  }\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Response message\n"
@@ -210,9 +220,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
                 doc += "- `data.last_page` (integer) - Last page number\n\n"
             else:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "Data retrieved successfully",\n  "data": {}\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "Data retrieved successfully",\n  "data": {}\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Response message\n"
@@ -220,9 +228,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
         elif method == "POST":
             if "register" in url_lower:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "Registration successful! Please check your email for verification code.",\n  "data": {\n    "user_id": 1,\n    "email": "user@example.com",\n    "email_sent": true,\n    "resend_available_at": "2024-01-01 12:02:00",\n    "hourly_attempts_remaining": 2\n  }\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "Registration successful! Please check your email for verification code.",\n  "data": {\n    "user_id": 1,\n    "email": "user@example.com",\n    "email_sent": true,\n    "resend_available_at": "2024-01-01 12:02:00",\n    "hourly_attempts_remaining": 2\n  }\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Success message\n"
@@ -233,9 +239,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
                 doc += "- `data.hourly_attempts_remaining` (integer) - Remaining attempts\n\n"
             elif "login" in url_lower:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "Login successful",\n  "data": {\n    "user": {},\n    "token": "auth_token_here",\n    "token_type": "Bearer",\n    "profile_completed": true,\n    "needs_profile_completion": false,\n    "user_state": "ready_for_app"\n  }\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "Login successful",\n  "data": {\n    "user": {},\n    "token": "auth_token_here",\n    "token_type": "Bearer",\n    "profile_completed": true,\n    "needs_profile_completion": false,\n    "user_state": "ready_for_app"\n  }\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Success message\n"
@@ -247,9 +251,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
                 doc += "- `data.user_state` (string) - Current user state\n\n"
             elif "like" in url_lower or "superlike" in url_lower:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "User liked successfully",\n  "data": {\n    "like_id": 1,\n    "target_user_id": 2,\n    "status": "pending",\n    "is_match": false,\n    "created_at": "2024-01-01T12:00:00Z"\n  }\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "User liked successfully",\n  "data": {\n    "like_id": 1,\n    "target_user_id": 2,\n    "status": "pending",\n    "is_match": false,\n    "created_at": "2024-01-01T12:00:00Z"\n  }\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Success message\n"
@@ -259,14 +261,10 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
                 doc += "- `data.is_match` (boolean) - Whether it\'s a match\n"
                 doc += "- `data.created_at` (string) - Creation timestamp\n\n"
                 doc += "#### Match Response (200) - When Mutual Like Occurs\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "It\'s a match!",\n  "data": {\n    "is_match": true,\n    "match_id": 1,\n    "users": [\n      {"id": 1, "name": "User 1"},\n      {"id": 2, "name": "User 2"}\n    ],\n    "created_at": "2024-01-01T12:00:00Z"\n  }\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "It\'s a match!",\n  "data": {\n    "is_match": true,\n    "match_id": 1,\n    "users": [\n      {"id": 1, "name": "User 1"},\n      {"id": 2, "name": "User 2"}\n    ],\n    "created_at": "2024-01-01T12:00:00Z"\n  }\n}\n', examples)
             elif "send" in url_lower and "message" in url_lower:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "Message sent successfully",\n  "data": {\n    "message": {\n      "id": 1,\n      "chat_id": 1,\n      "sender_id": 1,\n      "receiver_id": 2,\n      "content": "Hello!",\n      "type": "text",\n      "created_at": "2024-01-01T12:00:00Z",\n      "read_at": null\n    }\n  }\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "Message sent successfully",\n  "data": {\n    "message": {\n      "id": 1,\n      "chat_id": 1,\n      "sender_id": 1,\n      "receiver_id": 2,\n      "content": "Hello!",\n      "type": "text",\n      "created_at": "2024-01-01T12:00:00Z",\n      "read_at": null\n    }\n  }\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Success message\n"
@@ -280,9 +278,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
                 doc += "- `data.message.read_at` (string|null) - Read timestamp\n\n"
             else:
                 doc += "#### Success Response (200)\n\n"
-                doc += "```json\n"
-                doc += '{\n  "status": true,\n  "message": "Operation successful",\n  "data": {}\n}\n'
-                doc += "```\n\n"
+                doc += example_block('{\n  "status": true,\n  "message": "Operation successful",\n  "data": {}\n}\n', examples)
                 doc += "**Response Fields:**\n\n"
                 doc += "- `status` (boolean) - Operation status\n"
                 doc += "- `message` (string) - Success message\n"
@@ -290,9 +286,7 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
             
             # Validation error for POST
             doc += "#### Validation Error Response (422)\n\n"
-            doc += "```json\n"
-            doc += '{\n  "status": false,\n  "message": "Validation error",\n  "errors": {\n    "field_name": ["The field name is required.", "The field name must be at least 3 characters."]\n  }\n}\n'
-            doc += "```\n\n"
+            doc += example_block('{\n  "status": false,\n  "message": "Validation error",\n  "errors": {\n    "field_name": ["The field name is required.", "The field name must be at least 3 characters."]\n  }\n}\n', examples)
             doc += "**Response Fields:**\n\n"
             doc += "- `status` (boolean) - Always false for errors\n"
             doc += "- `message` (string) - Error message\n"
@@ -300,22 +294,16 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
             
         elif method in ["PUT", "PATCH"]:
             doc += "#### Success Response (200)\n\n"
-            doc += "```json\n"
-            doc += '{\n  "status": true,\n  "message": "Updated successfully",\n  "data": {}\n}\n'
-            doc += "```\n\n"
+            doc += example_block('{\n  "status": true,\n  "message": "Updated successfully",\n  "data": {}\n}\n', examples)
             doc += "**Response Fields:**\n\n"
             doc += "- `status` (boolean) - Operation status\n"
             doc += "- `message` (string) - Success message\n"
             doc += "- `data` (object) - Updated data object\n\n"
             doc += "#### Validation Error Response (422)\n\n"
-            doc += "```json\n"
-            doc += '{\n  "status": false,\n  "message": "Validation error",\n  "errors": {\n    "field_name": ["Error message"]\n  }\n}\n'
-            doc += "```\n\n"
+            doc += example_block('{\n  "status": false,\n  "message": "Validation error",\n  "errors": {\n    "field_name": ["Error message"]\n  }\n}\n', examples)
         elif method == "DELETE":
             doc += "#### Success Response (200)\n\n"
-            doc += "```json\n"
-            doc += '{\n  "status": true,\n  "message": "Deleted successfully"\n}\n'
-            doc += "```\n\n"
+            doc += example_block('{\n  "status": true,\n  "message": "Deleted successfully"\n}\n', examples)
             doc += "**Response Fields:**\n\n"
             doc += "- `status` (boolean) - Operation status\n"
             doc += "- `message` (string) - Success message\n\n"
@@ -323,24 +311,18 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
         # Common error responses
         if auth_required:
             doc += "#### Unauthorized Response (401)\n\n"
-            doc += "```json\n"
-            doc += '{\n  "message": "Unauthenticated"\n}\n'
-            doc += "```\n\n"
+            doc += example_block('{\n  "message": "Unauthenticated"\n}\n', examples)
             doc += "**Response Fields:**\n\n"
             doc += "- `message` (string) - Error message indicating authentication is required\n\n"
         
         doc += "#### Not Found Response (404)\n\n"
-        doc += "```json\n"
-        doc += '{\n  "status": false,\n  "message": "Resource not found"\n}\n'
-        doc += "```\n\n"
+        doc += example_block('{\n  "status": false,\n  "message": "Resource not found"\n}\n', examples)
         doc += "**Response Fields:**\n\n"
         doc += "- `status` (boolean) - Always false for errors\n"
         doc += "- `message` (string) - Error message\n\n"
         
         doc += "#### Server Error Response (500)\n\n"
-        doc += "```json\n"
-        doc += '{\n  "status": false,\n  "message": "Internal server error",\n  "error": "Detailed error message"\n}\n'
-        doc += "```\n\n"
+        doc += example_block('{\n  "status": false,\n  "message": "Internal server error",\n  "error": "Detailed error message"\n}\n', examples)
         doc += "**Response Fields:**\n\n"
         doc += "- `status` (boolean) - Always false for errors\n"
         doc += "- `message` (string) - Error message\n"
@@ -350,26 +332,22 @@ def document_endpoint(endpoint: Dict, category_name: str) -> str:
 
 def parse_postman_collection(file_path: str) -> Dict:
     """Parse Postman collection file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with stage('load_collection'):
+        return load_source_json(file_path)
 
-def generate_markdown_documentation(collection_path: str, output_path: str):
-    """Generate complete API documentation markdown file"""
-    
-    print("Loading Postman collection...")
-    collection = parse_postman_collection(collection_path)
-    
-    items = collection.get("item", [])
-    base_url = "http://localhost:8000/api"  # Default from collection
-    
-    print(f"Found {len(items)} categories")
-    
-    doc = "# LGBTinder API - Complete Methods Documentation\n\n"
-    doc += f"**Generated from:** Postman Collection\n"
-    doc += f"**Base URL:** `{base_url}`\n"
-    doc += f"**Total Categories:** {len(items)}\n\n"
-    doc += "---\n\n"
-    
+def refresh_generated_size(data: bytes) -> bytes:
+    """Recompute the summary's character count after sections were patched in place"""
+    start = data.rfind(GENERATED_SIZE_PREFIX)
+    if start == -1:
+        return data
+    digits_start = start + len(GENERATED_SIZE_PREFIX)
+    digits_end = data.find(b' ', digits_start)
+    size = len(data[:start].decode('utf-8'))
+    return data[:digits_start] + str(size).encode() + data[digits_end:]
+
+def render_categories(items: List[Dict], examples: Optional[ResponseExampleStore] = None):
+    """Render every category and its endpoints; returns (markdown, endpoint count)"""
+    doc = ""
     total_endpoints = 0
     
     for category in items:
@@ -391,24 +369,55 @@ def generate_markdown_documentation(collection_path: str, output_path: str):
                     endpoint_count += 1
                     total_endpoints += 1
                     doc += f"- [ ] {sub_item.get('name', 'Unknown')} - `{sub_item.get('request', {}).get('method', 'GET')}` `{extract_url_from_request(sub_item.get('request', {}))}`\n"
-                    doc += document_endpoint(sub_item, subfolder_name)
+                    doc += document_endpoint(sub_item, subfolder_name, examples)
             else:
                 # It's an endpoint
                 endpoint_count += 1
                 total_endpoints += 1
                 doc += f"- [ ] {item.get('name', 'Unknown')} - `{item.get('request', {}).get('method', 'GET')}` `{extract_url_from_request(item.get('request', {}))}`\n"
-                doc += document_endpoint(item, category_name)
+                doc += document_endpoint(item, category_name, examples)
         
         doc += "\n---\n\n"
     
+    return doc, total_endpoints
+
+def generate_markdown_documentation(collection_path: str, output_path: str, shared_examples: bool = False):
+    """Generate complete API documentation markdown file"""
+    
+    print("Loading Postman collection...")
+    collection = parse_postman_collection(collection_path)
+    
+    items = collection.get("item", [])
+    base_url = "http://localhost:8000/api"  # Default from collection
+    
+    print(f"Found {len(items)} categories")
+    
+    doc = "# LGBTinder API - Complete Methods Documentation\n\n"
+    doc += f"**Generated from:** Postman Collection\n"
+    doc += f"**Base URL:** `{base_url}`\n"
+    doc += f"**Total Categories:** {len(items)}\n\n"
+    doc += "---\n\n"
+    
+    # With shared examples each unique response body is printed once in an appendix
+    examples = ResponseExampleStore() if shared_examples else None
+    
+    with stage('render_docs'):
+        categories_doc, total_endpoints = render_categories(items, examples)
+    doc += categories_doc
+    
     doc += f"\n## Summary\n\n"
     doc += f"- **Total Categories:** {len(items)}\n"
     doc += f"- **Total Endpoints:** {total_endpoints}\n"
     doc += f"- **Documentation Generated:** {len(doc)} characters\n"
+    if examples is not None:
+        doc = inline_single_references(doc, examples)
+        doc += render_examples_section(examples)
     
     print(f"Writing documentation to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(doc)
+    with stage('write_docs'):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(doc)
+        count('bytes_written', len(doc.encode('utf-8')))
     
     print("Documentation generated successfully!")
     print(f"Total endpoints documented: {total_endpoints}")
@@ -418,5 +427,6 @@ if __name__ == "__main__":
     collection_path = "LGBTinder_API_Postman_Collection_Updated.json"
     output_path = "All_API_Methods.md"
     
-    generate_markdown_documentation(collection_path, output_path)
+    with metrics_session_from_argv():
+        generate_markdown_documentation(collection_path, output_path)
 
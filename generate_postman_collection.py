@@ -1,6 +1,8 @@
 import json
 from datetime import datetime
 
+from pipeline_metrics import count, metrics_session_from_argv, stage
+
 def create_endpoint_item(name, method, path, description="", body=None, requires_auth=True):
     """Create a Postman request item"""
     url_parts = path.strip('/').split('/')
@@ -831,11 +833,20 @@ def create_postman_collection():
     
     return collection
 
-if __name__ == "__main__":
-    collection = create_postman_collection()
-    with open("LGBTinder_API_Postman_Collection_Complete.json", "w", encoding="utf-8") as f:
-        json.dump(collection, f, indent=2, ensure_ascii=False)
+def write_postman_collection(output_path):
+    """Create the Postman collection and write it to output_path"""
+    with stage("build_collection"):
+        collection = create_postman_collection()
+    with stage("write_collection"):
+        output = json.dumps(collection, indent=2, ensure_ascii=False)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output)
+        count("bytes_written", len(output.encode("utf-8")))
     print("Postman collection created successfully!")
     print(f"Total endpoints: {sum(len(folder['item']) for folder in collection['item'])}")
     print(f"Total categories: {len(collection['item'])}")
+    return collection
 
+if __name__ == "__main__":
+    with metrics_session_from_argv():
+        write_postman_collection("LGBTinder_API_Postman_Collection_Complete.json")
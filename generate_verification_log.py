@@ -4,15 +4,28 @@ Generate API Verification Log from Postman Collection
 Creates a tracking file for all API endpoints to verify against Flutter app implementation
 """
 
-import json
 import os
 from datetime import datetime
 
+import collection_cache
+from pipeline_metrics import count, load_json, metrics_session_from_argv, stage
+
+# Bump when extract_endpoints_from_collection output changes so cached endpoint lists are rebuilt
+ENDPOINTS_CACHE_VERSION = 1
+
 def extract_endpoints_from_postman(collection_path):
     """Extract all endpoints from Postman collection"""
-    with open(collection_path, 'r', encoding='utf-8') as f:
-        collection = json.load(f)
+    with stage('load_collection'):
+        if collection_cache.enabled():
+            # Normalized endpoint list is cached by collection hash
+            return collection_cache.load_derived(collection_path, 'endpoints', extract_endpoints_from_collection,
+                                                 ENDPOINTS_CACHE_VERSION)
+        collection = load_json(collection_path)
     
+    return extract_endpoints_from_collection(collection)
+
+def extract_endpoints_from_collection(collection):
+    """Extract all endpoints from an already parsed Postman collection"""
     endpoints = []
     
     def process_item(item, category_name=""):
@@ -90,6 +103,36 @@ def extract_endpoints_from_postman(collection_path):
     
     return endpoints
 
+def render_endpoint_section(endpoint):
+    """Render the log lines for one endpoint, from its header to the closing rule"""
+    method = endpoint['method']
+    path = endpoint['path']
+    name = endpoint['name']
+    auth = "🔒" if endpoint['auth_required'] else "🔓"
+    desc = endpoint['description']
+    
+    lines = []
+    lines.append(f"### {method} {path} {auth}")
+    lines.append("")
+    lines.append(f"**Name:** {name}")
+    if desc:
+        lines.append(f"**Description:** {desc}")
+    lines.append("")
+    lines.append("**Status:** 📝 Review Needed")
+    lines.append("")
+    lines.append("**Location in App:** _To be determined_")
+    lines.append("")
+    lines.append("**Notes:**")
+    lines.append("")
+    lines.append("- [ ] Check if endpoint is used in app")
+    lines.append("- [ ] Verify request body matches API spec")
+    lines.append("- [ ] Verify response handling matches API spec")
+    lines.append("- [ ] Test endpoint with actual API")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    return lines
+
 def generate_verification_log(endpoints, output_path):
     """Generate markdown verification log file"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -142,31 +185,7 @@ def generate_verification_log(endpoints, output_path):
         lines.append("")
         
         for endpoint in category_endpoints:
-            method = endpoint['method']
-            path = endpoint['path']
-            name = endpoint['name']
-            auth = "🔒" if endpoint['auth_required'] else "🔓"
-            desc = endpoint['description']
-            
-            lines.append(f"### {method} {path} {auth}")
-            lines.append("")
-            lines.append(f"**Name:** {name}")
-            if desc:
-                lines.append(f"**Description:** {desc}")
-            lines.append("")
-            lines.append("**Status:** 📝 Review Needed")
-            lines.append("")
-            lines.append("**Location in App:** _To be determined_")
-            lines.append("")
-            lines.append("**Notes:**")
-            lines.append("")
-            lines.append("- [ ] Check if endpoint is used in app")
-            lines.append("- [ ] Verify request body matches API spec")
-            lines.append("- [ ] Verify response handling matches API spec")
-            lines.append("- [ ] Test endpoint with actual API")
-            lines.append("")
-            lines.append("---")
-            lines.append("")
+            lines.extend(render_endpoint_section(endpoint))
             total_review += 1
     
     lines.append("")
@@ -183,8 +202,11 @@ def generate_verification_log(endpoints, output_path):
     lines.append("")
     
     # Write to file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    with stage('write_log'):
+        output = '\n'.join(lines)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+        count('bytes_written', len(output.encode('utf-8')))
     
     print(f"Verification log generated successfully!")
     print(f"Total endpoints: {len(endpoints)}")
@@ -198,7 +220,8 @@ if __name__ == '__main__':
         print(f"Error: Postman collection not found at {collection_path}")
         exit(1)
     
-    endpoints = extract_endpoints_from_postman(collection_path)
-    generate_verification_log(endpoints, output_path)
+    with metrics_session_from_argv():
+        endpoints = extract_endpoints_from_postman(collection_path)
+        generate_verification_log(endpoints, output_path)
 
 
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Geospatial Index for the Location-based Matching Endpoints
+Grid index over the fixture store's user locations, serving the radius and
+k-nearest queries behind GET /matching/nearby-suggestions and
+GET /matching/location-based with the requesting user's filters (age
+preference, preferred genders).
+
+Users are bucketed by (lat/lon grid cell, gender) and sorted by birth day
+inside each bucket, so the gender filter skips whole buckets, the age filter
+is two bisections per bucket, and only the remaining candidates are measured
+(haversine). Radius queries visit the cells overlapping the query's bounding
+box; k-nearest queries double the radius until k users are found. The
+distance scan runs vectorised with NumPy when it is installed and as a plain
+loop over `array` columns otherwise, with identical results.
+
+The bench command builds the index at several cell sizes and reports build
+time and index memory against query latency, checking that every cell size
+returns the same users.
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from fixture_store import DAY, DEFAULT_STORE, GENDERS, FixtureStore
+from pipeline_metrics import count, stage
+from traffic_analyzer import LatencyHistogram
+
+DEFAULT_CELL_DEG = 0.1
+DEFAULT_BENCH_CELLS = (0.02, 0.05, 0.1, 0.25, 1.0)
+DEFAULT_RADIUS_KM = 25.0
+DEFAULT_K = 20
+DEFAULT_QUERIES = 200
+DEFAULT_SEED = 7
+DEFAULT_PER_PAGE = 20
+EARTH_RADIUS_KM = 6371.0088
+GENDER_SLOTS = 8  # bucket key = cell * GENDER_SLOTS + gender
+# Birth days (days since 1970, negative before) packed below the bucket key for the build sort
+BIRTH_BITS = 17
+BIRTH_OFFSET = 1 << 16
+YEAR_DAYS = 365.25
+
+
+def birth_range(min_age, max_age, reference_day):
+    """(oldest, youngest) birth day of users whose age, as the store computes it, is in min_age..max_age"""
+    return (math.floor(reference_day - (max_age + 1) * YEAR_DAYS) + 1,
+            math.floor(reference_day - min_age * YEAR_DAYS))
+
+
+class GridIndex:
+    """
+    Users in (cell, gender) buckets, rows sorted by bucket then birth day, with
+    the query columns (radians, cos(latitude), birth day, user id) stored in
+    that order so a bucket's age range is one contiguous slice.
+    """
+
+    def __init__(self, latitude, longitude, gender, birth_day, cell_deg=DEFAULT_CELL_DEG, np=None):
+        if not 0 < cell_deg <= 180:
+            raise ValueError(f'cell size must be in (0, 180] degrees, got {cell_deg}')
+        self.cell_deg = cell_deg
+        self.lat_cells = math.ceil(180 / cell_deg)
+        self.lon_cells = math.ceil(360 / cell_deg)
+        self.np = np
+        self.scanned = 0
+        with stage('index_build'):
+            if np is None:
+                self._build_python(latitude, longitude, gender, birth_day)
+            else:
+                self._build_numpy(latitude, longitude, gender, birth_day)
+        self.occupied = sorted({key // GENDER_SLOTS for key in self.buckets})
+        count('users_indexed', len(self.ids))
+
+    @classmethod
+    def from_store(cls, store, cell_deg=DEFAULT_CELL_DEG):
+        column = store.column
+        return cls(column('users', 'latitude'), column('users', 'longitude'), column('users', 'gender'),
+                   column('users', 'birth_day'), cell_deg, store.np)
+
+    def _build_python(self, latitude, longitude, gender, birth_day):
+        cell_deg, lon_cells, top = self.cell_deg, self.lon_cells, self.lat_cells - 1
+        keys = [(min(int((lat + 90) / cell_deg), top) * lon_cells + int((lon + 180) / cell_deg) % lon_cells)
+                * GENDER_SLOTS + value for lat, lon, value in zip(latitude, longitude, gender)]
+        sort_keys = [(key << BIRTH_BITS) | (born + BIRTH_OFFSET) for key, born in zip(keys, birth_day)]
+        order = sorted(range(len(keys)), key=sort_keys.__getitem__)
+        sorted_keys = [keys[row] for row in order]
+        starts = [position for position in range(len(order))
+                  if position == 0 or sorted_keys[position] != sorted_keys[position - 1]]
+        self.buckets = {sorted_keys[start]: (start, end) for start, end in zip(starts, starts[1:] + [len(order)])}
+        self.ids = array('I', (row + 1 for row in order))
+        self.lat_rad = array('d', (math.radians(latitude[row]) for row in order))
+        self.lon_rad = array('d', (math.radians(longitude[row]) for row in order))
+        self.cos_lat = array('d', map(math.cos, self.lat_rad))
+        self.birth_day = array('i', (birth_day[row] for row in order))
+
+    def _build_numpy(self, latitude, longitude, gender, birth_day):
+        np = self.np
+        lat = np.asarray(latitude, dtype=np.float64)
+        lon = np.asarray(longitude, dtype=np.float64)
+        born = np.asarray(birth_day, dtype=np.int64)
+        cells = (np.minimum(((lat + 90) / self.cell_deg).astype(np.int64), self.lat_cells - 1) * self.lon_cells
+                 + ((lon + 180) / self.cell_deg).astype(np.int64) % self.lon_cells)
+        keys = cells * GENDER_SLOTS + np.asarray(gender, dtype=np.int64)
+        order = np.argsort((keys << BIRTH_BITS) | (born + BIRTH_OFFSET), kind='stable')
+        sorted_keys = keys[order]
+        unique, starts = np.unique(sorted_keys, return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self.buckets = dict(zip(unique.tolist(), zip(starts.tolist(), ends.tolist())))
+        self.ids = (order + 1).astype(np.uint32)
+        self.lat_rad = np.radians(lat[order])
+        self.lon_rad = np.radians(lon[order])
+        self.cos_lat = np.cos(self.lat_rad)
+        self.birth_day = born[order].astype(np.int32)
+
+    def nbytes(self):
+        """Column bytes plus the bucket table"""
+        columns = sum(memoryview(values).nbytes
+                      for values in (self.ids, self.lat_rad, self.lon_rad, self.cos_lat, self.birth_day))
+        buckets = sys.getsizeof(self.buckets) + sum(sys.getsizeof(key) + sys.getsizeof(bounds) + 2 * 28
+                                                    for key, bounds in self.buckets.items())
+        return columns + buckets + sys.getsizeof(self.occupied) + 28 * len(self.occupied)
+
+    def cells(self, latitude, longitude, radius_km):
+        """Ids of the occupied cells overlapping the bounding box of the circle"""
+        angle = min(radius_km / EARTH_RADIUS_KM, math.pi)
+        dlat = math.degrees(angle)
+        low = max(math.floor((latitude - dlat + 90) / self.cell_deg), 0)
+        high = min(math.floor((latitude + dlat + 90) / self.cell_deg), self.lat_cells - 1)
+        columns = None
+        # Longitude bounds of a spherical cap; a cap over a pole spans every longitude
+        if latitude - dlat > -90 and latitude + dlat < 90 and math.sin(angle) < math.cos(math.radians(latitude)):
+            dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+            first = math.floor((longitude - dlon + 180) / self.cell_deg)
+            last = math.floor((longitude + dlon + 180) / self.cell_deg)
+            if last - first + 1 < self.lon_cells:
+                columns = sorted({column % self.lon_cells for column in range(first, last + 1)})
+        width = self.lon_cells if columns is None else len(columns)
+        if (high - low + 1) * width > len(self.occupied):
+            # Wide searches: filter the occupied cells instead of enumerating the box
+            wanted = None if columns is None else set(columns)
+            return [cell for cell in self.occupied if low <= cell // self.lon_cells <= high
+                    and (wanted is None or cell % self.lon_cells in wanted)]
+        return [row * self.lon_cells + column for row in range(low, high + 1)
+                for column in (range(self.lon_cells) if columns is None else columns)]
+
+    def ranges(self, cells, genders=GENDERS, born=None):
+        """Row ranges of the candidates in the cells: gender buckets, narrowed to the birth-day range"""
+        buckets, birth_day = self.buckets, self.birth_day
+        for cell in cells:
+            for gender in genders:
+                bounds = buckets.get(cell * GENDER_SLOTS + gender)
+                if bounds is None:
+                    continue
+                start, end = bounds
+                if born is not None:
+                    start = bisect_left(birth_day, born[0], start, end)
+                    end = bisect_right(birth_day, born[1], start, end)
+                if start < end:
+                    yield start, end
+
+    def radius(self, latitude, longitude, radius_km, genders=GENDERS, born=None, exclude=None, limit=None):
+        """[(distance km, user id)] within radius_km, nearest first (ties by id)"""
+        angle = min(radius_km / EARTH_RADIUS_KM, math.pi)
+        # Compare in haversine space: hav(d/R) is monotonic in d
+        threshold = math.sin(angle / 2) ** 2
+        ranges = list(self.ranges(self.cells(latitude, longitude, radius_km), genders, born))
+        scan = self._scan_python if self.np is None else self._scan_numpy
+        hits = scan(ranges, math.radians(latitude), math.radians(longitude), threshold)
+        hits.sort()
+        if exclude is not None:
+            hits = [hit for hit in hits if hit[1] != exclude]
+        return [(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(value)), user_id) for value, user_id in hits[:limit]]
+
+    def nearest(self, latitude, longitude, k=DEFAULT_K, genders=GENDERS, born=None, exclude=None):
+        """The k nearest users passing the filters: radius queries from one cell width, doubling"""
+        radius_km = self.cell_deg * EARTH_RADIUS_KM * math.pi / 180 / 2
+        while True:
+            hits = self.radius(latitude, longitude, radius_km, genders, born, exclude, k)
+            if len(hits) >= k or radius_km >= math.pi * EARTH_RADIUS_KM:
+                return hits
+            radius_km *= 2
+
+    def _scan_python(self, ranges, lat0, lon0, threshold):
+        lat_rad, lon_rad, cos_lat, ids = self.lat_rad, self.lon_rad, self.cos_lat, self.ids
+        sin, cos0 = math.sin, math.cos(lat0)
+        hits = []
+        for start, end in ranges:
+            self.scanned += end - start
+            for row in range(start, end):
+                value = sin((lat_rad[row] - lat0) / 2) ** 2 + cos0 * cos_lat[row] * sin((lon_rad[row] - lon0) / 2) ** 2
+                if value <= threshold:
+                    hits.append((value, ids[row]))
+        return hits
+
+    def _scan_numpy(self, ranges, lat0, lon0, threshold):
+        np = self.np
+        if not ranges:
+            return []
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        self.scanned += len(rows)
+        values = (np.sin((self.lat_rad[rows] - lat0) / 2) ** 2
+                  + math.cos(lat0) * self.cos_lat[rows] * np.sin((self.lon_rad[rows] - lon0) / 2) ** 2)
+        keep = values <= threshold
+        return list(zip(values[keep].tolist(), self.ids[rows[keep]].tolist()))
+
+
+def user_filters(store, user_id):
+    """(latitude, longitude, preferred genders, birth-day range) of a user's own search"""
+    index = store.check_user(user_id)
+    column = store.column
+    born = birth_range(int(column('users', 'min_age_preference')[index]),
+                       int(column('users', 'max_age_preference')[index]), store.manifest['reference_time'] // DAY)
+    return (float(column('users', 'latitude')[index]), float(column('users', 'longitude')[index]),
+            tuple(store.list_field('preferred_genders', index)), born)
+
+
+def _suggestion(store, distance, user_id):
+    return dict(store.summary(user_id), distance_km=round(distance, 2))
+
+
+def nearby_suggestions(store, index, user_id, radius_km=DEFAULT_RADIUS_KM, page=1, per_page=DEFAULT_PER_PAGE):
+    """GET /matching/nearby-suggestions: users within radius_km matching the user's preferences, nearest first"""
+    latitude, longitude, genders, born = user_filters(store, user_id)
+    hits = index.radius(latitude, longitude, radius_km, genders, born, exclude=user_id)
+    start = (max(page, 1) - 1) * per_page
+    return {'status': True, 'data': [_suggestion(store, distance, other) for distance, other in
+                                     hits[start:start + per_page]],
+            'pagination': {'current_page': page, 'total_pages': max(1, -(-len(hits) // per_page)),
+                           'total': len(hits), 'per_page': per_page, 'radius_km': radius_km}}
+
+
+def location_based(store, index, user_id, k=DEFAULT_K):
+    """GET /matching/location-based: the k nearest users matching the user's preferences, at any distance"""
+    latitude, longitude, genders, born = user_filters(store, user_id)
+    hits = index.nearest(latitude, longitude, k, genders, born, exclude=user_id)
+    return {'status': True, 'data': [_suggestion(store, distance, other) for distance, other in hits]}
+
+
+def bench(store, cell_sizes=DEFAULT_BENCH_CELLS, queries=DEFAULT_QUERIES, radius_km=DEFAULT_RADIUS_KM, k=DEFAULT_K,
+          seed=DEFAULT_SEED):
+    """
+    Build the index at each cell size and time the same radius and k-nearest
+    queries (random users searching with their own preferences) on each.
+    """
+    rng = random.Random(seed)
+    origins = [user_filters(store, rng.randint(1, store.users)) for _ in range(queries)]
+    results = []
+    reference = None
+    for cell_deg in cell_sizes:
+        started = time.perf_counter()
+        index = GridIndex.from_store(store, cell_deg)
+        build_seconds = time.perf_counter() - started
+        radius_ms, nearest_ms = LatencyHistogram(), LatencyHistogram()
+        answers = []
+        with stage('radius_queries'):
+            for latitude, longitude, genders, born in origins:
+                started = time.perf_counter()
+                hits = index.radius(latitude, longitude, radius_km, genders, born)
+                radius_ms.add((time.perf_counter() - started) * 1000)
+                answers.append([user_id for _, user_id in hits])
+        scanned = index.scanned
+        with stage('nearest_queries'):
+            for latitude, longitude, genders, born in origins:
+                started = time.perf_counter()
+                hits = index.nearest(latitude, longitude, k, genders, born)
+                nearest_ms.add((time.perf_counter() - started) * 1000)
+                answers.append([user_id for _, user_id in hits])
+        if reference is None:
+            reference = answers
+        results.append({
+            'cell_deg': cell_deg,
+            'build_seconds': round(build_seconds, 3),
+            'index_bytes': index.nbytes(),
+            'buckets': len(index.buckets),
+            'candidates_per_radius_query': round(scanned / max(queries, 1)),
+            'results_per_radius_query': round(sum(map(len, answers[:queries])) / max(queries, 1), 1),
+            'radius_ms': radius_ms.summary(3),
+            'nearest_ms': nearest_ms.summary(3),
+            'mismatches': sum(1 for mine, expected in zip(answers, reference) if mine != expected),
+        })
+        count('indexes_benchmarked')
+    return {'users': store.users, 'backend': 'numpy' if store.np is not None else 'python', 'queries': queries,
+            'radius_km': radius_km, 'k': k, 'indexes': results}
+
+
+def print_bench(report):
+    print(f"{report['users']:,} users, {report['queries']} queries per kind ({report['backend']} backend), "
+          f"radius {report['radius_km']:g} km, k={report['k']}")
+    print(f"  {'cell':>6} {'build':>8} {'memory':>9} {'candidates':>11}  {'radius p50/p99 ms':>18}"
+          f"  {'k-nearest p50/p99 ms':>21}")
+    for row in report['indexes']:
+        radius, nearest = row['radius_ms'], row['nearest_ms']
+        flag = f"  {row['mismatches']} MISMATCHED" if row['mismatches'] else ''
+        print(f"  {row['cell_deg']:>5g}° {row['build_seconds']:>7.2f}s {row['index_bytes'] / (1 << 20):>7.1f}MB "
+              f"{row['candidates_per_radius_query']:>11,}  {radius.get('p50', 0):>8.3f}/{radius.get('p99', 0):<9.3f}"
+              f"  {nearest.get('p50', 0):>10.3f}/{nearest.get('p99', 0):<10.3f}{flag}")
+
+
+QUERIES = {
+    'GET /matching/nearby-suggestions':
+        lambda store, index, args: nearby_suggestions(store, index, args.user, args.radius, args.page, args.per_page),
+    'GET /matching/location-based': lambda store, index, args: location_based(store, index, args.user, args.k),
+}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Spatial index for the location-based matching endpoints')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    measure = subparsers.add_parser('bench', help='query latency against index build time and memory')
+    measure.add_argument('--store', default=DEFAULT_STORE)
+    measure.add_argument('--cell', type=float, nargs='+', default=list(DEFAULT_BENCH_CELLS),
+                         help='grid cell sizes in degrees')
+    measure.add_argument('-q', '--queries', type=int, default=DEFAULT_QUERIES)
+    measure.add_argument('--radius', type=float, default=DEFAULT_RADIUS_KM, help='radius query size in km')
+    measure.add_argument('-k', type=int, default=DEFAULT_K)
+    measure.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    measure.add_argument('--no-numpy', action='store_true', help='use the stdlib scan even if NumPy is installed')
+    measure.add_argument('-o', '--output', help='write the report as JSON')
+    add_metrics_arguments(measure)
+
+    query = subparsers.add_parser('query', help='print a mock response served from the index')
+    query.add_argument('endpoint', choices=sorted(QUERIES))
+    query.add_argument('--store', default=DEFAULT_STORE)
+    query.add_argument('--user', type=int, default=1)
+    query.add_argument('--radius', type=float, default=DEFAULT_RADIUS_KM)
+    query.add_argument('-k', type=int, default=DEFAULT_K)
+    query.add_argument('--cell', type=float, default=DEFAULT_CELL_DEG, help='grid cell size in degrees')
+    query.add_argument('--page', type=int, default=1)
+    query.add_argument('--per-page', type=int, default=DEFAULT_PER_PAGE)
+    query.add_argument('--no-numpy', action='store_true')
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.store, 'manifest.json')):
+        print(f"Error: {args.store} not found; run fixture_store.py generate first")
+        sys.exit(1)
+    cells = args.cell if args.command == 'bench' else [args.cell]
+    if any(not 0 < cell <= 180 for cell in cells):
+        print("Error: --cell must be in (0, 180] degrees")
+        sys.exit(1)
+    store = FixtureStore(args.store, use_numpy=not args.no_numpy)
+    try:
+        if args.command == 'bench':
+            with metrics_session(args.metrics, args.profile):
+                report = bench(store, args.cell, args.queries, args.radius, args.k, args.seed)
+            print_bench(report)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2)
+                print(f"Output file: {args.output}")
+        else:
+            index = GridIndex.from_store(store, args.cell)
+            print(json.dumps(QUERIES[args.endpoint](store, index, args), indent=2))
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+    finally:
+        store.close()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Used-icon Tree Shaking for the SVG Icon Set
+Scans lib/ for references to assets/icons/... SVGs (interpolated paths are
+expanded as wildcards), minifies only the referenced icons (number precision,
+path data, default attributes, whitespace), dedupes identical results by
+content hash and writes:
+  - the surviving icons under a single output directory,
+  - an SVG sprite sheet of <symbol> elements,
+  - a Dart lookup table (AppIcons) of constants plus a map from the original
+    asset paths, so call sites can be migrated mechanically,
+and prints the pubspec asset entries that replace the per-style directories.
+
+Minification results are cached by source content hash, and cache misses run
+in a process pool (useful with --all, which processes the whole icon set).
+An icon font is not generated: most styles are stroke-based, and glyphs need
+filled outlines, so the sprite is the packed format.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from dart_source import dart_files
+from pipeline_metrics import cache, count, stage
+
+DEFAULT_LIB = 'lib'
+DEFAULT_ICON_ROOT = 'assets/icons'
+DEFAULT_OUTPUT = 'assets/icons/used'
+DEFAULT_SPRITE = 'assets/icons/used/sprite.svg'
+DEFAULT_DART = 'lib/generated/app_icons.dart'
+DEFAULT_CACHE_DIR = '.build_cache/icons'
+DEFAULT_PRECISION = 2
+PARALLEL_THRESHOLD = 200
+CACHE_VERSION = 1
+
+ICON_REF_RE = re.compile(r"""['"](assets/icons/[^'"\s]+?\.svg)['"]""")
+INTERPOLATION_RE = re.compile(r'\$\{[^}]*\}|\$\w+')
+NUMBER_RE = re.compile(r'-?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?')
+NUMERIC_ATTRIBUTES = ('d', 'points', 'x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry', 'width',
+                      'height', 'stroke-width', 'opacity', 'transform', 'viewBox')
+NUMERIC_ATTRIBUTE_RE = re.compile(r'\s(' + '|'.join(re.escape(name) for name in NUMERIC_ATTRIBUTES) + r')="([^"]*)"')
+DEFAULT_ATTRIBUTE_RE = re.compile(r'\s(?:(?:fill-opacity|stroke-opacity|opacity)="1"|version="[^"]*"|'
+                                  r'xml:space="[^"]*"|fill-rule="nonzero"|clip-rule="nonzero")')
+HEX_COLOR_RE = re.compile(r'#([0-9a-fA-F]{6})\b')
+SVG_OPEN_RE = re.compile(r'<svg\b([^>]*)>')
+VIEWBOX_RE = re.compile(r'viewBox="([^"]*)"')
+
+
+def _format_number(match, precision):
+    value = round(float(match.group(0)), precision)
+    if value == int(value):
+        return str(int(value))
+    text = f'{value:.{precision}f}'.rstrip('0')
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def round_numbers(value, precision):
+    return NUMBER_RE.sub(lambda match: _format_number(match, precision), value)
+
+
+def compact_path(d):
+    """Drop the separators path data does not need"""
+    d = re.sub(r'[\s,]+', ' ', d.strip())
+    d = re.sub(r' ?([A-Za-z]) ?', r'\1', d)
+    return re.sub(r' (?=-)', '', d)
+
+
+def _short_color(match):
+    digits = match.group(1).lower()
+    if digits[0] == digits[1] and digits[2] == digits[3] and digits[4] == digits[5]:
+        return '#' + digits[0] + digits[2] + digits[4]
+    return '#' + digits
+
+
+def minify_svg(text, precision=DEFAULT_PRECISION):
+    """Lossy-in-precision, visually identical SVG text for 24px icons"""
+    text = re.sub(r'<\?xml[^>]*\?>|<!DOCTYPE[^>]*>|<!--.*?-->', '', text, flags=re.DOTALL)
+    text = re.sub(r'<(metadata|title|desc)\b.*?</\1>', '', text, flags=re.DOTALL)
+
+    def numeric(match):
+        name, value = match.groups()
+        value = round_numbers(value, precision)
+        if name == 'd':
+            value = compact_path(value)
+        else:
+            value = re.sub(r'\s+', ' ', value.strip())
+        return f' {name}="{value}"'
+
+    text = NUMERIC_ATTRIBUTE_RE.sub(numeric, text)
+    text = DEFAULT_ATTRIBUTE_RE.sub('', text)
+    if 'xlink:' not in text.replace('xmlns:xlink', ''):
+        text = re.sub(r'\sxmlns:xlink="[^"]*"', '', text)
+    text = HEX_COLOR_RE.sub(_short_color, text)
+    text = re.sub(r'>\s+<', '><', text.strip())
+    return re.sub(r'\s+/>', '/>', text)
+
+
+def minify_file(path, precision=DEFAULT_PRECISION):
+    """Worker: (path, source sha256, source size, minified text)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return path, hashlib.sha256(data).hexdigest(), len(data), minify_svg(data.decode('utf-8'), precision)
+
+
+def _minify_batch(paths, precision):
+    return [minify_file(path, precision) for path in paths]
+
+
+class MinifyCache:
+    """Minified icons keyed by source content hash and precision"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json') if cache_dir else None
+        self.index = {}
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('version') == CACHE_VERSION:
+                    self.index = stored['files']
+            except ValueError:
+                self.index = {}
+        self.dirty = False
+
+    def lookup(self, path, precision):
+        """Cached minified text if the file's size, mtime and content still match"""
+        entry = self.index.get(path)
+        if not entry or entry['precision'] != precision:
+            return None
+        stat = os.stat(path)
+        if entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != entry['sha256']:
+                    return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self.dirty = True
+        blob = os.path.join(self.cache_dir, entry['minified'] + '.svg')
+        if not os.path.exists(blob):
+            return None
+        with open(blob, 'r', encoding='utf-8') as f:
+            return entry['sha256'], entry['size'], f.read()
+
+    def store(self, path, sha256, size, minified, precision):
+        if not self.cache_dir:
+            return
+        digest = hashlib.sha256(minified.encode('utf-8')).hexdigest()
+        blob = os.path.join(self.cache_dir, digest + '.svg')
+        if not os.path.exists(blob):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(blob, 'w', encoding='utf-8') as f:
+                f.write(minified)
+        self.index[path] = {'sha256': sha256, 'size': size, 'mtime_ns': os.stat(path).st_mtime_ns,
+                            'precision': precision, 'minified': digest}
+        self.dirty = True
+
+    def save(self):
+        if not self.index_path or not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': self.index}, f)
+        os.replace(temporary, self.index_path)
+
+
+def find_icon_references(lib_dir, available):
+    """
+    {asset path: [file:line, ...]} for icons referenced from Dart code. Paths
+    built with interpolation ('.../bold/$name.svg') match every available icon
+    of that shape; references to missing files are returned separately.
+    """
+    used, missing = {}, {}
+    for path in dart_files(lib_dir):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        for match in ICON_REF_RE.finditer(text):
+            reference = match.group(1)
+            location = f'{path}:{text.count(chr(10), 0, match.start()) + 1}'
+            if '$' in reference:
+                pattern = INTERPOLATION_RE.sub('*', reference)
+                matches = fnmatch.filter(available, pattern)
+                for icon in matches:
+                    used.setdefault(icon, []).append(location)
+                if not matches:
+                    missing.setdefault(reference, []).append(location)
+            elif reference in available:
+                used.setdefault(reference, []).append(location)
+            else:
+                missing.setdefault(reference, []).append(location)
+    return used, missing
+
+
+def list_icons(icon_root, output_dir):
+    icons = []
+    for directory, _, names in os.walk(icon_root):
+        if os.path.normpath(directory).startswith(os.path.normpath(output_dir)):
+            continue
+        icons.extend(os.path.join(directory, name).replace(os.sep, '/') for name in names if name.endswith('.svg'))
+    return sorted(icons)
+
+
+def pubspec_icon_dirs(pubspec='pubspec.yaml'):
+    """Icon directories currently bundled through pubspec.yaml"""
+    if not os.path.exists(pubspec):
+        return []
+    with open(pubspec, 'r', encoding='utf-8') as f:
+        return re.findall(r'^\s*-\s*(assets/icons/\S*)\s*$', f.read(), re.MULTILINE)
+
+
+def icon_identifier(asset, icon_root):
+    """Dart identifier for an icon: style folders plus file name in lowerCamelCase"""
+    relative = os.path.relpath(asset, icon_root).replace(os.sep, '/')
+    parts = [part for part in re.split(r'[^0-9A-Za-z]+', relative[:-len('.svg')]) if part and part != 'All']
+    words = [parts[0].lower()] + [part[:1].upper() + part[1:] for part in parts[1:]]
+    return ''.join(words)
+
+
+def minify_icons(paths, precision=DEFAULT_PRECISION, cache_dir=DEFAULT_CACHE_DIR, jobs=None):
+    """{path: (source sha256, source size, minified text)}, from cache where possible"""
+    store = MinifyCache(cache_dir)
+    results, misses = {}, []
+    for path in paths:
+        cached = store.lookup(path, precision)
+        cache('icon_minify', cached is not None)
+        if cached is None:
+            misses.append(path)
+        else:
+            results[path] = cached
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(misses) >= PARALLEL_THRESHOLD:
+        batches = [misses[i::jobs * 4] for i in range(jobs * 4)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            computed = [item for batch in pool.map(_minify_batch, batches, [precision] * len(batches))
+                        for item in batch]
+    else:
+        computed = _minify_batch(misses, precision)
+    for path, sha256, size, minified in computed:
+        results[path] = (sha256, size, minified)
+        store.store(path, sha256, size, minified, precision)
+        count('bytes_read', size)
+    store.save()
+    return results
+
+
+def sprite_symbol(identifier, minified):
+    """The icon's <svg> root rewritten as a <symbol> for the sprite sheet"""
+    opening = SVG_OPEN_RE.search(minified)
+    viewbox = VIEWBOX_RE.search(opening.group(1)) if opening else None
+    attributes = f' viewBox="{viewbox.group(1)}"' if viewbox else ''
+    fill = re.search(r'\sfill="([^"]*)"', opening.group(1)) if opening else None
+    if fill:
+        attributes += f' fill="{fill.group(1)}"'
+    inner = minified[opening.end():minified.rfind('</svg>')] if opening else minified
+    return f'<symbol id="{identifier}"{attributes}>{inner}</symbol>'
+
+
+def render_dart(entries, source_name):
+    """AppIcons lookup table: a constant per icon and a map from the original asset paths"""
+    lines = [
+        f'// GENERATED by {source_name}. Do not edit by hand.',
+        '',
+        '/// Asset paths of the icons the app uses, after tree shaking.',
+        'class AppIcons {',
+        '  AppIcons._();',
+        '',
+    ]
+    for identifier, asset, _ in entries:
+        lines.append(f"  static const String {identifier} = '{asset}';")
+    lines += ['', '  /// Original asset path -> shipped asset path.', '  static const Map<String, String> byPath = {']
+    for _, asset, originals in entries:
+        for original in originals:
+            lines.append(f"    '{original}': '{asset}',")
+    lines += ['  };', '}', '']
+    return '\n'.join(lines)
+
+
+def build_icons(lib_dir=DEFAULT_LIB, icon_root=DEFAULT_ICON_ROOT, output_dir=DEFAULT_OUTPUT, sprite=DEFAULT_SPRITE,
+                dart_path=DEFAULT_DART, precision=DEFAULT_PRECISION, cache_dir=DEFAULT_CACHE_DIR, jobs=None,
+                process_all=False, dry_run=False):
+    with stage('scan'):
+        available = list_icons(icon_root, output_dir)
+        used, missing = find_icon_references(lib_dir, available)
+
+    with stage('minify'):
+        minified = minify_icons(available if process_all else sorted(used), precision, cache_dir, jobs)
+
+    # Dedupe by minified content; the first path (sorted) names the shared file
+    canonical = {}
+    for path in sorted(used):
+        digest = hashlib.sha256(minified[path][2].encode('utf-8')).hexdigest()
+        canonical.setdefault(digest, []).append(path)
+
+    entries, written = [], 0
+    with stage('write'):
+        symbols = []
+        for digest, paths in sorted(canonical.items(), key=lambda item: item[1][0]):
+            first = paths[0]
+            relative = os.path.relpath(first, icon_root).replace(os.sep, '/')
+            relative = relative[len('All/'):] if relative.startswith('All/') else relative
+            asset = f"{output_dir.rstrip('/')}/{relative}"
+            identifier = icon_identifier(first, icon_root)
+            entries.append((identifier, asset, paths))
+            symbols.append(sprite_symbol(identifier, minified[first][2]))
+            written += len(minified[first][2].encode('utf-8'))
+            if not dry_run:
+                os.makedirs(os.path.dirname(asset), exist_ok=True)
+                with open(asset, 'w', encoding='utf-8') as f:
+                    f.write(minified[first][2])
+        sprite_text = ('<svg xmlns="http://www.w3.org/2000/svg" style="display:none">'
+                       + ''.join(symbols) + '</svg>\n')
+        if not dry_run:
+            os.makedirs(os.path.dirname(sprite) or '.', exist_ok=True)
+            with open(sprite, 'w', encoding='utf-8') as f:
+                f.write(sprite_text)
+            os.makedirs(os.path.dirname(dart_path) or '.', exist_ok=True)
+            with open(dart_path, 'w', encoding='utf-8') as f:
+                f.write(render_dart(entries, os.path.basename(__file__)))
+
+    bundled_dirs = pubspec_icon_dirs()
+    bundled = [icon for icon in available if any(icon.startswith(directory.rstrip('/') + '/')
+                                                 for directory in bundled_dirs)]
+    bundled_bytes = sum(os.path.getsize(icon) for icon in bundled)
+    all_results = list(minified.values()) if process_all else []
+    return {
+        'available_icons': len(available),
+        'bundled_dirs': bundled_dirs,
+        'bundled_icons': len(bundled),
+        'bundled_bytes': bundled_bytes,
+        'referenced_icons': len(used),
+        'shipped_icons': len(entries),
+        'duplicates_removed': len(used) - len(entries),
+        'shipped_bytes': written,
+        'sprite_bytes': len(sprite_text.encode('utf-8')),
+        'manifest_entries_before': len(bundled),
+        'manifest_entries_after': len(entries),
+        'all_icons_minified': {
+            'source_bytes': sum(result[1] for result in all_results),
+            'minified_bytes': sum(len(result[2].encode('utf-8')) for result in all_results),
+            'distinct': len({result[2] for result in all_results}),
+        } if process_all else None,
+        'missing_references': missing,
+        'icons': [{'identifier': identifier, 'asset': asset, 'sources': paths, 'referenced_at': used[paths[0]]}
+                  for identifier, asset, paths in entries],
+    }
+
+
+def print_summary(report, output_dir):
+    kb = 1024
+    print(f"Icons available: {report['available_icons']}, bundled via pubspec: {report['bundled_icons']} "
+          f"({report['bundled_bytes'] / kb:,.0f} KB)")
+    print(f"Referenced from lib/: {report['referenced_icons']}, shipped after dedupe: {report['shipped_icons']} "
+          f"({report['shipped_bytes'] / kb:,.1f} KB, sprite {report['sprite_bytes'] / kb:,.1f} KB)")
+    print(f"Asset manifest entries: {report['manifest_entries_before']} -> {report['manifest_entries_after']}")
+    if report['all_icons_minified']:
+        stats = report['all_icons_minified']
+        print(f"Whole set minified: {stats['source_bytes'] / kb:,.0f} KB -> {stats['minified_bytes'] / kb:,.0f} KB, "
+              f"{stats['distinct']} distinct")
+    for reference, locations in report['missing_references'].items():
+        print(f"Warning: {reference} referenced at {locations[0]} does not exist")
+    if report['bundled_dirs']:
+        print("\npubspec.yaml: replace")
+        for directory in report['bundled_dirs']:
+            print(f"    - {directory}")
+        print(f"with\n    - {output_dir.rstrip('/')}/ (and its style subdirectories)")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Tree-shake, minify and pack the SVG icons the app uses')
+    parser.add_argument('--lib', default=DEFAULT_LIB)
+    parser.add_argument('--icons', default=DEFAULT_ICON_ROOT, help='icon source root')
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help='directory for the shipped icons')
+    parser.add_argument('--sprite', default=DEFAULT_SPRITE)
+    parser.add_argument('--dart', default=DEFAULT_DART, help='generated Dart lookup table')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION, help='decimal places kept in numbers')
+    parser.add_argument('--all', action='store_true', help='also minify every icon (fills the cache, reports totals)')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--dry-run', action='store_true', help='report only, write nothing but the cache')
+    parser.add_argument('-o', '--output', help='write the report as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.icons):
+        print(f"Error: {args.icons} not found")
+        sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        report = build_icons(args.lib, args.icons, args.out, args.sprite, args.dart, args.precision,
+                             None if args.no_cache else args.cache_dir, args.jobs, args.all, args.dry_run)
+    print_summary(report, args.out)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nOutput file: {args.output}")
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Dart Import Graph and Deferred-loading Candidates
+Builds the import/export graph of lib/, the eager closure of lib/main.dart
+weighted by file size, and the bytes each file or feature keeps in the eager
+bundle on its own: a file's exclusive size is everything it dominates (files
+that cannot be reached from main.dart without going through it), so turning
+the imports of a large dominator into `deferred as` imports moves that whole
+subtree out of startup. Features (calls, payments, community forum,
+gamification, ...) are matched by path and reported with the import sites
+that would have to become deferred.
+
+Per-file scan results are cached by size and mtime, so re-runs only re-read
+changed files; cache misses are scanned in a process pool.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from dart_source import IMPORT_RE, dart_files, mask_source, package_name_of, resolve_import
+from pipeline_metrics import cache, count, stage
+
+DEFAULT_LIB = 'lib'
+DEFAULT_ENTRY = 'lib/main.dart'
+DEFAULT_CACHE = '.build_cache/dart_imports.json'
+DEFAULT_MIN_KB = 20
+PARALLEL_THRESHOLD = 64
+CACHE_VERSION = 2
+DEFAULT_FEATURES = {
+    'calls': r'call',
+    'payments': r'payment|subscription|superlike_pack|plans?_',
+    'premium': r'premium',
+    'community forum': r'forum|community',
+    'gamification': r'gamification|achievement|badge|leaderboard',
+    'stories': r'stor(y|ies)',
+    'analytics': r'analytics|statistics',
+    'backup and export': r'backup|export',
+}
+
+
+def scan_file(path):
+    """Imports of one Dart file (kind, uri, deferred) and its size in bytes"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    text = data.decode('utf-8', errors='replace')
+    # Directives inside block comments or strings lose their quotes in the masked copy
+    masked = mask_source(text)
+    imports = [[match.group(1), match.group(2), bool(match.group(3))] for match in IMPORT_RE.finditer(text)
+               if masked[match.start(2) - 1] == "'"]
+    return {'size': len(data), 'lines': text.count('\n') + 1, 'imports': imports}
+
+
+def _scan_batch(paths):
+    """Worker: scan a batch of files"""
+    return [(path, scan_file(path)) for path in paths]
+
+
+def load_scan_cache(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except ValueError:
+        return {}
+    return cached.get('files', {}) if cached.get('version') == CACHE_VERSION else {}
+
+
+def save_scan_cache(cache_path, files):
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    temporary = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+    os.replace(temporary, cache_path)
+
+
+def scan_tree(lib_dir=DEFAULT_LIB, cache_path=DEFAULT_CACHE, jobs=None):
+    """
+    {path: scan result} for every Dart file under lib_dir. Files whose size and
+    mtime match the cache are reused; the rest are scanned, in parallel when
+    there are enough of them to pay for the worker start-up.
+    """
+    cached = load_scan_cache(cache_path)
+    results, stale = {}, []
+    for path in dart_files(lib_dir):
+        stat = os.stat(path)
+        entry = cached.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            results[path] = entry
+            cache('dart_imports', True)
+        else:
+            stale.append((path, stat.st_mtime_ns))
+            cache('dart_imports', False)
+
+    jobs = jobs or os.cpu_count() or 1
+    paths = [path for path, _ in stale]
+    if jobs > 1 and len(paths) >= PARALLEL_THRESHOLD:
+        batches = [paths[i::jobs * 4] for i in range(jobs * 4)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = [item for batch in pool.map(_scan_batch, batches) for item in batch]
+    else:
+        scanned = _scan_batch(paths)
+    mtimes = dict(stale)
+    for path, result in scanned:
+        result['mtime_ns'] = mtimes[path]
+        results[path] = result
+        count('bytes_read', result['size'])
+
+    if cache_path and (stale or len(results) != len(cached)):
+        save_scan_cache(cache_path, results)
+    return results
+
+
+class ImportGraph:
+    """Resolved import/export/part edges between the app's own Dart files"""
+
+    def __init__(self, files, lib_dir=DEFAULT_LIB, package_name=None):
+        self.files = files
+        self.package_name = package_name
+        self.edges = {path: [] for path in files}
+        self.sites = {}
+        self.missing = []
+        for path, scanned in files.items():
+            for kind, uri, deferred in scanned['imports']:
+                if kind == 'part' and uri.endswith('.g.dart'):
+                    continue
+                target = resolve_import(path, uri, lib_dir, package_name)
+                if target is None:
+                    continue
+                if target not in files:
+                    self.missing.append((path, uri))
+                    continue
+                self.edges[path].append((target, deferred))
+                self.sites.setdefault(target, []).append(path)
+
+    def size(self, path):
+        return self.files[path]['size']
+
+    def reachable(self, root, include_deferred=False):
+        """Files loaded with root, in discovery order"""
+        order, seen, stack = [], {root}, [root]
+        while stack:
+            path = stack.pop()
+            order.append(path)
+            for target, deferred in self.edges[path]:
+                if target not in seen and (include_deferred or not deferred):
+                    seen.add(target)
+                    stack.append(target)
+        return order
+
+    def dominators(self, root):
+        """
+        Immediate dominator of every file eagerly reachable from root
+        (Cooper, Harvey and Kennedy's iterative algorithm on reverse postorder).
+        """
+        postorder, seen = [], {root}
+        stack = [(root, iter(self.edges[root]))]
+        while stack:
+            path, children = stack[-1]
+            for target, deferred in children:
+                if not deferred and target not in seen:
+                    seen.add(target)
+                    stack.append((target, iter(self.edges[target])))
+                    break
+            else:
+                stack.pop()
+                postorder.append(path)
+        index = {path: i for i, path in enumerate(postorder)}
+        predecessors = {path: [] for path in postorder}
+        for path in postorder:
+            for target, deferred in self.edges[path]:
+                if not deferred and target in predecessors:
+                    predecessors[target].append(path)
+
+        idom = {root: root}
+
+        def intersect(a, b):
+            while a != b:
+                while index[a] < index[b]:
+                    a = idom[a]
+                while index[b] < index[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for path in reversed(postorder):
+                if path == root:
+                    continue
+                new = None
+                for predecessor in predecessors[path]:
+                    if predecessor in idom:
+                        new = predecessor if new is None else intersect(predecessor, new)
+                if idom.get(path) != new:
+                    idom[path] = new
+                    changed = True
+        return idom
+
+    def exclusive_sizes(self, root):
+        """Bytes each eager file keeps in the bundle by itself (its dominator subtree)"""
+        idom = self.dominators(root)
+        children = {}
+        for path, parent in idom.items():
+            if path != root:
+                children.setdefault(parent, []).append(path)
+        sizes, members = {}, {}
+
+        order, stack = [], [root]
+        while stack:
+            path = stack.pop()
+            order.append(path)
+            stack.extend(children.get(path, []))
+        for path in reversed(order):
+            sizes[path] = self.size(path) + sum(sizes[child] for child in children.get(path, []))
+            members[path] = 1 + sum(members[child] for child in children.get(path, []))
+        return sizes, members, idom
+
+
+def feature_report(graph, root, name, pattern, eager):
+    """Bytes that leave the eager bundle if every import of the feature's files from outside it is deferred"""
+    matcher = re.compile(pattern, re.IGNORECASE)
+    matched = {path for path in graph.files if matcher.search(path)}
+    if not matched:
+        return None
+    feature = matched.intersection(eager)
+    if not feature:
+        return {'feature': name, 'pattern': pattern, 'files': 0, 'bytes': 0, 'matched_files': sorted(matched),
+                'eager': False, 'pulled_in_only_by_feature': [], 'imports_to_defer': []}
+    remaining, stack = {root}, [root]
+    while stack:
+        path = stack.pop()
+        for target, deferred in graph.edges[path]:
+            if not deferred and target not in feature and target not in remaining:
+                remaining.add(target)
+                stack.append(target)
+    moved = [path for path in eager if path not in remaining]
+    entry_sites = sorted({(source, target) for target in feature for source in graph.sites.get(target, [])
+                          if source in remaining})
+    return {
+        'feature': name,
+        'pattern': pattern,
+        'files': len(moved),
+        'bytes': sum(graph.size(path) for path in moved),
+        'matched_files': sorted(feature),
+        'eager': True,
+        'pulled_in_only_by_feature': sorted(path for path in moved if path not in feature),
+        'imports_to_defer': [{'importer': source, 'imports': target} for source, target in entry_sites],
+    }
+
+
+def analyze(lib_dir=DEFAULT_LIB, entry=DEFAULT_ENTRY, features=None, min_kb=DEFAULT_MIN_KB, cache_path=DEFAULT_CACHE,
+            jobs=None, top=20):
+    with stage('scan'):
+        files = scan_tree(lib_dir, cache_path, jobs)
+    with stage('graph'):
+        graph = ImportGraph(files, lib_dir, package_name_of(os.path.dirname(os.path.abspath(lib_dir))))
+        eager = graph.reachable(entry)
+        with_deferred = set(graph.reachable(entry, include_deferred=True))
+        sizes, members, idom = graph.exclusive_sizes(entry)
+
+    total = sum(scanned['size'] for scanned in files.values())
+    eager_bytes = sum(graph.size(path) for path in eager)
+    unreachable = sorted(path for path in files if path not in with_deferred)
+    with stage('features'):
+        feature_rows = [row for name, pattern in (features or DEFAULT_FEATURES).items()
+                        if (row := feature_report(graph, entry, name, pattern, eager))]
+    feature_rows.sort(key=lambda row: -row['bytes'])
+
+    dominators = [
+        {'file': path, 'exclusive_bytes': sizes[path], 'exclusive_files': members[path],
+         'imported_by': sorted(set(graph.sites.get(path, [])))}
+        for path in sizes
+        if path != entry and members[path] > 1 and sizes[path] >= min_kb * 1024
+    ]
+    dominators.sort(key=lambda row: -row['exclusive_bytes'])
+    return {
+        'entry': entry,
+        'files': len(files),
+        'bytes': total,
+        'eager_files': len(eager),
+        'eager_bytes': eager_bytes,
+        'deferred_files': len(with_deferred) - len(eager),
+        'unreachable_files': len(unreachable),
+        'unreachable_bytes': sum(graph.size(path) for path in unreachable),
+        'unresolved_imports': [{'importer': path, 'uri': uri} for path, uri in graph.missing],
+        'features': feature_rows,
+        'largest_exclusive_subtrees': dominators[:top],
+        'unreachable': unreachable,
+    }
+
+
+def print_report(report):
+    kb = 1024
+    print(f"{report['files']} Dart files, {report['bytes'] / kb:,.0f} KB")
+    print(f"Eager closure of {report['entry']}: {report['eager_files']} files, {report['eager_bytes'] / kb:,.0f} KB "
+          f"({report['eager_bytes'] / max(report['bytes'], 1):.0%})")
+    if report['deferred_files']:
+        print(f"Already deferred: {report['deferred_files']} files")
+    print(f"Not reachable from the entry point: {report['unreachable_files']} files, "
+          f"{report['unreachable_bytes'] / kb:,.0f} KB")
+    if report['unresolved_imports']:
+        print(f"Imports of missing files: {len(report['unresolved_imports'])}")
+
+    print("\nDeferred-loading candidates by feature:")
+    print(f"  {'Feature':20} {'Files':>6} {'KB':>8} {'Imports to defer':>17}")
+    for row in report['features']:
+        if not row['eager']:
+            print(f"  {row['feature']:20} not in the eager bundle ({len(row['matched_files'])} files never imported)")
+            continue
+        print(f"  {row['feature']:20} {row['files']:>6} {row['bytes'] / kb:>8,.1f} {len(row['imports_to_defer']):>17}")
+
+    print("\nLargest subtrees reachable only through one file:")
+    for row in report['largest_exclusive_subtrees']:
+        print(f"  {row['exclusive_bytes'] / kb:>8,.1f} KB {row['exclusive_files']:>4} files  {row['file']}"
+              f"  (imported by {len(row['imported_by'])})")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Find deferred-loading candidates in the Dart import graph')
+    parser.add_argument('--lib', default=DEFAULT_LIB)
+    parser.add_argument('--entry', default=DEFAULT_ENTRY)
+    parser.add_argument('--feature', action='append', metavar='NAME=REGEX',
+                        help='feature matched by file path (repeatable; replaces the built-in list)')
+    parser.add_argument('--min-kb', type=float, default=DEFAULT_MIN_KB,
+                        help='smallest exclusive subtree to list')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('-j', '--jobs', type=int, help='scan processes (default: CPU count)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help='per-file scan cache')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('-o', '--output', help='write the full report as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.entry):
+        print(f"Error: {args.entry} not found")
+        sys.exit(1)
+    features = None
+    if args.feature:
+        features = dict(item.split('=', 1) for item in args.feature)
+
+    with metrics_session(args.metrics, args.profile):
+        report = analyze(args.lib, args.entry, features, args.min_kb, None if args.no_cache else args.cache,
+                         args.jobs, args.top)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nOutput file: {args.output}")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+LGBTinder API Tooling CLI
+Single entry point for the collection, docs, verification log and status scripts.
+Subcommands import their generator modules lazily so --help and small commands
+start fast; `serve` keeps a warm process on a Unix socket for editor and
+pre-commit integrations, and `--socket` forwards a command to it.
+"""
+
+import argparse
+import os
+import sys
+
+DEFAULT_COLLECTION = 'LGBTinder_API_Postman_Collection_Updated.json'
+DEFAULT_GENERATED_COLLECTION = 'LGBTinder_API_Postman_Collection_Complete.json'
+DEFAULT_DOCS = 'All_API_Methods.md'
+DEFAULT_LOG = 'API_VERIFICATION_LOG.md'
+DEFAULT_SOCKET = '.lgbtinder_api.sock'
+
+
+def require_file(path, label):
+    """Print an error and return False if an input file is missing"""
+    if not os.path.exists(path):
+        print(f"Error: {label} not found at {path}")
+        return False
+    return True
+
+
+def cmd_collection(args):
+    """Generate the Postman collection from the endpoint registry"""
+    from generate_postman_collection import write_postman_collection
+
+    write_postman_collection(args.output)
+    return 0
+
+
+def cmd_docs(args):
+    """Generate All_API_Methods.md from the Postman collection"""
+    if not require_file(args.collection, 'Postman collection'):
+        return 1
+    from generate_api_documentation import generate_markdown_documentation
+
+    generate_markdown_documentation(args.collection, args.output, args.shared_examples)
+    return 0
+
+
+def cmd_verify_log(args):
+    """Generate API_VERIFICATION_LOG.md from the Postman collection"""
+    if not require_file(args.collection, 'Postman collection'):
+        return 1
+    from generate_verification_log import extract_endpoints_from_postman, generate_verification_log
+
+    endpoints = extract_endpoints_from_postman(args.collection)
+    generate_verification_log(endpoints, args.output)
+    return 0
+
+
+def cmd_status(args):
+    """Apply the auth and/or webhook status updates to the verification log"""
+    if not require_file(args.log, 'Verification log'):
+        return 1
+    if args.which in ('auth', 'all'):
+        from update_auth_status import update_auth_status_in_log
+
+        update_auth_status_in_log(args.log)
+    if args.which in ('webhook', 'all'):
+        from update_webhook_status import update_webhook_status_in_log
+
+        update_webhook_status_in_log(args.log)
+    return 0
+
+
+def cmd_index(args):
+    """Build the section indexes for the log and docs"""
+    from api_section_index import build_section_index, index_path_for
+
+    for path in args.paths:
+        if not require_file(path, 'Document'):
+            return 1
+        index = build_section_index(path)
+        print(f"Indexed {len(index['sections'])} sections in {path} -> {index_path_for(path)}")
+    return 0
+
+
+def cmd_build(args):
+    """Rebuild the artifacts whose inputs changed"""
+    from build_pipeline import STATE_FILE, pipeline_stages, run_pipeline
+
+    stages = pipeline_stages(args.collection, args.docs, args.log)
+    try:
+        results = run_pipeline(stages, args.state or STATE_FILE, args.targets, args.force, args.jobs, args.dry_run)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        return 1
+    for name in stages:
+        if name in results:
+            print(f"{name}: {results[name]}")
+    return 1 if any(result in ('failed', 'blocked') for result in results.values()) else 0
+
+
+def cmd_serve(args):
+    """Run a warm command server on a Unix socket"""
+    from cli_server import serve
+
+    serve(args.socket_path or args.socket or DEFAULT_SOCKET, run)
+    return 0
+
+
+def build_parser():
+    """Build the argument parser; no generator modules are imported here"""
+    parser = argparse.ArgumentParser(
+        prog='lgbtinder_api.py',
+        description='LGBTinder API collection, documentation and verification log tooling',
+    )
+    parser.add_argument('--socket', metavar='PATH',
+                        help='forward the command to a warm server started with `serve`')
+    parser.add_argument('--metrics', metavar='JSON_PATH',
+                        help='write per-stage timings, memory, counters and cache hit rates as JSON')
+    parser.add_argument('--profile', metavar='PSTATS_PATH',
+                        help='write a cProfile dump readable with python -m pstats')
+    parser.add_argument('--build-cache', action='store_true',
+                        help='load parsed JSON inputs from the binary cache in .build_cache/')
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    sub = subparsers.add_parser('collection', help='generate the Postman collection from the registry')
+    sub.add_argument('-o', '--output', default=DEFAULT_GENERATED_COLLECTION)
+    sub.set_defaults(func=cmd_collection)
+
+    sub = subparsers.add_parser('docs', help='generate All_API_Methods.md')
+    sub.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    sub.add_argument('-o', '--output', default=DEFAULT_DOCS)
+    sub.add_argument('--shared-examples', action='store_true',
+                     help='print each unique response example once and link to it')
+    sub.set_defaults(func=cmd_docs)
+
+    sub = subparsers.add_parser('verify-log', help='generate API_VERIFICATION_LOG.md')
+    sub.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    sub.add_argument('-o', '--output', default=DEFAULT_LOG)
+    sub.set_defaults(func=cmd_verify_log)
+
+    sub = subparsers.add_parser('status', help='apply endpoint status updates to the verification log')
+    sub.add_argument('which', nargs='?', choices=['auth', 'webhook', 'all'], default='all')
+    sub.add_argument('-l', '--log', default=DEFAULT_LOG)
+    sub.set_defaults(func=cmd_status)
+
+    sub = subparsers.add_parser('index', help='build byte-offset section indexes')
+    sub.add_argument('paths', nargs='*', default=[DEFAULT_LOG, DEFAULT_DOCS])
+    sub.set_defaults(func=cmd_index)
+
+    sub = subparsers.add_parser('build', help='rebuild artifacts whose inputs changed')
+    sub.add_argument('targets', nargs='*', help='stages to build (default: all)')
+    sub.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    sub.add_argument('--docs', default=DEFAULT_DOCS)
+    sub.add_argument('--log', default=DEFAULT_LOG)
+    sub.add_argument('--state', default=None)
+    sub.add_argument('-j', '--jobs', type=int, default=None)
+    sub.add_argument('--force', action='store_true', help='rebuild even if up to date')
+    sub.add_argument('--dry-run', action='store_true', help='only report what would be rebuilt')
+    sub.set_defaults(func=cmd_build)
+
+    sub = subparsers.add_parser('serve', help='keep a warm command server on a Unix socket')
+    sub.add_argument('socket_path', nargs='?')
+    sub.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def run(argv):
+    """Parse argv and run the subcommand in this process; returns an exit code"""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    if not args.build_cache:
+        return dispatch(args)
+
+    import collection_cache
+
+    # The warm server runs many commands in one process; the flag must not outlive this one
+    previous = collection_cache.enabled()
+    collection_cache.enable()
+    try:
+        return dispatch(args)
+    finally:
+        collection_cache.enable(previous)
+
+
+def dispatch(args):
+    """Run the parsed subcommand, inside a metrics session when one was requested"""
+    if not args.metrics and not args.profile:
+        return args.func(args)
+
+    from pipeline_metrics import metrics_session, stage
+
+    with metrics_session(args.metrics, args.profile):
+        with stage(args.command):
+            return args.func(args)
+
+
+def main(argv=None):
+    """CLI entry point"""
+    argv = sys.argv[1:] if argv is None else argv
+    # Peek for --socket without building the full parser so forwarding stays cheap
+    if argv[:1] == ['--socket'] and len(argv) >= 2 and argv[2:3] != ['serve']:
+        from cli_server import forward
+
+        return forward(argv[1], argv[2:])
+    return run(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
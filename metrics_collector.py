@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Live Client Metrics Collector
+A local asyncio service that receives per-request timing events from a debug
+build's HttpInterceptorService over UDP (one JSON object per datagram, or
+several newline-separated) or HTTP (POST /events with a JSON object, array or
+JSON lines), keeps rolling-window latency histograms per endpoint in constant
+memory and serves a dashboard:
+  GET /            text table of current p50/p90/p99 per endpoint
+  GET /metrics     the same as JSON
+Events use the traffic_analyzer record fields (method, url or endpoint, status,
+duration_ms, request_bytes, response_bytes), snake_case or camelCase.
+"""
+
+import asyncio
+import json
+import math
+import re
+import socket
+import time
+from datetime import datetime
+
+from api_section_index import endpoint_key
+from endpoint_router import EndpointRouter
+from lgbtinder_api import DEFAULT_COLLECTION
+from traffic_analyzer import LatencyHistogram, is_error, jsonl_record
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_UDP_PORT = 8125
+DEFAULT_HTTP_PORT = 8126
+DEFAULT_WINDOW_S = 60
+DEFAULT_SLOTS = 12
+MAX_ENDPOINTS = 1000
+MAX_BODY_BYTES = 1 << 20
+UDP_RECEIVE_BUFFER = 4 << 20
+NUMERIC_SEGMENT_RE = re.compile(r'/\d+(?=/|$)')
+
+
+class RollingHistogram:
+    """
+    A window of `slots` sub-window histograms; adding rotates out expired slots,
+    so memory stays bounded by slots x histogram buckets however many events arrive.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW_S, slots=DEFAULT_SLOTS):
+        self.slot_seconds = window / slots
+        self.slots = [LatencyHistogram() for _ in range(slots)]
+        self.slot_ids = [None] * slots
+        self.errors = [0] * slots
+        self.bytes = [0] * slots
+
+    def _slot(self, now):
+        slot_id = int(now // self.slot_seconds)
+        position = slot_id % len(self.slots)
+        if self.slot_ids[position] != slot_id:
+            self.slots[position] = LatencyHistogram()
+            self.slot_ids[position] = slot_id
+            self.errors[position] = 0
+            self.bytes[position] = 0
+        return position
+
+    def add(self, duration_ms, error, size, now=None):
+        position = self._slot(time.time() if now is None else now)
+        self.slots[position].add(duration_ms)
+        self.errors[position] += error
+        self.bytes[position] += size
+
+    def snapshot(self, now=None):
+        """Merged histogram, error and byte counts of the slots still inside the window"""
+        current = int((time.time() if now is None else now) // self.slot_seconds)
+        merged = LatencyHistogram()
+        errors = size = 0
+        for position, slot_id in enumerate(self.slot_ids):
+            if slot_id is not None and current - slot_id < len(self.slots):
+                merged.merge(self.slots[position])
+                errors += self.errors[position]
+                size += self.bytes[position]
+        return merged, errors, size
+
+
+class MetricsCollector:
+    """Rolling per-endpoint statistics for incoming timing events"""
+
+    def __init__(self, router=None, window=DEFAULT_WINDOW_S, slots=DEFAULT_SLOTS):
+        self.router = router
+        self.window = window
+        self.slots = slots
+        self.endpoints = {}
+        self.received = 0
+        self.rejected = 0
+        self.started = time.time()
+
+    def endpoint_for(self, record):
+        key = self.router.match(record['method'], record['url']) if self.router else None
+        if key is None:
+            path = self.router.path_of(record['url']) if self.router else record['url'].split('?', 1)[0]
+            key = f"{str(record['method']).upper()} {NUMERIC_SEGMENT_RE.sub('/:id', path)}"
+        return key
+
+    def add(self, event, now=None):
+        """Record one event dict; malformed events are counted and dropped"""
+        if not isinstance(event, dict):
+            self.rejected += 1
+            return
+        record = jsonl_record(event)
+        if record['duration_ms'] is None or not record['url']:
+            self.rejected += 1
+            return
+        try:
+            duration = float(record['duration_ms'])
+            status = int(record['status'] or 0)
+            size = int(record['request_bytes'] or 0) + int(record['response_bytes'] or 0)
+            key = self.endpoint_for(record)
+        except (ValueError, TypeError, AttributeError):
+            self.rejected += 1
+            return
+        if not math.isfinite(duration) or duration < 0:
+            self.rejected += 1
+            return
+        rolling = self.endpoints.get(key)
+        if rolling is None:
+            if len(self.endpoints) >= MAX_ENDPOINTS:
+                self.rejected += 1
+                return
+            rolling = self.endpoints[key] = RollingHistogram(self.window, self.slots)
+        rolling.add(duration, is_error(status), size, now)
+        self.received += 1
+
+    def add_payload(self, payload):
+        """Accept a JSON object, a JSON array or newline-separated JSON objects"""
+        text = payload.decode('utf-8', errors='replace').strip()
+        if not text:
+            return
+        try:
+            events = json.loads(text)
+        except ValueError:
+            events = []
+            for line in text.splitlines():
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    self.rejected += 1
+        for event in events if isinstance(events, list) else [events]:
+            self.add(event)
+
+    def snapshot(self, now=None):
+        endpoints = {}
+        for key, rolling in self.endpoints.items():
+            histogram, errors, size = rolling.snapshot(now)
+            if not histogram.count:
+                continue
+            summary = histogram.summary()
+            summary['rate_per_s'] = round(histogram.count / self.window, 3)
+            summary['error_rate'] = round(errors / histogram.count, 4)
+            summary['bytes'] = size
+            endpoints[key] = summary
+        return {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'window_s': self.window,
+            'uptime_s': round(time.time() - self.started, 1),
+            'received': self.received,
+            'rejected': self.rejected,
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: -item[1]['count'])),
+        }
+
+    def render_text(self, now=None):
+        snapshot = self.snapshot(now)
+        lines = [
+            f"LGBTinder client metrics - last {snapshot['window_s']}s "
+            f"(received {snapshot['received']}, rejected {snapshot['rejected']})",
+            '',
+            f"{'Endpoint':52} {'Count':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'Errors':>7}",
+        ]
+        for key, summary in snapshot['endpoints'].items():
+            lines.append(f"{key[:52]:52} {summary['count']:>7} {summary['p50']:>8} {summary['p90']:>8} "
+                         f"{summary['p99']:>8} {summary['error_rate']:>7.1%}")
+        if not snapshot['endpoints']:
+            lines.append('(no events in the window)')
+        return '\n'.join(lines) + '\n'
+
+
+class UdpEventProtocol(asyncio.DatagramProtocol):
+    """Feeds each datagram into the collector"""
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    def datagram_received(self, data, addr):
+        self.collector.add_payload(data)
+
+
+def http_response(status, body, content_type='text/plain; charset=utf-8'):
+    reason = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large'}[status]
+    body = body.encode('utf-8') if isinstance(body, str) else body
+    head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n")
+    return head.encode('ascii') + body
+
+
+def http_handler(collector):
+    """asyncio.start_server callback serving /events, / and /metrics"""
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if len(parts) < 2:
+                writer.write(http_response(400, 'bad request\n'))
+                return
+            method, target = parts[0], parts[1].split('?', 1)[0]
+            if method == 'POST' and target == '/events':
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(http_response(400, 'bad content-length\n'))
+                    return
+                if length > MAX_BODY_BYTES:
+                    writer.write(http_response(413, 'payload too large\n'))
+                    return
+                collector.add_payload(await reader.readexactly(length))
+                writer.write(http_response(202, 'accepted\n'))
+            elif method == 'GET' and target == '/metrics':
+                writer.write(http_response(200, json.dumps(collector.snapshot(), indent=2), 'application/json'))
+            elif method == 'GET' and target == '/':
+                writer.write(http_response(200, collector.render_text()))
+            else:
+                writer.write(http_response(404, 'not found\n'))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    return handle
+
+
+async def run_collector(collector, host=DEFAULT_HOST, udp_port=DEFAULT_UDP_PORT, http_port=DEFAULT_HTTP_PORT):
+    """Serve UDP ingestion and the HTTP ingestion/dashboard until cancelled"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: UdpEventProtocol(collector), local_addr=(host, udp_port))
+    # Bursts from the app arrive faster than one loop turn; a larger buffer avoids drops
+    transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+    server = await asyncio.start_server(http_handler(collector), host, http_port)
+    print(f"Collecting UDP events on {host}:{udp_port}")
+    print(f"Dashboard and POST /events on http://{host}:{http_port}/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        transport.close()
+
+
+def load_router(collection_path, base_path='/api'):
+    """Registry router, so concrete URLs aggregate under their endpoint templates"""
+    from generate_verification_log import extract_endpoints_from_postman
+
+    keys = {endpoint_key(endpoint['method'], endpoint['path'])
+            for endpoint in extract_endpoints_from_postman(collection_path)}
+    return EndpointRouter(keys, base_path)
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Collect live request timings from a debug build')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--udp-port', type=int, default=DEFAULT_UDP_PORT)
+    parser.add_argument('--http-port', type=int, default=DEFAULT_HTTP_PORT)
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW_S, help='rolling window in seconds')
+    parser.add_argument('--slots', type=int, default=DEFAULT_SLOTS, help='sub-windows per rolling window')
+    parser.add_argument('-c', '--collection', default=DEFAULT_COLLECTION,
+                        help='registry collection used to fold URLs into endpoint templates')
+    parser.add_argument('--base-path', default='/api')
+    args = parser.parse_args()
+
+    router = load_router(args.collection, args.base_path) if os.path.exists(args.collection) else None
+    collector = MetricsCollector(router, args.window, args.slots)
+    try:
+        asyncio.run(run_collector(collector, args.host, args.udp_port, args.http_port))
+    except KeyboardInterrupt:
+        pass
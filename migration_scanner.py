@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Typography and Color Migration Scanner
+Counts, per Dart file in lib/, the raw styling the UI consistency migration is
+removing against the theme-token usages replacing it, with comments and
+string contents masked out:
+  typography  raw: TextStyle( constructors, fontSize: <number>
+              tokens: AppTypography.*, textTheme lookups
+  colors      raw: Color(0x...), Color.fromARGB/fromRGBO, Colors.* (except
+              Colors.transparent)
+              tokens: AppColors.*, colorScheme lookups
+A file's migration percentage is tokens / (tokens + raw). lib/theme/ defines
+the tokens and is not counted.
+
+Per-file results are cached by mtime and size, falling back to a content hash
+when only the mtime changed, so a rescan after a small edit only re-reads the
+edited files; misses are scanned in a process pool. Writes JSON and a
+generated Markdown status report.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from dart_source import dart_files, mask_source
+from pipeline_metrics import cache, count, stage
+
+DEFAULT_LIB = 'lib'
+DEFAULT_CACHE = '.build_cache/migration_scan.json'
+DEFAULT_REPORT = 'UI_MIGRATION_STATUS.md'
+EXCLUDE_DIRS = ('lib/theme',)
+PARALLEL_THRESHOLD = 32
+CACHE_VERSION = 1
+
+PATTERNS = {
+    'typography': {
+        'raw': {
+            'TextStyle(': re.compile(r'(?<![\w.])(?:const\s+)?TextStyle\s*\('),
+            'fontSize: <number>': re.compile(r'\bfontSize\s*:\s*\d'),
+        },
+        'tokens': {
+            'AppTypography.*': re.compile(r'\bAppTypography\.\w+'),
+            'textTheme': re.compile(r'\btextTheme\b'),
+        },
+    },
+    'colors': {
+        'raw': {
+            'Color(0x...)': re.compile(r'(?<![\w.])(?:const\s+)?Color\s*\(\s*0[xX]'),
+            'Color.fromARGB/fromRGBO': re.compile(r'\bColor\.from(?:ARGB|RGBO)\s*\('),
+            'Colors.*': re.compile(r'\bColors\.(?!transparent\b)\w+'),
+        },
+        'tokens': {
+            'AppColors.*': re.compile(r'\bAppColors\.\w+'),
+            'colorScheme': re.compile(r'\bcolorScheme\b'),
+        },
+    },
+}
+COLORS_NAME_RE = re.compile(r'\bColors\.(?!transparent\b)(\w+)')
+
+
+def scan_text(text):
+    """Counts of every pattern, plus the Colors.* names used, for one source text"""
+    masked = mask_source(text)
+    counts = {}
+    for area, kinds in PATTERNS.items():
+        for kind, patterns in kinds.items():
+            counts[f'{area}.{kind}'] = {label: len(pattern.findall(masked)) for label, pattern in patterns.items()}
+    counts['colors_names'] = dict(Counter(COLORS_NAME_RE.findall(masked)))
+    return counts
+
+
+def scan_file(path):
+    """Worker: (path, sha256, counts)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return path, hashlib.sha256(data).hexdigest(), scan_text(data.decode('utf-8', errors='replace'))
+
+
+def _scan_batch(paths):
+    return [scan_file(path) for path in paths]
+
+
+def load_cache(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except ValueError:
+        return {}
+    return stored.get('files', {}) if stored.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(cache_path, files):
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    temporary = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+    os.replace(temporary, cache_path)
+
+
+def scan_tree(lib_dir=DEFAULT_LIB, cache_path=DEFAULT_CACHE, jobs=None):
+    """{path: cache entry with counts} for every counted Dart file under lib_dir"""
+    cached = load_cache(cache_path)
+    results, misses = {}, []
+    dirty = False
+    for path in dart_files(lib_dir):
+        if any(path.replace(os.sep, '/').startswith(directory + '/') for directory in EXCLUDE_DIRS):
+            continue
+        stat = os.stat(path)
+        entry = cached.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] != stat.st_mtime_ns:
+            # Touched but possibly unchanged (checkout, formatter): compare content
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() == entry['sha256']:
+                    entry['mtime_ns'] = stat.st_mtime_ns
+                    dirty = True
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            results[path] = entry
+            cache('migration_scan', True)
+        else:
+            misses.append(path)
+            cache('migration_scan', False)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(misses) >= PARALLEL_THRESHOLD:
+        batches = [misses[i::jobs * 4] for i in range(jobs * 4)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = [item for batch in pool.map(_scan_batch, batches) for item in batch]
+    else:
+        scanned = _scan_batch(misses)
+    for path, sha256, counts in scanned:
+        stat = os.stat(path)
+        results[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256, 'counts': counts}
+        count('bytes_read', stat.st_size)
+
+    if cache_path and (scanned or dirty or len(results) != len(cached)):
+        save_cache(cache_path, results)
+    return results
+
+
+def percentage(tokens, raw):
+    return round(100.0 * tokens / (tokens + raw), 1) if tokens + raw else 100.0
+
+
+def summarize(results):
+    """Per-file and global totals and percentages for both migrations"""
+    files = []
+    totals = {area: {'raw': Counter(), 'tokens': Counter()} for area in PATTERNS}
+    colors_names = Counter()
+    for path in sorted(results):
+        counts = results[path]['counts']
+        row = {'file': path}
+        for area in PATTERNS:
+            raw = sum(counts[f'{area}.raw'].values())
+            tokens = sum(counts[f'{area}.tokens'].values())
+            totals[area]['raw'].update(counts[f'{area}.raw'])
+            totals[area]['tokens'].update(counts[f'{area}.tokens'])
+            row[area] = {'raw': raw, 'tokens': tokens, 'percent': percentage(tokens, raw)}
+        colors_names.update(counts['colors_names'])
+        files.append(row)
+
+    overall = {}
+    for area, kinds in totals.items():
+        raw, tokens = sum(kinds['raw'].values()), sum(kinds['tokens'].values())
+        touched = [row for row in files if row[area]['raw'] or row[area]['tokens']]
+        overall[area] = {
+            'raw': raw,
+            'tokens': tokens,
+            'percent': percentage(tokens, raw),
+            'raw_by_pattern': dict(kinds['raw']),
+            'tokens_by_pattern': dict(kinds['tokens']),
+            'files_with_raw': sum(1 for row in touched if row[area]['raw']),
+            'files_complete': sum(1 for row in touched if not row[area]['raw']),
+        }
+    return {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'files_scanned': len(files),
+        'overall': overall,
+        'colors_by_name': dict(colors_names.most_common()),
+        'files': files,
+    }
+
+
+def render_report(summary, top=25):
+    """Markdown status report generated from a summary"""
+    lines = [
+        '# UI Consistency Migration Status',
+        '',
+        f"Generated by `migration_scanner.py` on {summary['generated']} from {summary['files_scanned']} Dart files "
+        '(lib/theme/ excluded). Do not edit by hand; rerun the scanner.',
+        '',
+        '| Migration | Token usages | Raw usages | Migrated | Files done | Files remaining |',
+        '|-----------|-------------:|-----------:|---------:|-----------:|----------------:|',
+    ]
+    for area, overall in summary['overall'].items():
+        lines.append(f"| {area.capitalize()} | {overall['tokens']:,} | {overall['raw']:,} | {overall['percent']}% | "
+                     f"{overall['files_complete']} | {overall['files_with_raw']} |")
+
+    for area, overall in summary['overall'].items():
+        lines += ['', f'## {area.capitalize()}', '', '| Pattern | Kind | Count |', '|---------|------|------:|']
+        for label, value in overall['raw_by_pattern'].items():
+            lines.append(f'| `{label}` | raw | {value:,} |')
+        for label, value in overall['tokens_by_pattern'].items():
+            lines.append(f'| `{label}` | token | {value:,} |')
+        if area == 'colors' and summary['colors_by_name']:
+            names = ', '.join(f'`Colors.{name}` {value:,}' for name, value in list(summary['colors_by_name'].items())[:10])
+            lines += ['', f'Most used raw colors: {names}']
+
+        remaining = sorted((row for row in summary['files'] if row[area]['raw']),
+                           key=lambda row: (-row[area]['raw'], row['file']))[:top]
+        if remaining:
+            lines += ['', f'Files with the most raw {area} usages:', '',
+                      '| File | Raw | Tokens | Migrated |', '|------|----:|-------:|---------:|']
+            for row in remaining:
+                lines.append(f"| {row['file']} | {row[area]['raw']} | {row[area]['tokens']} | "
+                             f"{row[area]['percent']}% |")
+    return '\n'.join(lines) + '\n'
+
+
+def print_summary(summary):
+    for area, overall in summary['overall'].items():
+        print(f"{area.capitalize():11} {overall['percent']:5.1f}% migrated  "
+              f"({overall['tokens']:,} token / {overall['raw']:,} raw usages, "
+              f"{overall['files_with_raw']} files still with raw usages)")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Measure the typography and color token migration in lib/')
+    parser.add_argument('--lib', default=DEFAULT_LIB)
+    parser.add_argument('-o', '--output', help='write per-file and global results as JSON')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='generated Markdown status report')
+    parser.add_argument('--no-report', action='store_true')
+    parser.add_argument('--top', type=int, default=25, help='files listed per migration in the report')
+    parser.add_argument('-j', '--jobs', type=int, help='scan processes (default: CPU count)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help='per-file result cache')
+    parser.add_argument('--no-cache', action='store_true')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.lib):
+        print(f"Error: {args.lib} not found")
+        sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        with stage('scan'):
+            results = scan_tree(args.lib, None if args.no_cache else args.cache, args.jobs)
+        summary = summarize(results)
+    print_summary(summary)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Output file: {args.output}")
+    if not args.no_report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(render_report(summary, args.top))
+        print(f"Report: {args.report}")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Profiling and Metrics for the API Generator Scripts
+Shared --metrics / --profile support: per-stage wall and CPU time, peak memory
+via tracemalloc, JSON parse and I/O byte counters and cache hit rates, written
+to a machine-readable JSON file with an optional cProfile/pstats dump.
+Instrumented code calls the module-level helpers, which are no-ops unless a
+metrics session is active.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+
+class PipelineMetrics:
+    """Collects stage timings, counters and cache statistics for one run"""
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.stages = []
+        self.counters = {}
+        self.caches = {}
+        self._stack = []  # [stage record, highest traced peak seen in it]
+        self._run_peak = 0
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a named stage; nested stages are recorded with their depth"""
+        record = {'name': name, 'depth': len(self._stack)}
+        self.stages.append(record)
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing:
+            current_before, peak = tracemalloc.get_traced_memory()
+            self._run_peak = max(self._run_peak, peak)
+            # Fold the peak seen so far into the enclosing stage before resetting it
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        frame = [record, 0]
+        self._stack.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_s'] = round(time.process_time() - cpu_start, 6)
+            self._stack.pop()
+            if tracing:
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+                self._run_peak = max(self._run_peak, peak)
+                # Peak above what was already allocated when the stage began
+                record['peak_mem_bytes'] = peak - current_before
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def count(self, name, amount=1):
+        """Add to a named counter such as json_parses or bytes_read"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def cache(self, name, hit):
+        """Record a hit or miss for a named cache"""
+        stats = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+        stats['hits' if hit else 'misses'] += 1
+
+    def report(self):
+        """Return the collected metrics as a JSON-serialisable dict"""
+        caches = {}
+        for name, stats in self.caches.items():
+            total = stats['hits'] + stats['misses']
+            caches[name] = dict(stats, hit_rate=round(stats['hits'] / total, 4) if total else None)
+        report = {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'argv': sys.argv,
+            'python': platform.python_version(),
+            'total_wall_s': round(time.perf_counter() - self._started, 6),
+            'total_cpu_s': round(time.process_time() - self._cpu_started, 6),
+            'stages': self.stages,
+            'counters': self.counters,
+            'caches': caches,
+        }
+        if self.track_memory and tracemalloc.is_tracing():
+            report['peak_mem_bytes'] = max(self._run_peak, tracemalloc.get_traced_memory()[1])
+        return report
+
+
+_active = None
+
+
+def current():
+    """Return the active metrics collector, or None outside a metrics session"""
+    return _active
+
+
+def count(name, amount=1):
+    """Add to a counter of the active session"""
+    if _active is not None:
+        _active.count(name, amount)
+
+
+def cache(name, hit):
+    """Record a cache hit or miss in the active session"""
+    if _active is not None:
+        _active.cache(name, hit)
+
+
+def stage(name):
+    """Time a stage in the active session; a null context otherwise"""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
+
+
+def load_json(path):
+    """json.load a file, counting the parse and bytes read"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    count('json_parses')
+    count('bytes_read', os.path.getsize(path))
+    return data
+
+
+@contextlib.contextmanager
+def metrics_session(metrics_path=None, profile_path=None, track_memory=True):
+    """
+    Activate metrics collection for the enclosed code. Writes the JSON report to
+    metrics_path and a pstats dump to profile_path when given; does nothing when
+    neither is set.
+    """
+    global _active
+    if not metrics_path and not profile_path:
+        yield None
+        return
+
+    metrics = PipelineMetrics(track_memory=track_memory and bool(metrics_path))
+    previous, _active = _active, metrics
+    profiler = None
+    if metrics.track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if profile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        report = metrics.report()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _active = previous
+        if metrics_path:
+            with open(metrics_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Metrics written to {metrics_path}", file=sys.stderr)
+        if profile_path:
+            print(f"Profile written to {profile_path} (inspect with python -m pstats)", file=sys.stderr)
+
+
+def add_metrics_arguments(parser):
+    """Add the shared --metrics and --profile options to an argparse parser"""
+    parser.add_argument('--metrics', metavar='JSON_PATH',
+                        help='write per-stage timings, memory, counters and cache hit rates as JSON')
+    parser.add_argument('--profile', metavar='PSTATS_PATH',
+                        help='write a cProfile dump readable with python -m pstats')
+
+
+def metrics_session_from_argv(argv=None):
+    """Metrics session configured from --metrics / --profile in argv, for scripts without a parser"""
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    add_metrics_arguments(parser)
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return metrics_session(args.metrics, args.profile)
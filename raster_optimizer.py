@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Raster Asset Optimizer
+Pure-stdlib PNG pipeline for assets/ and web/icons/:
+  - lossless recompression: metadata chunks (text, time, content credentials)
+    are dropped, IDAT chunks merged and the pixel data re-deflated with a
+    search over zlib levels/strategies and over the original versus adaptive
+    row filters; the smallest result is kept;
+  - 1x/2x/3x density variants (the 2.0x/ and 3.0x/ folders Flutter resolves by
+    device pixel ratio) sized to the largest on-screen size found for the
+    asset in lib/ (Image.asset width/height literals), or to a full-width
+    phone layout when the size is not a literal;
+  - a report of decode memory (width x height x 4 bytes once decoded) for the
+    original versus the variant 1x, 2x and 3x devices would load.
+
+Results are cached by source content hash and options; files are processed
+in a process pool. Interlaced, palette and 16-bit PNGs are recompressed only.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from dart_source import dart_files, mask_source
+from pipeline_metrics import cache, count, stage
+
+DEFAULT_ROOTS = ('assets', 'web/icons')
+DEFAULT_LIB = 'lib'
+DEFAULT_OUTPUT = 'build/raster_assets'
+DEFAULT_CACHE_DIR = '.build_cache/raster'
+DEFAULT_SCREEN_WIDTH = 430  # logical width of the largest common phone layout
+DENSITIES = (1, 2, 3)
+SKIP_DIRS = ('assets/icons/All',)
+CACHE_VERSION = 2
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+KEEP_CHUNKS = {b'IHDR', b'PLTE', b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP', b'sBIT', b'IDAT', b'IEND'}
+CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+ZLIB_TRIALS = [(9, zlib.Z_DEFAULT_STRATEGY, 9), (9, zlib.Z_FILTERED, 9), (9, zlib.Z_RLE, 9), (6, zlib.Z_DEFAULT_STRATEGY, 8)]
+EXHAUSTIVE_TRIALS = [(level, strategy, memory) for level in range(1, 10)
+                     for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE) for memory in (8, 9)]
+
+IMAGE_ASSET_RE = re.compile(r"""(?:Image\.asset|AssetImage|imagePath\s*:|previewImage\s*:)\s*\(?\s*['"]([^'"]+\.png)['"]""")
+SIZE_ARGUMENT_RE = re.compile(r'\b(width|height|size)\s*:\s*(\d+(?:\.\d+)?)\b')
+
+
+# --- PNG container -------------------------------------------------------------
+
+def read_chunks(data):
+    """[(type, payload)] of a PNG file"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError('not a PNG file')
+    chunks, offset = [], len(PNG_SIGNATURE)
+    while offset < len(data):
+        length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        chunks.append((kind, data[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+        if kind == b'IEND':
+            break
+    return chunks
+
+
+def chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+
+def write_png(header_chunks, compressed):
+    """PNG bytes from the kept pre-IDAT chunks and one deflated IDAT stream"""
+    return PNG_SIGNATURE + b''.join(chunk(kind, payload) for kind, payload in header_chunks) + \
+        chunk(b'IDAT', compressed) + chunk(b'IEND', b'')
+
+
+class PngImage:
+    """Header fields, kept metadata chunks and the inflated (still filtered) scanlines"""
+
+    def __init__(self, data):
+        chunks = read_chunks(data)
+        self.width, self.height, self.bit_depth, self.color_type, _, _, self.interlace = \
+            struct.unpack('>IIBBBBB', chunks[0][1])
+        self.header_chunks = [(kind, payload) for kind, payload in chunks if kind in KEEP_CHUNKS
+                              and kind not in (b'IDAT', b'IEND')]
+        self.dropped = sum(len(payload) + 12 for kind, payload in chunks if kind not in KEEP_CHUNKS)
+        self.filtered = zlib.decompress(b''.join(payload for kind, payload in chunks if kind == b'IDAT'))
+
+    @property
+    def decodable(self):
+        """Pixel access is implemented for 8-bit, non-interlaced, non-palette images"""
+        return self.bit_depth == 8 and self.interlace == 0 and self.color_type in CHANNELS
+
+    @property
+    def channels(self):
+        return CHANNELS[self.color_type]
+
+    def rows(self):
+        """Unfiltered scanlines as bytearrays"""
+        bpp = self.channels
+        stride = self.width * bpp
+        previous = bytearray(stride)
+        rows = []
+        data = self.filtered
+        for y in range(self.height):
+            start = y * (stride + 1)
+            kind = data[start]
+            row = bytearray(data[start + 1:start + 1 + stride])
+            if kind == 1:
+                for i in range(bpp, stride):
+                    row[i] = (row[i] + row[i - bpp]) & 0xFF
+            elif kind == 2:
+                row = bytearray((a + b) & 0xFF for a, b in zip(row, previous))
+            elif kind == 3:
+                for i in range(stride):
+                    left = row[i - bpp] if i >= bpp else 0
+                    row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+            elif kind == 4:
+                for i in range(stride):
+                    if i >= bpp:
+                        a, c = row[i - bpp], previous[i - bpp]
+                    else:
+                        a = c = 0
+                    b = previous[i]
+                    p = a + b - c
+                    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                    row[i] = (row[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+            rows.append(row)
+            previous = row
+        return rows
+
+
+def filter_rows(rows, bpp):
+    """
+    Filtered scanline stream choosing, per row, the filter with the smallest sum
+    of absolute (signed) residuals - libpng's heuristic, over None/Sub/Up.
+    """
+    out = bytearray()
+    previous = bytes(len(rows[0])) if rows else b''
+    for row in rows:
+        row = bytes(row)
+        sub = bytes((row[i] - row[i - bpp]) & 0xFF if i >= bpp else row[i] for i in range(len(row)))
+        up = bytes((a - b) & 0xFF for a, b in zip(row, previous))
+        candidates = ((0, row), (1, sub), (2, up))
+        kind, best = min(candidates, key=lambda item: sum(v if v < 128 else 256 - v for v in item[1]))
+        out.append(kind)
+        out += best
+        previous = row
+    return bytes(out)
+
+
+def best_deflate(stream, trials=ZLIB_TRIALS):
+    """Smallest zlib stream over the (level, strategy, memLevel) trials"""
+    best = None
+    for level, strategy, memory in trials:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 15, memory, strategy)
+        compressed = compressor.compress(stream) + compressor.flush()
+        if best is None or len(compressed) < len(best):
+            best = compressed
+    return best
+
+
+# --- resampling ----------------------------------------------------------------
+
+def _spans(source, target):
+    """Source index range [start, end) averaged into each target index"""
+    scale = source / target
+    return [(int(i * scale), max(int(i * scale) + 1, min(source, int(round((i + 1) * scale))))) for i in range(target)]
+
+
+def resize_rows(rows, width, channels, target_width, target_height):
+    """
+    Box-filter downscale. Colour channels of images with alpha are averaged
+    premultiplied, so transparent pixels do not darken edges.
+    """
+    alpha = channels in (2, 4)
+    x_spans = _spans(width, target_width)
+    horizontal = []
+    for row in rows:
+        if alpha:
+            planes = [row[channel::channels] for channel in range(channels)]
+            weights = planes[-1]
+            premultiplied = [[v * a for v, a in zip(plane, weights)] for plane in planes[:-1]]
+            out = []
+            for start, end in x_spans:
+                total_alpha = sum(weights[start:end])
+                out.extend(sum(plane[start:end]) for plane in premultiplied)
+                out.append(total_alpha)
+                out.append(end - start)
+            horizontal.append(out)
+        else:
+            out = []
+            for start, end in x_spans:
+                out.extend(sum(row[start * channels + channel:end * channels:channels]) for channel in range(channels))
+                out.append(end - start)
+            horizontal.append(out)
+
+    stride = channels + 1
+    result = []
+    for start, end in _spans(len(rows), target_height):
+        sums = [sum(column) for column in zip(*horizontal[start:end])]
+        row = bytearray()
+        for x in range(target_width):
+            cell = sums[x * stride:(x + 1) * stride]
+            pixels = cell[-1]
+            if alpha:
+                total_alpha = cell[-2]
+                colours = [round(value / total_alpha) if total_alpha else 0 for value in cell[:-2]]
+                row.extend(min(255, value) for value in colours)
+                row.append(round(total_alpha / pixels))
+            else:
+                row.extend(round(value / pixels) for value in cell[:-1])
+        result.append(row)
+    return result
+
+
+# --- per-file processing ---------------------------------------------------------
+
+def variant_path(asset, density):
+    """Flutter's density variant location: dir/2.0x/name.png"""
+    if density == 1:
+        return asset
+    directory, name = os.path.split(asset)
+    return os.path.join(directory, f'{density:.1f}x', name)
+
+
+def optimize_png(path, logical_size=None, exhaustive=False):
+    """
+    Worker: {relative output path: png bytes} plus a stats dict. logical_size is
+    (width, height) in logical pixels, or None for recompression only.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    image = PngImage(data)
+    trials = EXHAUSTIVE_TRIALS if exhaustive else ZLIB_TRIALS
+    stats = {
+        'source_bytes': len(data),
+        'width': image.width,
+        'height': image.height,
+        'metadata_bytes_dropped': image.dropped,
+        'decode_bytes': image.width * image.height * 4,
+    }
+
+    rows = image.rows() if image.decodable else None
+    streams = [image.filtered]
+    if rows is not None:
+        streams.append(filter_rows(rows, image.channels))
+    recompressed = min((best_deflate(stream, trials) for stream in streams), key=len)
+
+    outputs = {}
+    if rows is not None and logical_size:
+        logical_width, logical_height = logical_size
+        for density in DENSITIES:
+            target_width = round(logical_width * density)
+            target_height = round(logical_height * density)
+            if target_width >= image.width or target_height >= image.height:
+                # Never upscale; the source itself serves this density
+                outputs[density] = (image.width, image.height, recompressed)
+                break
+            resized = resize_rows(rows, image.width, image.channels, target_width, target_height)
+            outputs[density] = (target_width, target_height,
+                                best_deflate(filter_rows(resized, image.channels), trials))
+    else:
+        outputs[1] = (image.width, image.height, recompressed)
+
+    files = {}
+    for density, (width, height, compressed) in outputs.items():
+        ihdr = struct.pack('>IIBBBBB', width, height, image.bit_depth, image.color_type, 0, 0, image.interlace)
+        files[density] = write_png([(b'IHDR', ihdr)] + image.header_chunks[1:], compressed)
+    if len(files) == 1 and len(files[1]) >= len(data):
+        files[1] = data  # already optimal; keep the source bytes
+
+    # A device loads the variant for its density, or the next one up when it is missing
+    stats['densities'] = sorted(files)
+    stats['optimized_bytes'] = len(files[max(files)])
+    stats['variant_bytes'] = {f'{density}x': len(png) for density, png in files.items()}
+    stats['decode_bytes_at'] = {}
+    for density in DENSITIES:
+        loaded = min((d for d in outputs if d >= density), default=max(outputs))
+        stats['decode_bytes_at'][f'{density}x'] = outputs[loaded][0] * outputs[loaded][1] * 4
+    return files, stats
+
+
+def _optimize_job(job):
+    path, logical_size, exhaustive = job
+    files, stats = optimize_png(path, logical_size, exhaustive)
+    return path, files, stats
+
+
+# --- on-screen sizes -------------------------------------------------------------
+
+def call_arguments(masked, start):
+    """
+    Top-level argument text of the call around `start` in masked source: up to
+    the bracket closing the call (or a `;`), skipping nested calls, lists and
+    closures so sizes of child or sibling widgets are not picked up.
+    """
+    depth = 0
+    kept = []
+    for ch in masked[start:]:
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+            if depth < 0:
+                break
+        elif ch == ';' and depth == 0:
+            break
+        elif depth == 0:
+            kept.append(ch)
+    return ''.join(kept)
+
+
+def display_sizes(lib_dir, screen_width=DEFAULT_SCREEN_WIDTH):
+    """
+    {asset: (logical width or None, logical height or None)} from Image.asset
+    and image-path references in lib/. The largest literal size over all uses
+    wins; references without literal sizes are assumed to span the screen width.
+    """
+    sizes = {}
+    for path in dart_files(lib_dir):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        masked = mask_source(text)
+        for match in IMAGE_ASSET_RE.finditer(text):
+            if masked[match.start()] != text[match.start()]:
+                continue  # commented out
+            asset = match.group(1)
+            arguments = {}
+            for name, value in SIZE_ARGUMENT_RE.findall(call_arguments(masked, match.end())):
+                arguments.setdefault(name, float(value))
+            width = arguments.get('width', arguments.get('size'))
+            height = arguments.get('height', arguments.get('size'))
+            if width is None and height is None:
+                width = screen_width
+            current = sizes.get(asset, (None, None))
+            sizes[asset] = (max(filter(None, (current[0], width)), default=None),
+                            max(filter(None, (current[1], height)), default=None))
+    return sizes
+
+
+def logical_size_for(image_size, display):
+    """(logical width, logical height) keeping the source aspect ratio"""
+    width, height = image_size
+    shown_width, shown_height = display
+    scale = max((shown_width or 0) / width, (shown_height or 0) / height)
+    return width * scale, height * scale
+
+
+def png_size(path):
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    return struct.unpack('>II', header[16:24])
+
+
+def find_pngs(roots):
+    found = []
+    for root in roots:
+        for directory, _, names in os.walk(root):
+            if any(os.path.normpath(directory).startswith(os.path.normpath(skip)) for skip in SKIP_DIRS):
+                continue
+            if re.search(r'/\d\.\dx$', directory):
+                continue  # existing density variants
+            found.extend(os.path.join(directory, name) for name in names if name.lower().endswith('.png'))
+    return sorted(found)
+
+
+# --- cache -------------------------------------------------------------------------
+
+class RasterCache:
+    """Outputs keyed by source sha256 and options, stored as content-addressed blobs"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json') if cache_dir else None
+        self.index = {}
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('version') == CACHE_VERSION:
+                    self.index = stored['entries']
+            except ValueError:
+                self.index = {}
+
+    @staticmethod
+    def key(path, options):
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read())
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        entry = self.index.get(key)
+        if not entry or not self.cache_dir:
+            return None
+        files = {}
+        for density, blob in entry['files'].items():
+            blob_path = os.path.join(self.cache_dir, blob + '.png')
+            if not os.path.exists(blob_path):
+                return None
+            with open(blob_path, 'rb') as f:
+                files[int(density)] = f.read()
+        return files, entry['stats']
+
+    def put(self, key, files, stats):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        blobs = {}
+        for density, png in files.items():
+            blob = hashlib.sha256(png).hexdigest()
+            blob_path = os.path.join(self.cache_dir, blob + '.png')
+            if not os.path.exists(blob_path):
+                with open(blob_path, 'wb') as f:
+                    f.write(png)
+            blobs[str(density)] = blob
+        self.index[key] = {'files': blobs, 'stats': stats}
+
+    def save(self):
+        if not self.index_path:
+            return
+        temporary = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self.index}, f)
+        os.replace(temporary, self.index_path)
+
+
+# --- pipeline ----------------------------------------------------------------------
+
+def optimize_assets(roots=DEFAULT_ROOTS, lib_dir=DEFAULT_LIB, output_dir=DEFAULT_OUTPUT, cache_dir=DEFAULT_CACHE_DIR,
+                    jobs=None, exhaustive=False, screen_width=DEFAULT_SCREEN_WIDTH, in_place=False):
+    with stage('scan'):
+        pngs = find_pngs(roots)
+        displays = display_sizes(lib_dir, screen_width)
+
+    store = RasterCache(cache_dir)
+    results, pending = {}, []
+    for path in pngs:
+        asset = path.replace(os.sep, '/')
+        display = displays.get(asset)
+        logical = logical_size_for(png_size(path), display) if display else None
+        options = {'logical': [round(value, 2) for value in logical] if logical else None, 'exhaustive': exhaustive}
+        key = RasterCache.key(path, options)
+        cached = store.get(key)
+        cache('raster', cached is not None)
+        if cached is None:
+            pending.append((key, (path, logical, exhaustive)))
+        else:
+            results[path] = cached
+
+    with stage('optimize'):
+        jobs = jobs or os.cpu_count() or 1
+        keys = dict((job[0], key) for key, job in pending)
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                computed = list(pool.map(_optimize_job, [job for _, job in pending]))
+        else:
+            computed = [_optimize_job(job) for _, job in pending]
+        for path, files, stats in computed:
+            results[path] = (files, stats)
+            store.put(keys[path], files, stats)
+            count('bytes_read', stats['source_bytes'])
+        store.save()
+
+    rows = []
+    with stage('write'):
+        for path in pngs:
+            files, stats = results[path]
+            for density, png in files.items():
+                target = variant_path(path, density)
+                if not in_place:
+                    target = os.path.join(output_dir, target)
+                os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+                with open(target, 'wb') as f:
+                    f.write(png)
+                count('bytes_written', len(png))
+            rows.append(dict(stats, asset=path.replace(os.sep, '/'),
+                             referenced=path.replace(os.sep, '/') in displays))
+    return {
+        'files': len(rows),
+        'source_bytes': sum(row['source_bytes'] for row in rows),
+        'optimized_bytes': sum(row['optimized_bytes'] for row in rows),
+        'decode_bytes': sum(row['decode_bytes'] for row in rows if row['referenced']),
+        'decode_bytes_at': {f'{density}x': sum(row['decode_bytes_at'][f'{density}x'] for row in rows
+                                               if row['referenced']) for density in DENSITIES},
+        'unreferenced': [row['asset'] for row in rows if not row['referenced']],
+        'assets': rows,
+    }
+
+
+def print_summary(report):
+    mb = 1024 * 1024
+    print(f"{'Asset':56} {'Source KB':>10} {'Out KB':>8} {'Decode MB':>10} {'@1x':>6} {'@2x':>6} {'@3x':>6}  Densities")
+    for row in report['assets']:
+        densities = ','.join(f'{density}x' for density in row['densities'])
+        at = row['decode_bytes_at']
+        print(f"{row['asset'][:56]:56} {row['source_bytes'] / 1024:>10,.0f} {row['optimized_bytes'] / 1024:>8,.0f} "
+              f"{row['decode_bytes'] / mb:>10.1f} {at['1x'] / mb:>6.1f} {at['2x'] / mb:>6.1f} {at['3x'] / mb:>6.1f}"
+              f"  {densities}")
+    print(f"\nBytes: {report['source_bytes'] / mb:.1f} MB -> {report['optimized_bytes'] / mb:.1f} MB "
+          f"(largest variant per asset)")
+    at = report['decode_bytes_at']
+    print(f"Decode memory of referenced images: {report['decode_bytes'] / mb:.1f} MB as shipped -> "
+          f"{at['1x'] / mb:.1f} / {at['2x'] / mb:.1f} / {at['3x'] / mb:.1f} MB on 1x / 2x / 3x devices")
+    if report['unreferenced']:
+        print(f"Not referenced from lib/: {', '.join(report['unreferenced'])}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Recompress PNG assets and generate 1x/2x/3x density variants')
+    parser.add_argument('roots', nargs='*', default=list(DEFAULT_ROOTS), help='directories to scan')
+    parser.add_argument('--lib', default=DEFAULT_LIB)
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help='output root (mirrors the source paths)')
+    parser.add_argument('--in-place', action='store_true', help='write next to the sources instead of --out')
+    parser.add_argument('--screen-width', type=float, default=DEFAULT_SCREEN_WIDTH,
+                        help='logical width assumed for images without a literal size')
+    parser.add_argument('--exhaustive', action='store_true', help='search every zlib level, strategy and memLevel')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('-o', '--output', help='write the report as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    missing = [root for root in args.roots if not os.path.isdir(root)]
+    if missing:
+        print(f"Error: {missing[0]} not found")
+        sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        report = optimize_assets(args.roots, args.lib, args.out, None if args.no_cache else args.cache_dir,
+                                 args.jobs, args.exhaustive, args.screen_width, args.in_place)
+    print_summary(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nOutput file: {args.output}")
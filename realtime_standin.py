@@ -0,0 +1,811 @@
+#!/usr/bin/env python3
+"""
+Realtime Chat Stand-in and Load Generator
+An asyncio Socket.IO server (Engine.IO v4 over WebSocket, the protocol
+socket_io_client speaks to ApiConfig.wsBaseUrl) implementing the events
+lib/services/websocket_service.dart uses: user and chat/group rooms, message
+fan-out with delivery acknowledgements, typing and read receipts, presence,
+and the direct call, like and match notifications. Listening on
+127.0.0.1:8000 by default, it matches the app's simulator WebSocket URL.
+
+`load` opens many concurrent client connections against it (or any
+compatible server), pairs them into chats or groups, sends messages at a
+fixed rate and measures fan-out latency per delivery and per message (until
+the last recipient has it), throughput, losses, and memory per connection on
+both sides (the server's from its /__realtime/stats endpoint). Tens of
+thousands of connections need the open file limit raised (done up to the hard
+limit) and, on loopback, several --bind addresses so source ports do not run
+out.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import secrets
+import ssl
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from caching_proxy import header, read_message, render_message
+from traffic_analyzer import LatencyHistogram
+
+DEFAULT_LISTEN = '127.0.0.1:8000'
+DEFAULT_URL = 'ws://127.0.0.1:8000'
+DEFAULT_CONNECTIONS = 1000
+DEFAULT_ROOM_SIZE = 2
+DEFAULT_RATE = 200
+DEFAULT_DURATION_S = 10
+DEFAULT_MESSAGE_BYTES = 64
+DEFAULT_CONNECT_CONCURRENCY = 200
+STATS_PATH = '/__realtime/stats'
+SOCKET_IO_PATH = '/socket.io/'
+PING_INTERVAL_S = 25
+PING_TIMEOUT_S = 20
+MAX_PAYLOAD = 1_000_000
+MAX_WRITE_BUFFER = 4 << 20  # a client this far behind is dropped as a slow consumer
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OP_CONTINUATION, OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x8, 0x9, 0xA
+
+# Client event -> (room kind, event emitted to the other room members)
+ROOM_EVENTS = {
+    'send-message': ('chat', 'new-message'),
+    'mark-read': ('chat', 'message-read'),
+    'send-group-message': ('group', 'group-message'),
+    'group-typing': ('group', 'group-user-typing'),
+    'mark-group-message-read': ('group', 'group-message-read'),
+    'add-group-member': ('group', 'group-user-added'),
+    'remove-group-member': ('group', 'group-user-removed'),
+    'update-group': ('group', 'group-updated'),
+    'delete-group': ('group', 'group-deleted'),
+}
+# Client event -> event emitted to the user named by toUserId (or fromUserId for replies to a call)
+DIRECT_EVENTS = {
+    'call-offer': 'call-offer',
+    'call-answer': 'call-answer',
+    'call-reject': 'call-reject',
+    'call-end': 'call-end',
+    'like-notification': 'like-received',
+    'match-notification': 'new-match',
+}
+ROOM_KEYS = {'chat': 'chatId', 'group': 'groupId'}
+
+LOAD_MODES = {
+    'chat': {'join': 'join-chat', 'send': 'send-message', 'typing': 'typing', 'read': 'mark-read',
+             'message': 'new-message', 'receipt': 'message-read', 'typing_events': ('user-typing',)},
+    'group': {'join': 'join-group', 'send': 'send-group-message', 'typing': 'group-typing',
+              'read': 'mark-group-message-read', 'message': 'group-message', 'receipt': 'group-message-read',
+              'typing_events': ('group-user-typing',)},
+}
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r', encoding='ascii') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def raise_open_file_limit(wanted):
+    """Raise the soft RLIMIT_NOFILE towards wanted (capped by the hard limit); returns the new limit"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if target > soft:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def apply_mask(payload, mask):
+    """XOR payload with the repeating 4-byte mask, as one big-integer operation"""
+    n = len(payload)
+    if not n:
+        return payload
+    key = int.from_bytes((mask * (n // 4 + 1))[:n], 'little')
+    return (int.from_bytes(payload, 'little') ^ key).to_bytes(n, 'little')
+
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    """One final WebSocket frame; clients must mask, servers must not"""
+    n = len(payload)
+    bit = 0x80 if mask else 0
+    head = bytearray([0x80 | opcode])
+    if n < 126:
+        head.append(bit | n)
+    elif n < 1 << 16:
+        head.append(bit | 126)
+        head += n.to_bytes(2, 'big')
+    else:
+        head.append(bit | 127)
+        head += n.to_bytes(8, 'big')
+    if mask:
+        key = os.urandom(4)
+        return bytes(head) + key + apply_mask(payload, key)
+    return bytes(head) + payload
+
+
+async def read_frame(reader, max_size=MAX_PAYLOAD):
+    """(opcode, payload) of the next message, reassembling fragments; control frames are returned as they come"""
+    parts, message_opcode = [], None
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        n = second & 0x7F
+        if n == 126:
+            n = int.from_bytes(await reader.readexactly(2), 'big')
+        elif n == 127:
+            n = int.from_bytes(await reader.readexactly(8), 'big')
+        if n > max_size:
+            raise ValueError(f'frame of {n} bytes exceeds {max_size}')
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(n)
+        if mask:
+            payload = apply_mask(payload, mask)
+        if opcode >= OP_CLOSE:
+            return opcode, payload
+        if opcode != OP_CONTINUATION:
+            message_opcode = opcode
+        parts.append(payload)
+        if first & 0x80:
+            return message_opcode, b''.join(parts)
+
+
+def event_packet(name, data=None):
+    """Engine.IO message carrying a Socket.IO EVENT"""
+    return '42' + json.dumps([name] if data is None else [name, data], separators=(',', ':'))
+
+
+def decode_event(body):
+    """(name, data, ack id) from the part of an EVENT packet after '42'"""
+    if body.startswith('/'):
+        _, _, body = body.partition(',')  # namespace; only the default one is served
+    digits = 0
+    while digits < len(body) and body[digits].isdigit():
+        digits += 1
+    arguments = json.loads(body[digits:])
+    if not isinstance(arguments, list) or not arguments or not isinstance(arguments[0], str):
+        raise ValueError('EVENT payload must be a list starting with the event name')
+    return arguments[0], arguments[1] if len(arguments) > 1 else None, int(body[:digits]) if digits else None
+
+
+class Connection:
+    __slots__ = ('sid', 'writer', 'user_id', 'rooms', 'last_seen')
+
+    def __init__(self, sid, writer):
+        self.sid = sid
+        self.writer = writer
+        self.user_id = None
+        self.rooms = set()
+        self.last_seen = time.monotonic()
+
+
+class RealtimeServer:
+    """Rooms, routing and stats of the stand-in; one Connection per Socket.IO client"""
+
+    def __init__(self, ping_interval=PING_INTERVAL_S, ping_timeout=PING_TIMEOUT_S):
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.rooms = {}
+        self.connections = set()
+        self.peak_connections = 0
+        self.total_connections = 0
+        self.events_in = Counter()
+        self.events_out = Counter()
+        self.frames_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.slow_consumers = 0
+        self.message_ids = 0
+        self.started = time.time()
+        self.baseline_rss = rss_bytes()
+        self.peak_rss = self.baseline_rss
+
+    def join(self, connection, room):
+        self.rooms.setdefault(room, set()).add(connection)
+        connection.rooms.add(room)
+
+    def leave(self, connection, room):
+        members = self.rooms.get(room)
+        if members is not None:
+            members.discard(connection)
+            if not members:
+                del self.rooms[room]
+        connection.rooms.discard(room)
+
+    def send(self, connection, frame):
+        transport = connection.writer.transport
+        if transport.is_closing():
+            return False
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.slow_consumers += 1
+            transport.abort()
+            return False
+        connection.writer.write(frame)
+        self.frames_out += 1
+        self.bytes_out += len(frame)
+        return True
+
+    def emit_to(self, connection, name, data=None):
+        if self.send(connection, encode_frame(event_packet(name, data).encode('utf-8'))):
+            self.events_out[name] += 1
+
+    def emit_room(self, room, name, data, exclude=None):
+        """Fan an event out to a room; the frame is encoded once and written to every member"""
+        members = self.rooms.get(room)
+        if not members:
+            return 0
+        frame = encode_frame(event_packet(name, data).encode('utf-8'))
+        delivered = sum(1 for member in list(members) if member is not exclude and self.send(member, frame))
+        self.events_out[name] += delivered
+        return delivered
+
+    def handle_event(self, connection, name, data):
+        self.events_in[name] += 1
+        data = data if isinstance(data, dict) else {}
+        stamped = dict(data, senderId=connection.user_id, serverTimestamp=datetime.now().isoformat())
+
+        if name in ('join-chat', 'leave-chat', 'join-group', 'leave-group'):
+            kind = name.split('-')[1]
+            room = f"{kind}:{data.get(ROOM_KEYS[kind])}"
+            if name.startswith('join'):
+                self.join(connection, room)
+                if kind == 'group':
+                    self.emit_room(room, 'group-user-joined', stamped, exclude=connection)
+            else:
+                if kind == 'group':
+                    self.emit_room(room, 'group-user-left', stamped, exclude=connection)
+                self.leave(connection, room)
+        elif name == 'join-user-room':
+            if data.get('userId') is not None and str(data['userId']) != connection.user_id:
+                self.leave(connection, f'user:{connection.user_id}')
+                connection.user_id = str(data['userId'])
+                self.join(connection, f'user:{connection.user_id}')
+        elif name in ROOM_EVENTS:
+            kind, outgoing = ROOM_EVENTS[name]
+            room = f"{kind}:{data.get(ROOM_KEYS[kind])}"
+            if name in ('send-message', 'send-group-message'):
+                self.message_ids += 1
+                stamped['id'] = f'm{self.message_ids}'
+            delivered = self.emit_room(room, outgoing, stamped, exclude=connection)
+            if name == 'send-message':
+                self.emit_to(connection, 'message-delivered', {'messageId': stamped['id'], 'chatId': data.get('chatId'),
+                                                               'deliveredTo': delivered})
+            elif name == 'send-group-message':
+                self.emit_to(connection, 'group-message-delivered',
+                             {'messageId': stamped['id'], 'groupId': data.get('groupId'), 'deliveredTo': delivered})
+            elif name == 'delete-group':
+                for member in list(self.rooms.get(room, ())):
+                    self.leave(member, room)
+        elif name == 'typing':
+            outgoing = 'user-typing' if data.get('isTyping') else 'user-stopped-typing'
+            self.emit_room(f"chat:{data.get('chatId')}", outgoing, stamped, exclude=connection)
+        elif name == 'status-update':
+            outgoing = 'user-online' if data.get('isOnline') else 'user-offline'
+            for room in [room for room in connection.rooms if room.startswith(('chat:', 'group:'))]:
+                self.emit_room(room, outgoing, stamped, exclude=connection)
+        elif name in DIRECT_EVENTS:
+            outgoing = DIRECT_EVENTS[name]
+            if name == 'like-notification' and data.get('likeType') == 'superlike':
+                outgoing = 'superlike-received'
+            target = data.get('toUserId', data.get('fromUserId'))
+            self.emit_room(f'user:{target}', outgoing, stamped)
+        elif name == 'ping':
+            self.emit_to(connection, 'pong', {'timestamp': datetime.now().isoformat()})
+        else:
+            self.events_in['(unhandled)'] += 1
+
+    async def serve_http(self, writer, start, headers):
+        """Stats endpoint, or a 400 for anything that is not a Socket.IO WebSocket upgrade"""
+        target = start.split(' ')[1] if start.count(' ') >= 2 else ''
+        if urlsplit(target).path == STATS_PATH:
+            status, body = '200 OK', json.dumps(self.report(), indent=2).encode('utf-8')
+        else:
+            status, body = '400 Bad Request', b'{"error":"only Socket.IO over WebSocket (EIO=4) is served"}'
+        writer.write(render_message(f'HTTP/1.1 {status}', [('Content-Type', 'application/json'),
+                                                          ('Connection', 'close')], body))
+        await writer.drain()
+
+    async def serve_client(self, reader, writer):
+        try:
+            request = await read_message(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            writer.close()
+            return
+        if request is None:
+            writer.close()
+            return
+        start, headers, _, _ = request
+        parts = start.split(' ')
+        target = urlsplit(parts[1] if len(parts) > 1 else '')
+        query = parse_qs(target.query)
+        key = header(headers, 'sec-websocket-key')
+        if (not target.path.endswith(SOCKET_IO_PATH) or (header(headers, 'upgrade') or '').lower() != 'websocket'
+                or not key or query.get('EIO') != ['4'] or query.get('transport') != ['websocket']):
+            try:
+                await self.serve_http(writer, start, headers)
+            finally:
+                writer.close()
+            return
+
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n').encode('latin-1'))
+        connection = Connection(secrets.token_urlsafe(12), writer)
+        self.connections.add(connection)
+        self.total_connections += 1
+        self.peak_connections = max(self.peak_connections, len(self.connections))
+        handshake = {'sid': connection.sid, 'upgrades': [], 'pingInterval': int(self.ping_interval * 1000),
+                     'pingTimeout': int(self.ping_timeout * 1000), 'maxPayload': MAX_PAYLOAD}
+        self.send(connection, encode_frame(('0' + json.dumps(handshake)).encode('utf-8')))
+        try:
+            while True:
+                opcode, payload = await read_frame(reader)
+                self.bytes_in += len(payload)
+                connection.last_seen = time.monotonic()
+                if opcode == OP_CLOSE:
+                    self.send(connection, encode_frame(payload[:2], OP_CLOSE))
+                    break
+                if opcode == OP_PING:
+                    self.send(connection, encode_frame(payload, OP_PONG))
+                    continue
+                if opcode != OP_TEXT:
+                    continue
+                packet = payload.decode('utf-8')
+                if packet.startswith('42'):
+                    try:
+                        name, data, ack = decode_event(packet[2:])
+                    except (ValueError, IndexError, TypeError):
+                        continue
+                    self.handle_event(connection, name, data)
+                    if ack is not None:
+                        self.send(connection, encode_frame(f'43{ack}[]'.encode('utf-8')))
+                elif packet.startswith('40'):
+                    try:
+                        auth = json.loads(packet[2:]) if len(packet) > 2 else {}
+                    except ValueError:
+                        auth = {}
+                    user_id = auth.get('userId') if isinstance(auth, dict) else None
+                    connection.user_id = str(user_id) if user_id is not None else connection.sid
+                    self.join(connection, f'user:{connection.user_id}')
+                    self.send(connection, encode_frame(('40' + json.dumps({'sid': connection.sid})).encode('utf-8')))
+                elif packet.startswith('41') or packet == '1':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, UnicodeDecodeError):
+            pass
+        finally:
+            for room in list(connection.rooms):
+                self.leave(connection, room)
+            self.connections.discard(connection)
+            writer.close()
+
+    async def heartbeat(self):
+        """Engine.IO pings from the server; clients silent for longer than interval + timeout are closed"""
+        ping = encode_frame(b'2')
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            deadline = time.monotonic() - self.ping_interval - self.ping_timeout
+            for connection in list(self.connections):
+                if connection.last_seen < deadline:
+                    connection.writer.transport.abort()
+                else:
+                    self.send(connection, ping)
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+
+    def report(self):
+        rss = rss_bytes()
+        self.peak_rss = max(self.peak_rss, rss)
+        connections = len(self.connections)
+        return {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'uptime_s': round(time.time() - self.started, 1),
+            'connections': connections,
+            'peak_connections': self.peak_connections,
+            'total_connections': self.total_connections,
+            'rooms': len(self.rooms),
+            'rss_bytes': rss,
+            'peak_rss_bytes': self.peak_rss,
+            'rss_per_connection_bytes': round((rss - self.baseline_rss) / connections) if connections else None,
+            'events_in': dict(self.events_in.most_common()),
+            'events_out': dict(self.events_out.most_common()),
+            'frames_out': self.frames_out,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'slow_consumers_dropped': self.slow_consumers,
+        }
+
+
+async def run_server(server, host, port):
+    listener = await asyncio.start_server(server.serve_client, host, port, backlog=4096)
+    print(f"Realtime stand-in on ws://{host}:{port}{SOCKET_IO_PATH} (Socket.IO, EIO=4)")
+    print(f"Stats at http://{host}:{port}{STATS_PATH}")
+    heartbeat = asyncio.ensure_future(server.heartbeat())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        heartbeat.cancel()
+
+
+class LoadClient:
+    __slots__ = ('index', 'user_id', 'room', 'reader', 'writer')
+
+    def __init__(self, index, room):
+        self.index = index
+        self.user_id = f'load-{index}'
+        self.room = room
+        self.reader = None
+        self.writer = None
+
+    def emit(self, name, data):
+        self.writer.write(encode_frame(event_packet(name, data).encode('utf-8'), mask=True))
+
+
+class LoadGenerator:
+    """
+    Connections grouped into rooms of room_size users; each message is sent by
+    a random connected client to its room and should reach the other members.
+    """
+
+    def __init__(self, url, connections=DEFAULT_CONNECTIONS, room_size=DEFAULT_ROOM_SIZE, rate=DEFAULT_RATE,
+                 duration=DEFAULT_DURATION_S, mode='chat', message_bytes=DEFAULT_MESSAGE_BYTES, typing_ratio=0.0,
+                 read_ratio=0.0, concurrency=DEFAULT_CONNECT_CONCURRENCY, binds=None):
+        parts = urlsplit(url)
+        self.secure = parts.scheme in ('wss', 'https')
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or (443 if self.secure else 80)
+        self.path = parts.path.rstrip('/') + SOCKET_IO_PATH + '?EIO=4&transport=websocket'
+        self.connections = connections
+        self.room_size = max(2, room_size)
+        self.rate = rate
+        self.duration = duration
+        self.names = LOAD_MODES[mode]
+        self.room_key = ROOM_KEYS[mode]
+        self.text = 'x' * message_bytes
+        self.typing_ratio = typing_ratio
+        self.read_ratio = read_ratio
+        self.concurrency = concurrency
+        self.binds = binds or [None]
+        self.clients = []
+        self.tasks = []
+        self.members = Counter()
+        self.connect_ms = LatencyHistogram()
+        self.delivery_ms = LatencyHistogram()
+        self.completion_ms = LatencyHistogram()
+        self.pending = {}
+        self.counts = Counter()
+        self.sequence = 0
+
+    async def open(self, client):
+        """WebSocket upgrade, Engine.IO open and Socket.IO connect for one client"""
+        bind = self.binds[client.index % len(self.binds)]
+        context = ssl.create_default_context() if self.secure else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=context,
+                                                       local_addr=(bind, 0) if bind else None)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        writer.write((f'GET {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nUpgrade: websocket\r\n'
+                      f'Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n')
+                     .encode('latin-1'))
+        response = await read_message(reader, is_response=True)
+        if response is None or response[3] != 101 or header(response[1], 'sec-websocket-accept') != accept_key(key):
+            writer.close()
+            raise ConnectionError(f"upgrade refused: {response[0] if response else 'no response'}")
+        _, opened = await read_frame(reader)
+        if not opened.startswith(b'0'):
+            raise ConnectionError('no Engine.IO open packet')
+        auth = {'token': f'load-token-{client.index}', 'userId': client.user_id}
+        writer.write(encode_frame(('40' + json.dumps(auth)).encode('utf-8'), mask=True))
+        while True:
+            _, packet = await read_frame(reader)
+            if packet.startswith(b'40'):
+                break
+            if packet.startswith(b'44'):
+                raise ConnectionError(f"connect refused: {packet[2:].decode('utf-8', 'replace')}")
+        client.reader, client.writer = reader, writer
+
+    async def connect(self, client, limit):
+        async with limit:
+            started = time.monotonic()
+            try:
+                await self.open(client)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                self.counts['connect_failed'] += 1
+                self.counts[f'connect_error: {type(e).__name__}'] += 1
+                return
+        self.connect_ms.add((time.monotonic() - started) * 1000)
+        client.emit(self.names['join'], {self.room_key: client.room})
+        self.members[client.room] += 1
+        self.clients.append(client)
+        self.tasks.append(asyncio.ensure_future(self.listen(client)))
+
+    async def listen(self, client):
+        names = self.names
+        try:
+            while True:
+                opcode, payload = await read_frame(client.reader)
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_PING:
+                    client.writer.write(encode_frame(payload, OP_PONG, mask=True))
+                    continue
+                if payload == b'2':
+                    client.writer.write(encode_frame(b'3', mask=True))
+                    continue
+                if not payload.startswith(b'42'):
+                    continue
+                name, data, _ = decode_event(payload[2:].decode('utf-8'))
+                self.counts[f'received {name}'] += 1
+                if name == names['message']:
+                    self.delivered(data, client)
+                elif name == names['receipt']:
+                    self.counts['read_receipts'] += 1
+                elif name in names['typing_events']:
+                    self.counts['typing_events'] += 1
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            self.counts['dropped'] += 1
+        except asyncio.CancelledError:
+            pass
+
+    def delivered(self, data, client):
+        now = time.monotonic()
+        sequence = (data.get('metadata') or {}).get('seq')
+        entry = self.pending.get(sequence)
+        if entry is None:
+            self.counts['unexpected_deliveries'] += 1
+            return
+        self.delivery_ms.add((now - entry[0]) * 1000)
+        entry[1] -= 1
+        if entry[1] <= 0:
+            self.completion_ms.add((now - entry[0]) * 1000)
+            del self.pending[sequence]
+        if self.read_ratio and random.random() < self.read_ratio:
+            client.emit(self.names['read'], {'messageId': data.get('id'), self.room_key: client.room})
+
+    def send_one(self):
+        client = random.choice(self.clients)
+        if client.writer.transport.is_closing():
+            return
+        recipients = self.members[client.room] - 1
+        if recipients < 1:
+            return
+        if self.typing_ratio and random.random() < self.typing_ratio:
+            client.emit(self.names['typing'], {self.room_key: client.room, 'isTyping': True})
+        self.sequence += 1
+        self.pending[self.sequence] = [time.monotonic(), recipients]
+        client.emit(self.names['send'], {self.room_key: client.room, 'message': self.text, 'messageType': 'text',
+                                         'metadata': {'seq': self.sequence}})
+        self.counts['sent'] += 1
+        self.counts['expected_deliveries'] += recipients
+
+    async def send_phase(self):
+        started = time.monotonic()
+        while True:
+            elapsed = time.monotonic() - started
+            if elapsed >= self.duration:
+                break
+            due = int(self.rate * elapsed) - self.counts['sent']
+            for _ in range(due):
+                self.send_one()
+            await asyncio.sleep(0.005)
+        return time.monotonic() - started
+
+    async def fetch_server_stats(self):
+        """The stand-in's stats report, or None when the target does not serve one"""
+        try:
+            context = ssl.create_default_context() if self.secure else None
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+            writer.write(f'GET {STATS_PATH} HTTP/1.1\r\nHost: {self.host}\r\nConnection: close\r\n\r\n'
+                         .encode('latin-1'))
+            response = await asyncio.wait_for(read_message(reader, is_response=True), 5)
+            writer.close()
+            return json.loads(response[2]) if response and response[3] == 200 else None
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            return None
+
+    async def run(self, drain_s=2.0):
+        rss_before = rss_bytes()
+        limit = asyncio.Semaphore(self.concurrency)
+        clients = [LoadClient(index, f'load-{index // self.room_size}') for index in range(self.connections)]
+        started = time.monotonic()
+        await asyncio.gather(*(self.connect(client, limit) for client in clients))
+        connect_s = time.monotonic() - started
+        rss_connected = rss_bytes()
+        server_connected = await self.fetch_server_stats()
+
+        send_s = 0.0
+        if self.clients:
+            await asyncio.sleep(0.5)  # let the room joins land before the first message
+            send_s = await self.send_phase()
+            waited = time.monotonic()
+            while self.pending and time.monotonic() - waited < drain_s:
+                await asyncio.sleep(0.05)
+        server_after = await self.fetch_server_stats()
+
+        for task in self.tasks:
+            task.cancel()
+        for client in self.clients:
+            client.writer.close()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        return self.report(connect_s, send_s, rss_connected - rss_before, server_connected, server_after)
+
+    def report(self, connect_s, send_s, client_rss_delta, server_connected, server_after):
+        connected = len(self.clients)
+        expected = self.counts['expected_deliveries']
+        delivered = self.delivery_ms.count
+        server = None
+        if server_connected:
+            server = {
+                'rss_per_connection_bytes': server_connected['rss_per_connection_bytes'],
+                'rss_bytes': server_connected['rss_bytes'],
+                'peak_connections': (server_after or server_connected)['peak_connections'],
+                'slow_consumers_dropped': (server_after or server_connected)['slow_consumers_dropped'],
+                'frames_out': (server_after or server_connected)['frames_out'],
+            }
+        return {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'target': f"{'wss' if self.secure else 'ws'}://{self.host}:{self.port}",
+            'mode': 'group' if self.names is LOAD_MODES['group'] else 'chat',
+            'connections': {'requested': self.connections, 'connected': connected,
+                            'failed': self.counts['connect_failed'], 'seconds': round(connect_s, 2),
+                            'per_second': round(connected / connect_s, 1) if connect_s else None,
+                            'connect_ms': self.connect_ms.summary()},
+            'room_size': self.room_size,
+            'messages': {'sent': self.counts['sent'], 'send_seconds': round(send_s, 2),
+                         'sent_per_second': round(self.counts['sent'] / send_s, 1) if send_s else None,
+                         'expected_deliveries': expected, 'delivered': delivered,
+                         'delivered_per_second': round(delivered / send_s, 1) if send_s else None,
+                         'delivery_ratio': round(delivered / expected, 4) if expected else None,
+                         'incomplete_messages': len(self.pending)},
+            'fanout_latency_ms': self.delivery_ms.summary(),
+            'fanout_completion_ms': self.completion_ms.summary(),
+            'read_receipts_received': self.counts['read_receipts'],
+            'typing_events_received': self.counts['typing_events'],
+            'dropped_connections': self.counts['dropped'],
+            'client_rss_per_connection_bytes': round(client_rss_delta / connected) if connected else None,
+            'server': server,
+            'errors': {name: value for name, value in self.counts.items() if name.startswith('connect_error')},
+        }
+
+
+def print_load_report(report):
+    connections, messages = report['connections'], report['messages']
+    print(f"Connections: {connections['connected']:,}/{connections['requested']:,} in {connections['seconds']}s "
+          f"({connections['per_second']}/s), {connections['failed']} failed; "
+          f"connect p50 {connections['connect_ms'].get('p50')} ms, p99 {connections['connect_ms'].get('p99')} ms")
+    for name, value in report['errors'].items():
+        print(f"  {name}: {value}")
+    print(f"Messages: {messages['sent']:,} sent to {report['mode']} rooms of {report['room_size']} "
+          f"({messages['sent_per_second']}/s), {messages['delivered']:,}/{messages['expected_deliveries']:,} "
+          f"delivered ({messages['delivered_per_second']}/s), ratio {messages['delivery_ratio']}")
+    for label, key in (('Fan-out latency', 'fanout_latency_ms'), ('Fan-out completion', 'fanout_completion_ms')):
+        latency = report[key]
+        if latency['count']:
+            print(f"{label:19} p50 {latency['p50']} ms  p90 {latency['p90']} ms  p99 {latency['p99']} ms  "
+                  f"max {latency['max']} ms")
+    if report['read_receipts_received'] or report['typing_events_received']:
+        print(f"Read receipts: {report['read_receipts_received']:,}  typing events: "
+              f"{report['typing_events_received']:,}")
+    if report['client_rss_per_connection_bytes'] is not None:
+        print(f"Client memory: {report['client_rss_per_connection_bytes'] / 1024:.1f} KB per connection")
+    server = report['server']
+    if server and server['rss_per_connection_bytes'] is not None:
+        print(f"Server memory: {server['rss_per_connection_bytes'] / 1024:.1f} KB per connection "
+              f"({server['rss_bytes'] / (1 << 20):.1f} MB RSS at {server['peak_connections']:,} connections), "
+              f"{server['slow_consumers_dropped']} slow consumers dropped")
+
+
+def spawn_server(listen):
+    """Start the stand-in in a separate process so its memory is measured apart from the load generator's"""
+    import socket
+    import subprocess
+
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'serve', '--listen', listen],
+                               stdout=subprocess.DEVNULL)
+    host, _, port = listen.rpartition(':')
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host or '127.0.0.1', int(port)), timeout=0.2).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f'stand-in did not start on {listen}')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Realtime (Socket.IO) chat stand-in server and load generator')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='run the stand-in server')
+    serve.add_argument('--listen', default=DEFAULT_LISTEN, help='host:port to listen on')
+    serve.add_argument('--ping-interval', type=float, default=PING_INTERVAL_S)
+    serve.add_argument('--ping-timeout', type=float, default=PING_TIMEOUT_S)
+    serve.add_argument('-o', '--output', help='write the stats report as JSON on shutdown')
+
+    load = subparsers.add_parser('load', help='open many connections and measure message fan-out')
+    load.add_argument('--url', default=DEFAULT_URL, help='WebSocket base URL (as ApiConfig.wsBaseUrl)')
+    load.add_argument('--spawn', action='store_true', help='start a stand-in server at --url for the run')
+    load.add_argument('-c', '--connections', type=int, default=DEFAULT_CONNECTIONS)
+    load.add_argument('--room-size', type=int, default=DEFAULT_ROOM_SIZE, help='users per chat or group')
+    load.add_argument('--mode', choices=sorted(LOAD_MODES), default='chat')
+    load.add_argument('--rate', type=float, default=DEFAULT_RATE, help='messages sent per second')
+    load.add_argument('--duration', type=float, default=DEFAULT_DURATION_S, help='seconds of sending')
+    load.add_argument('--message-bytes', type=int, default=DEFAULT_MESSAGE_BYTES)
+    load.add_argument('--typing-ratio', type=float, default=0.0, help='share of messages preceded by a typing event')
+    load.add_argument('--read-ratio', type=float, default=0.0, help='share of deliveries answered with a read receipt')
+    load.add_argument('--concurrency', type=int, default=DEFAULT_CONNECT_CONCURRENCY,
+                      help='connection handshakes in flight')
+    load.add_argument('--bind', action='append', help='local source address (repeatable; spreads source ports)')
+    load.add_argument('-o', '--output', help='write the load report as JSON')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        raise_open_file_limit(1 << 20)
+        server = RealtimeServer(args.ping_interval, args.ping_timeout)
+        host, _, port = args.listen.rpartition(':')
+        try:
+            asyncio.run(run_server(server, host or '127.0.0.1', int(port)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            report = server.report()
+            print(f"\nConnections: {report['total_connections']} total, {report['peak_connections']} peak; "
+                  f"events in: {sum(report['events_in'].values())}, frames out: {report['frames_out']}")
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2)
+                print(f"Output file: {args.output}")
+        sys.exit(0)
+
+    if args.connections < 2 or args.room_size < 2:
+        print("Error: --connections and --room-size must be at least 2")
+        sys.exit(1)
+    limit = raise_open_file_limit(args.connections + 256)
+    if limit is not None and limit < args.connections + 64:
+        print(f"Warning: open file limit is {limit}; raise it (ulimit -n) for {args.connections} connections")
+
+    process = None
+    if args.spawn:
+        parts = urlsplit(args.url)
+        try:
+            process = spawn_server(f"{parts.hostname or '127.0.0.1'}:{parts.port or 80}")
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    try:
+        generator = LoadGenerator(args.url, args.connections, args.room_size, args.rate, args.duration, args.mode,
+                                  args.message_bytes, args.typing_ratio, args.read_ratio, args.concurrency, args.bind)
+        report = asyncio.run(generator.run())
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+    print_load_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Output file: {args.output}")
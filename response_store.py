@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Content-addressed Response Example Store
+Response bodies are stored once by content hash, like OpenAPI `components`, so
+the Postman collection and All_API_Methods.md can reference repeated examples
+(401 "Unauthenticated", 404, 422, 500, user objects) instead of repeating them.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+
+EXAMPLE_ID_LENGTH = 12
+COMPONENTS_KEY = 'components'
+EXAMPLE_REF_KEY = 'x-example-ref'
+REFERENCE_RE = re.compile(r"See \[example `([0-9a-f]+)`\]\(#example-\1\)\n\n")
+
+
+def canonical_text(text):
+    """Canonical form used for hashing: compact sorted JSON, or the raw text if not JSON"""
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        return text.strip()
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def example_id(text, exact=False):
+    """
+    Stable id for an example body; formatting differences map to the same id
+    unless exact, which hashes the text as written
+    """
+    return hashlib.sha256((text if exact else canonical_text(text)).encode('utf-8')).hexdigest()[:EXAMPLE_ID_LENGTH]
+
+
+class ResponseExampleStore:
+    """
+    Unique example bodies keyed by content hash, with reference counts. By
+    default bodies that differ only in formatting share one entry (first
+    formatting wins); an exact store keeps every distinct text.
+    """
+
+    def __init__(self, examples=None, exact=False):
+        self.examples = dict(examples or {})
+        self.references = {key: 0 for key in self.examples}
+        self.exact = exact
+
+    def add(self, text):
+        """Store a body and return its id"""
+        key = example_id(text, self.exact)
+        if key not in self.examples:
+            self.examples[key] = text
+            self.references[key] = 0
+        self.references[key] += 1
+        return key
+
+    def get(self, key):
+        return self.examples[key]
+
+    def stats(self):
+        """Unique count, reference count and bytes saved by storing each body once"""
+        saved = sum(len(self.examples[key].encode('utf-8')) * (refs - 1)
+                    for key, refs in self.references.items() if refs > 1)
+        return {
+            'unique_examples': len(self.examples),
+            'references': sum(self.references.values()),
+            'bytes_saved': saved,
+        }
+
+
+def anchor(key):
+    """Markdown anchor name for an example"""
+    return f'example-{key}'
+
+
+def render_reference(key):
+    """Inline link used in place of a repeated example block"""
+    return f"See [example `{key}`](#{anchor(key)})\n\n"
+
+
+def inline_single_references(doc, store):
+    """Put examples referenced only once back inline; a link would only add bytes"""
+    def expand(match):
+        key = match.group(1)
+        if store.references.get(key, 0) > 1:
+            return match.group(0)
+        text = store.examples[key]
+        return "```json\n" + text + ("" if text.endswith("\n") else "\n") + "```\n\n"
+
+    return REFERENCE_RE.sub(expand, doc)
+
+
+def render_examples_section(store):
+    """Markdown appendix that prints each shared example once"""
+    shared = [(key, text) for key, text in store.examples.items() if store.references.get(key, 0) > 1]
+    doc = "\n## Response Examples\n\n"
+    doc += f"**Shared Examples:** {len(shared)}\n\n"
+    for key, text in shared:
+        doc += f'<a id="{anchor(key)}"></a>\n\n'
+        doc += f"#### Example `{key}`\n\n"
+        doc += f"_Referenced {store.references.get(key, 0)} times_\n\n"
+        doc += "```json\n" + text + ("" if text.endswith("\n") else "\n") + "```\n\n"
+    return doc
+
+
+def iter_responses(collection):
+    """Yield every recorded response dict in a Postman collection"""
+    def walk(item):
+        if 'item' in item:
+            for sub_item in item['item']:
+                yield from walk(sub_item)
+        else:
+            yield from item.get('response', [])
+
+    for item in collection.get('item', []):
+        yield from walk(item)
+
+
+def _replace_key(mapping, old, new, value):
+    """Swap one key of a dict for another in place, keeping its position"""
+    items = [(new, value) if key == old else (key, item) for key, item in mapping.items()]
+    mapping.clear()
+    mapping.update(items)
+
+
+def externalize_collection(collection):
+    """
+    Return a copy of a Postman collection whose repeated response bodies are
+    replaced by references into a top-level components.examples map, plus the
+    store. Bodies are matched by exact text, so inline_collection restores the
+    original collection.
+    """
+    shared = copy.deepcopy(collection)
+    store = ResponseExampleStore(exact=True)
+    responses = [response for response in iter_responses(shared) if response.get('body')]
+    keys = [store.add(response['body']) for response in responses]
+    # Bodies used once stay inline; a reference would only add bytes
+    for response, key in zip(responses, keys):
+        if store.references[key] > 1:
+            _replace_key(response, 'body', EXAMPLE_REF_KEY, key)
+    shared[COMPONENTS_KEY] = {'examples': {key: store.get(key) for key, refs in store.references.items()
+                                           if refs > 1}}
+    return shared, store
+
+
+def inline_collection(shared):
+    """Expand an externalized collection back into a plain Postman collection"""
+    collection = copy.deepcopy(shared)
+    examples = collection.pop(COMPONENTS_KEY, {}).get('examples', {})
+    for response in iter_responses(collection):
+        key = response.get(EXAMPLE_REF_KEY)
+        if key is not None:
+            _replace_key(response, EXAMPLE_REF_KEY, 'body', examples[key])
+    return collection
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Store Postman response examples once by content hash')
+    parser.add_argument('action', choices=['externalize', 'inline'])
+    parser.add_argument('input')
+    parser.add_argument('output')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: Postman collection not found at {args.input}")
+        exit(1)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        collection = json.load(f)
+
+    if args.action == 'externalize':
+        result, store = externalize_collection(collection)
+        stats = store.stats()
+        print(f"Unique examples: {stats['unique_examples']} of {stats['references']} responses")
+        print(f"Bytes saved: {stats['bytes_saved']}")
+    else:
+        result = inline_collection(collection)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"Output file: {args.output}")
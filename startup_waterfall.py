@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Static Cold-start Request Waterfall for the Flutter App
+Starts at main() in lib/main.dart, follows awaited initialisation, runApp, the
+initial route, widget initState/build methods and the providers they read,
+down through services to the http calls in api_services/*, resolving URLs to
+ApiConfig constants and registry endpoints. Network requests are placed on
+levels: a request on level N can only start after N earlier requests on its
+await chain have completed, so requests sharing a level are independent and
+every extra level is one more round-trip on the launch critical path.
+
+This is a static approximation (no type inference beyond fields, locals and
+provider lookups); unresolved dynamic URLs are reported as such.
+"""
+
+import json
+import os
+import re
+
+from api_section_index import endpoint_key, normalize_path
+from dart_source import block_end, dart_files, is_widget_class, mask_source, package_name_of, paren_end, \
+    parse_dart_file, resolve_import
+from endpoint_router import EndpointRouter
+
+DEFAULT_LIB = 'lib'
+DEFAULT_ENTRY = 'lib/main.dart'
+DEFAULT_API_CONFIG = 'lib/config/api_config.dart'
+DEFAULT_TARGET = 'HomePage'
+DEFAULT_THROUGH = r'Splash|Wrapper|Loading|Gate'
+SCREEN_SUFFIXES = ('Screen', 'Page')
+HTTP_VERBS = {'get': 'GET', 'post': 'POST', 'put': 'PUT', 'patch': 'PATCH', 'delete': 'DELETE', 'head': 'HEAD'}
+WIDGET_LIFECYCLE = ('initState', 'didChangeDependencies')
+
+CALL_RE = re.compile(r'(?<![\w.])(?:(\w+)(\(\))?\s*\.\s*(?:instance\s*\.\s*)?)?(\w+)\s*(?:<([^<>(){};]*)>)?\s*\(')
+PROVIDER_READ_RE = re.compile(r'(?:Provider\.of|\.read|\.watch|\.select|Consumer\d?|Selector)\s*<\s*(\w+)')
+LOCAL_TYPE_RES = (
+    re.compile(r'\b(?:final|var|late)\s+(\w+)\s*=\s*(?:await\s+)?Provider\.of<(\w+)>'),
+    re.compile(r'\b(?:final|var|late)\s+(\w+)\s*=\s*(?:await\s+)?context\.(?:read|watch)<(\w+)>'),
+    re.compile(r'\b(?:final|var|late)\s+(\w+)\s*=\s*(?:const\s+|new\s+)?([A-Z]\w*)(?:\.instance)?\s*[.(;]'),
+    re.compile(r'\b([A-Z]\w*)(?:<[^;=(){}]*>)?\??\s+(\w+)\s*='),
+)
+PROVIDER_CREATE_RE = re.compile(r'(?:ChangeNotifierProvider|Provider|ListenableProvider)(?:<\w+>)?\s*\(([^;]*?)'
+                                r'create\s*:\s*\([^)]*\)\s*=>\s*(\w+)\s*\(', re.DOTALL)
+ROUTE_ENTRY_RE = re.compile(r"'([^']+)'\s*:\s*\([^)]*\)\s*(?:=>|\{[^}]*?return)\s*(?:const\s+)?(\w+)\s*\(")
+URL_TOKEN_RE = re.compile(r"ApiConfig\.(\w+)|'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"|\b(_?[A-Za-z]\w*)\b")
+BASE_INTERPOLATION_RE = re.compile(r'^\$\{?(?:ApiConfig\.)?_?\w*[bB]ase[Uu]rl\}?')
+API_INTERPOLATION_RE = re.compile(r'\$\{ApiConfig\.(\w+)\}')
+INTERPOLATION_RE = re.compile(r'\$\{[^}]*\}|\$\w+')
+
+
+class DartProject:
+    """Parsed lib/ sources with class lookup scoped by imports"""
+
+    def __init__(self, lib_dir=DEFAULT_LIB):
+        self.lib_dir = lib_dir
+        self.package_name = package_name_of(os.path.dirname(os.path.abspath(lib_dir)))
+        self.files = {path: parse_dart_file(path) for path in dart_files(lib_dir)}
+        self.classes = {}
+        self.functions = {}
+        for path, parsed in self.files.items():
+            for name in parsed['classes']:
+                self.classes.setdefault(name, []).append(path)
+            for name in parsed['functions']:
+                self.functions.setdefault(name, []).append(path)
+        self._text = {}
+        self._masked = {}
+        self._imports = {}
+        self.class_info = {name: self.files[paths[0]]['classes'][name] for name, paths in self.classes.items()}
+
+    def text(self, path):
+        if path not in self._text:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                self._text[path] = f.read()
+        return self._text[path]
+
+    def masked(self, path):
+        if path not in self._masked:
+            self._masked[path] = mask_source(self.text(path))
+        return self._masked[path]
+
+    def imported_files(self, path):
+        if path not in self._imports:
+            self._imports[path] = {resolve_import(path, entry['uri'], self.lib_dir, self.package_name)
+                                   for entry in self.files[path]['imports']}
+        return self._imports[path]
+
+    def class_path(self, name, from_path=None):
+        """File defining a class, preferring the importer's own file and direct imports"""
+        paths = self.classes.get(name)
+        if not paths:
+            return None
+        if from_path is not None:
+            if from_path in paths:
+                return from_path
+            imported = self.imported_files(from_path)
+            for path in paths:
+                if path in imported:
+                    return path
+        return paths[0]
+
+    def find_method(self, class_name, method, from_path=None):
+        """(path, class, body info) for a method, searching app superclasses too"""
+        seen = set()
+        while class_name and class_name not in seen:
+            seen.add(class_name)
+            path = self.class_path(class_name, from_path)
+            if path is None:
+                return None
+            info = self.files[path]['classes'][class_name]
+            if method in info['methods']:
+                return path, class_name, info['methods'][method]
+            class_name, from_path = info['extends'], path
+        return None
+
+
+def load_api_constants(api_config_path=DEFAULT_API_CONFIG):
+    """ApiConfig string constants (endpoint paths), from the Dart source"""
+    with open(api_config_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return dict(re.findall(r"static\s+const\s+String\s+(\w+)\s*=\s*'([^']*)'", text))
+
+
+def resolve_url(expression, body_before, file_constants, api_constants):
+    """
+    Endpoint path for the URL expression passed to http.*, plus the ApiConfig
+    constants it uses. Returns (None, names) when the path is fully dynamic.
+    """
+    for _ in range(3):
+        name = expression.strip()
+        if not re.fullmatch(r'\w+', name):
+            break
+        assignments = re.findall(r'\b(?:final|var|late|String|Uri)\??\s+' + name + r'\s*=\s*([^;]+);', body_before)
+        if not assignments:
+            break
+        expression = assignments[-1]
+
+    pieces, names = [], []
+    for match in URL_TOKEN_RE.finditer(expression):
+        constant, single, double, identifier = match.groups()
+        if constant is not None:
+            if constant in api_constants:
+                pieces.append(api_constants[constant])
+                names.append(constant)
+        elif single is not None or double is not None:
+            literal = BASE_INTERPOLATION_RE.sub('', single if single is not None else double)
+            for constant in API_INTERPOLATION_RE.findall(literal):
+                names.append(constant)
+            literal = API_INTERPOLATION_RE.sub(lambda m: api_constants.get(m.group(1), ':param'), literal)
+            if literal.startswith('http'):
+                literal = re.sub(r'^https?://[^/]+(/api)?', '', literal)
+            pieces.append(INTERPOLATION_RE.sub(':param', literal))
+        elif identifier in file_constants:
+            pieces.append(file_constants[identifier])
+            names.append(identifier)
+    path = ''.join(pieces).split('?', 1)[0]
+    if not path.strip('/') or path.strip('/') == ':param':
+        return None, names
+    path = re.sub(r'/+', '/', normalize_path(path))
+    return path, names
+
+
+class Waterfall:
+    """Builds the startup request waterfall from main()"""
+
+    def __init__(self, project, api_constants, router=None, target=DEFAULT_TARGET, through=DEFAULT_THROUGH):
+        self.project = project
+        self.api_constants = api_constants
+        self.router = router
+        self.target = target
+        self.through = re.compile(through)
+        self.summaries = {}
+        self.providers = {}
+        self.created = set()
+        self.walked_widgets = set()
+        self.events = []
+        self.notes = []
+
+    # --- function summaries -------------------------------------------------
+
+    def summarize(self, path, class_name, method_name, info):
+        """
+        Events (level, kind, payload, chain, awaited) of a function body relative
+        to its start, and how many levels an awaiting caller waits for.
+        """
+        key = (path, class_name, method_name)
+        if key in self.summaries:
+            return self.summaries[key]
+        self.summaries[key] = ([], 0)  # recursion guard
+        label = f'{class_name}.{method_name}' if class_name else method_name
+        masked = self.project.masked(path)
+        text = self.project.text(path)
+        start, end = info['start'], info['end']
+        body = masked[start:end]
+        locals_ = self.local_types(body)
+        parallel_spans = [(m.start(), paren_end(body, m.end() - 1)) for m in re.finditer(r'Future\s*\.\s*wait\s*\(', body)]
+
+        events, level = [], 0
+        group_depth, group_end = 0, -1
+        position = 0
+        while True:
+            match = CALL_RE.search(body, position)
+            if match is None:
+                break
+            if match.start() >= group_end > -1:
+                level += group_depth
+                group_depth, group_end = 0, -1
+            receiver, constructed, name, type_args = match.groups()
+            before = body[:match.start()].rstrip()
+            awaited = before.endswith('await') or (before.endswith('return') and info['async'])
+            in_group = next((span for span in parallel_spans if span[0] < match.start() < span[1]), None)
+            if in_group is not None and group_end == -1:
+                group_end = in_group[1]
+            call_end = paren_end(body, match.end() - 1)
+            sub_events, sub_depth, consumed = self.call_events(path, class_name, locals_, receiver, constructed,
+                                                               name, type_args, body, match, call_end, text, start)
+            for sub_level, kind, payload, chain, sub_awaited in sub_events:
+                # A request counts as awaited when its own call site awaits it
+                blocking = awaited if kind == 'request' and not chain else sub_awaited
+                events.append((level + sub_level, kind, payload, (label,) + chain, blocking))
+            if in_group is not None:
+                group_depth = max(group_depth, sub_depth)
+            elif awaited:
+                level += sub_depth
+            position = call_end if consumed else match.end()
+        if group_end > -1:
+            level += group_depth
+        result = (events, level)
+        self.summaries[key] = result
+        return result
+
+    def local_types(self, body):
+        types = {}
+        for pattern in LOCAL_TYPE_RES:
+            for match in pattern.finditer(body):
+                variable, type_name = match.groups()
+                if pattern is LOCAL_TYPE_RES[3]:
+                    variable, type_name = type_name, variable
+                types.setdefault(variable, type_name)
+        return types
+
+    def call_events(self, path, class_name, locals_, receiver, constructed, name, type_args, body, match, call_end,
+                    text, body_offset):
+        """Events for one call site; `consumed` says whether its arguments were handled as a unit"""
+        if receiver == 'http' and name in HTTP_VERBS:
+            return [(0, 'request', self.request(path, HTTP_VERBS[name], body, match, call_end, text, body_offset),
+                     (), True)], 1, True
+        if receiver == 'http' and name == 'MultipartRequest':
+            verb = re.match(r"\s*'(\w+)'", body[match.end():call_end])
+            method = verb.group(1) if verb else 'POST'
+            return [(0, 'request', self.request(path, method, body, match, call_end, text, body_offset, skip=1),
+                     (), True)], 1, True
+        if name == 'runApp':
+            widget = re.match(r'\s*(?:const\s+)?(\w+)\s*\(', body[match.end():call_end])
+            if widget:
+                return [(0, 'widget', widget.group(1), (), False)], 0, True
+            return [], 0, True
+        if name in ('of', 'read', 'watch') and type_args:
+            return [(0, 'provider', type_args.strip(), (), False)], 0, False
+
+        target = self.resolve_call(path, class_name, locals_, receiver, constructed, name)
+        if target is None:
+            return [], 0, False
+        target_path, target_class, target_name, info = target
+        events, depth = self.summarize(target_path, target_class, target_name, info)
+        return events, depth, False
+
+    def resolve_call(self, path, class_name, locals_, receiver, constructed, name):
+        project = self.project
+        candidates = []
+        if receiver in (None, 'this', 'super'):
+            if class_name:
+                candidates.append((class_name, name))
+            if receiver is None and name in project.functions:
+                function_path = project.functions[name][0]
+                return function_path, None, name, project.files[function_path]['functions'][name]
+            if receiver is None and name in project.classes and name not in ('State',):
+                candidates.append((name, name))  # constructor body
+        elif receiver in project.classes:
+            candidates.append((receiver, name))
+        else:
+            owner = locals_.get(receiver)
+            if owner is None and class_name:
+                owner = self.field_type(path, class_name, receiver)
+            if owner:
+                candidates.append((owner, name))
+        for owner, method in candidates:
+            found = project.find_method(owner, method, path)
+            if found:
+                found_path, found_class, info = found
+                return found_path, found_class, method, info
+        return None
+
+    def field_type(self, path, class_name, field):
+        found_path = self.project.class_path(class_name, path)
+        seen = set()
+        while class_name and found_path and class_name not in seen:
+            seen.add(class_name)
+            info = self.project.files[found_path]['classes'][class_name]
+            if field in info['fields']:
+                return info['fields'][field]
+            class_name = info['extends']
+            found_path = self.project.class_path(class_name, found_path) if class_name else None
+        return None
+
+    def request(self, path, method, body, match, call_end, text, body_offset, skip=0):
+        arguments = text[body_offset + match.end():body_offset + call_end - 1]
+        expression = split_arguments(arguments)[skip] if len(split_arguments(arguments)) > skip else ''
+        parsed = self.project.files[path]
+        endpoint, names = resolve_url(expression, text[body_offset:body_offset + match.start()],
+                                      parsed['constants'], self.api_constants)
+        key = endpoint_key(method, endpoint) if endpoint else None
+        registered = self.router.match(method, endpoint) if self.router and endpoint else None
+        return {
+            'method': method,
+            'path': endpoint,
+            'endpoint': registered or key,
+            'registered': bool(registered),
+            'api_config': names,
+            'location': f'{path}:{text.count(chr(10), 0, body_offset + match.start()) + 1}',
+        }
+
+    # --- widgets and providers ------------------------------------------------
+
+    def widget_events(self, widget):
+        """Events for mounting a widget: its State lifecycle, providers it reads and child widgets"""
+        project = self.project
+        if widget in self.walked_widgets or widget not in project.classes:
+            return [], []
+        self.walked_widgets.add(widget)
+        path = project.class_path(widget)
+        info = project.files[path]['classes'][widget]
+        classes = [(path, widget, info)]
+        create = info['methods'].get('createState')
+        if create:
+            state = re.search(r'(\w+)\s*\(', project.masked(path)[create['start']:create['end']])
+            if state and state.group(1) in project.classes:
+                state_path = project.class_path(state.group(1), path)
+                classes.append((state_path, state.group(1), project.files[state_path]['classes'][state.group(1)]))
+
+        events, deferred = [], []
+        for class_path, class_name, class_info in classes:
+            for lifecycle in WIDGET_LIFECYCLE:
+                if lifecycle in class_info['methods']:
+                    sub, _ = self.summarize(class_path, class_name, lifecycle, class_info['methods'][lifecycle])
+                    events.extend(sub)
+            build = class_info['methods'].get('build')
+            if build:
+                events_, deferred_ = self.build_events(class_path, class_name, build)
+                events.extend(events_)
+                deferred.extend(deferred_)
+        return [(level, kind, payload, (widget,) + chain, awaited)
+                for level, kind, payload, chain, awaited in events], deferred
+
+    def build_events(self, path, class_name, build):
+        project = self.project
+        masked = project.masked(path)
+        text = project.text(path)
+        start, end = build['start'], build['end']
+        body = masked[start:end]
+        source = text[start:end]
+        events, deferred = [], []
+
+        for match in PROVIDER_CREATE_RE.finditer(body):
+            lazy = 'lazy' not in match.group(1) or 'lazy: true' in match.group(1).replace('  ', ' ')
+            provider = match.group(2)
+            if provider not in self.providers:
+                self.providers[provider] = lazy
+                if not lazy:
+                    events.append((0, 'provider', provider, (class_name,), False))
+
+        skip = []
+        routes = re.search(r'\broutes\s*:\s*\{', body)
+        if routes:
+            routes_end = block_end(body, routes.end() - 1)
+            skip.append((routes.start(), routes_end))
+            table = dict(ROUTE_ENTRY_RE.findall(source[routes.start():routes_end]))
+            initial = re.search(r"initialRoute\s*:\s*'([^']*)'", source)
+            route = initial.group(1) if initial else '/'
+            if route in table:
+                events.append((0, 'widget', table[route], (f"route '{route}'",), False))
+
+        methods = project.class_info[class_name]['methods'] if class_name in project.class_info else {}
+        spans = [(start, end, skip)]
+        helpers = set()
+        while spans:
+            span_start, span_end, span_skip = spans.pop()
+            body = masked[span_start:span_end]
+            for provider in PROVIDER_READ_RE.findall(text[span_start:span_end]):
+                events.append((0, 'provider', provider, (class_name,), False))
+            # Widget trees are often split into _buildX() helpers of the same class
+            for helper in re.findall(r'(?<![\w.])(_build\w*)\s*\(', body):
+                if helper in methods and helper not in helpers:
+                    helpers.add(helper)
+                    spans.append((methods[helper]['start'], methods[helper]['end'], []))
+            for match in re.finditer(r'(?<![\w.])(?:const\s+)?([A-Z]\w*)\s*\(', body):
+                if any(a <= match.start() < b for a, b in span_skip):
+                    continue
+                child = match.group(1)
+                if child == class_name or not is_widget_class(project.class_info, child):
+                    continue
+                if child == self.target:
+                    deferred.append(child)
+                elif child.endswith(SCREEN_SUFFIXES) and not self.through.search(child):
+                    continue  # alternative branch, not on the way to the target screen
+                else:
+                    events.append((0, 'widget', child, (class_name,), False))
+        return events, deferred
+
+    def provider_events(self, provider):
+        """Constructor of a provider the first time it is read"""
+        if provider in self.created or provider not in self.providers:
+            return []
+        self.created.add(provider)
+        found = self.project.find_method(provider, provider)
+        if not found:
+            return []
+        path, class_name, info = found
+        events, _ = self.summarize(path, class_name, provider, info)
+        return [(level, kind, payload, (f'create {provider}',) + chain, awaited)
+                for level, kind, payload, chain, awaited in events]
+
+    # --- flattening -------------------------------------------------------------
+
+    def expand(self, events, base_level, out, deferred):
+        """Resolve widget and provider events into concrete requests, in level order"""
+        for level, kind, payload, chain, awaited in sorted(events, key=lambda event: event[0]):
+            level += base_level
+            if kind == 'request':
+                out.append(dict(payload, level=level, chain=list(chain), awaited=awaited))
+            elif kind == 'widget':
+                sub, sub_deferred = self.widget_events(payload)
+                deferred.extend(sub_deferred)
+                self.expand([(lv, k, p, chain + c, a) for lv, k, p, c, a in sub], level, out, deferred)
+            elif kind == 'provider':
+                sub = self.provider_events(payload)
+                self.expand([(lv, k, p, chain + c, a) for lv, k, p, c, a in sub], level, out, deferred)
+
+    def build(self, entry=DEFAULT_ENTRY):
+        main = self.project.files[entry]['functions'].get('main')
+        if main is None:
+            raise ValueError(f'No main() in {entry}')
+        events, _ = self.summarize(entry, None, 'main', main)
+        requests, deferred = [], []
+        self.expand(events, 0, requests, deferred)
+        startup_levels = max((request['level'] for request in requests), default=-1) + 1
+        # The target screen is shown once startup work completes, so its requests come after
+        target_requests = []
+        for widget in dict.fromkeys(deferred):
+            sub, _ = self.widget_events(widget)
+            self.expand(sub, startup_levels, target_requests, [])
+        for request in target_requests:
+            request['phase'] = 'first-screen'
+        for request in requests:
+            request['phase'] = 'startup'
+        return requests + target_requests
+
+
+def split_arguments(arguments):
+    """Split a Dart argument list on top-level commas"""
+    parts, depth, current = [], 0, []
+    masked = mask_source(arguments)
+    for raw, ch in zip(arguments, masked):
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(raw)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def waterfall_report(requests):
+    """Group requests by level and mark them sequential or independent"""
+    levels = {}
+    for request in requests:
+        levels.setdefault(request['level'], []).append(request)
+    for level, group in levels.items():
+        for request in group:
+            request['parallel_with'] = len(group) - 1
+            request['relation'] = 'independent' if level == 0 else f'sequential after level {level - 1}'
+    return {
+        'critical_path_round_trips': len(levels),
+        'requests': len(requests),
+        'startup_requests': sum(1 for request in requests if request['phase'] == 'startup'),
+        'unregistered_or_dynamic': sum(1 for request in requests if not request['registered']),
+        'levels': [{'level': level, 'requests': levels[level]} for level in sorted(levels)],
+    }
+
+
+def print_waterfall(report):
+    print(f"Critical path: {report['critical_path_round_trips']} round-trips, {report['requests']} requests "
+          f"({report['startup_requests']} before the first screen)")
+    for entry in report['levels']:
+        group = entry['requests']
+        note = f"{len(group)} independent" if len(group) > 1 else 'single'
+        print(f"\nLevel {entry['level']} ({note})")
+        for request in group:
+            endpoint = request['endpoint'] or f"{request['method']} <dynamic URL>"
+            marker = '' if request['registered'] else '  [not in registry]'
+            blocking = 'awaited' if request['awaited'] else 'fire-and-forget'
+            print(f"  {endpoint}{marker}  [{request['phase']}, {request['relation']}, {blocking}]")
+            print(f"    via {' -> '.join(request['chain'])}")
+            print(f"    at {request['location']}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from lgbtinder_api import DEFAULT_COLLECTION
+
+    parser = argparse.ArgumentParser(description='Static cold-start request waterfall from lib/main.dart')
+    parser.add_argument('--lib', default=DEFAULT_LIB)
+    parser.add_argument('--entry', default=DEFAULT_ENTRY)
+    parser.add_argument('--api-config', default=DEFAULT_API_CONFIG)
+    parser.add_argument('-c', '--collection', default=DEFAULT_COLLECTION,
+                        help='registry collection used to name endpoints')
+    parser.add_argument('--target', default=DEFAULT_TARGET, help='first interactive screen widget')
+    parser.add_argument('--through', default=DEFAULT_THROUGH,
+                        help='regex of screen/page widgets that are passed through on the way to the target')
+    parser.add_argument('-o', '--output', help='write the waterfall as JSON')
+    args = parser.parse_args()
+
+    for path in (args.entry, args.api_config):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    router = None
+    if os.path.exists(args.collection):
+        from generate_verification_log import extract_endpoints_from_postman
+
+        router = EndpointRouter({endpoint_key(e['method'], e['path'])
+                                 for e in extract_endpoints_from_postman(args.collection)}, base_path='')
+
+    waterfall = Waterfall(DartProject(args.lib), load_api_constants(args.api_config), router, args.target, args.through)
+    report = waterfall_report(waterfall.build(args.entry))
+    print_waterfall(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nOutput file: {args.output}")
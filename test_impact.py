@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Flutter Test Impact Analysis
+Selects the test files affected by a change: builds the import graph of lib/
+and test/ (shared scan cache with import_graph.py), takes the transitive
+imports of every test/**/*_test.dart, and keeps the tests whose closure
+contains a changed or deleted Dart file. The API tests are added whenever the
+API configuration or the endpoint registry changes, since they exercise the
+backend contract rather than only the Dart code they import.
+
+Changes that no import edge can describe (pubspec, analysis options, test
+configuration, non-Dart files under lib/ or test/) select the whole suite, as
+does --all. Changed files come from the staged index (pre-commit), a merge
+base (pull requests), the working tree, or an explicit list.
+"""
+
+import fnmatch
+import json
+import os
+import shlex
+import subprocess
+
+from dart_source import package_name_of, resolve_import
+from import_graph import DEFAULT_CACHE, ImportGraph, scan_tree
+from lgbtinder_api import DEFAULT_COLLECTION
+from pipeline_metrics import count, stage
+
+DEFAULT_LIB = 'lib'
+DEFAULT_TEST_DIR = 'test'
+DEFAULT_TEST_CACHE = '.build_cache/dart_test_imports.json'
+TEST_SUFFIX = '_test.dart'
+API_TESTS = 'test/api/*_test.dart'
+API_TRIGGERS = ('lib/config/api_config.dart', 'generate_postman_collection.py', DEFAULT_COLLECTION)
+RUN_ALL_TRIGGERS = ('pubspec.yaml', 'pubspec.lock', 'analysis_options.yaml', 'l10n.yaml',
+                    'test/flutter_test_config.dart', '.github/workflows/e2e_tests.yml')
+IGNORED_IN_TREES = ('*.md',)
+# test/ still imports the app under its package name from before the pubspec rename
+PACKAGE_ALIASES = ('lgbtinder',)
+
+
+def git_lines(*arguments):
+    result = subprocess.run(['git', *arguments], capture_output=True, text=True, check=True)
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def changed_files(base=None, staged=False):
+    """
+    Changed paths, with renames split into the deleted and the added path:
+    staged changes, changes since the merge base with `base`, or (default)
+    the working tree against HEAD including untracked files.
+    """
+    if staged:
+        return git_lines('diff', '--name-only', '--no-renames', '--cached')
+    if base:
+        return git_lines('diff', '--name-only', '--no-renames', f'{base}...HEAD')
+    return sorted(set(git_lines('diff', '--name-only', '--no-renames', 'HEAD')
+                      + git_lines('ls-files', '--others', '--exclude-standard')))
+
+
+def build_graph(lib_dir=DEFAULT_LIB, test_dir=DEFAULT_TEST_DIR, lib_cache=DEFAULT_CACHE,
+                test_cache=DEFAULT_TEST_CACHE, jobs=None):
+    """Import graph over lib/ and test/, with aliased package imports rewritten to the app's package"""
+    package_name = package_name_of(os.path.dirname(os.path.abspath(lib_dir)))
+    files = dict(scan_tree(lib_dir, lib_cache, jobs))
+    files.update(scan_tree(test_dir, test_cache, jobs))
+    if package_name:
+        aliases = tuple(f'package:{alias}/' for alias in PACKAGE_ALIASES if alias != package_name)
+        for path, scanned in files.items():
+            imports = [[kind, f'package:{package_name}/' + uri.split('/', 1)[1] if uri.startswith(aliases) else uri,
+                        deferred] for kind, uri, deferred in scanned['imports']]
+            files[path] = dict(scanned, imports=imports)
+    return ImportGraph(files, lib_dir, package_name)
+
+
+def test_closures(graph, test_dir=DEFAULT_TEST_DIR):
+    """{test file: every app and helper file it loads, itself included}"""
+    prefix = os.path.normpath(test_dir) + os.sep
+    return {path: set(graph.reachable(path, include_deferred=True))
+            for path in sorted(graph.files) if path.startswith(prefix) and path.endswith(TEST_SUFFIX)}
+
+
+def run_all_reason(changed, lib_dir=DEFAULT_LIB, test_dir=DEFAULT_TEST_DIR):
+    """The first change that the import graph cannot account for, or None"""
+    trees = tuple(os.path.normpath(directory) + '/' for directory in (lib_dir, test_dir))
+    for path in changed:
+        if path in RUN_ALL_TRIGGERS:
+            return f'{path} changed'
+        if path.startswith(trees) and not path.endswith('.dart') and \
+                not any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in IGNORED_IN_TREES):
+            return f'non-Dart file {path} changed'
+    return None
+
+
+def impacted_tests(graph, closures, changed, lib_dir=DEFAULT_LIB):
+    """{test file: [changed files that reach it]}, plus the API tests for API configuration or registry changes"""
+    dart = {os.path.normpath(path) for path in changed if path.endswith('.dart')}
+    deleted = {path for path in dart if path not in graph.files}
+    # Importers of deleted files no longer resolve the import; treat them as changed
+    for importer, uri in graph.missing:
+        if resolve_import(importer, uri, lib_dir, graph.package_name) in deleted:
+            dart.add(importer)
+
+    impacted = {}
+    for test, closure in closures.items():
+        reasons = sorted(dart.intersection(closure))
+        if reasons:
+            impacted[test] = reasons
+    api_changes = [path for path in changed if path in API_TRIGGERS]
+    if api_changes:
+        for test in closures:
+            if fnmatch.fnmatch(test.replace(os.sep, '/'), API_TESTS):
+                impacted[test] = sorted(set(impacted.get(test, [])).union(api_changes))
+    count('tests_impacted', len(impacted))
+    return dict(sorted(impacted.items()))
+
+
+def select(changed, lib_dir=DEFAULT_LIB, test_dir=DEFAULT_TEST_DIR, run_all=False, jobs=None, use_cache=True):
+    """Selection report: the tests to run, why, and how many were skipped"""
+    with stage('scan'):
+        graph = build_graph(lib_dir, test_dir, DEFAULT_CACHE if use_cache else None,
+                            DEFAULT_TEST_CACHE if use_cache else None, jobs)
+    with stage('closures'):
+        closures = test_closures(graph, test_dir)
+    reason = 'requested with --all' if run_all else run_all_reason(changed, lib_dir, test_dir)
+    if reason:
+        impacted = {test: [] for test in closures}
+    else:
+        with stage('select'):
+            impacted = impacted_tests(graph, closures, changed, lib_dir)
+    return {
+        'changed': changed,
+        'run_all': reason,
+        'tests_total': len(closures),
+        'tests_selected': len(impacted),
+        'tests': impacted,
+    }
+
+
+def print_selection(selection):
+    print(f"{len(selection['changed'])} changed files")
+    if selection['run_all']:
+        print(f"Running all {selection['tests_total']} test files: {selection['run_all']}")
+        return
+    print(f"{selection['tests_selected']} of {selection['tests_total']} test files impacted")
+    for test, reasons in selection['tests'].items():
+        shown = ', '.join(reasons[:3]) + (f" (+{len(reasons) - 3} more)" if len(reasons) > 3 else '')
+        print(f"  {test}  <- {shown}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Select the Flutter tests impacted by a change')
+    parser.add_argument('files', nargs='*', help='changed files (default: from git)')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--staged', action='store_true', help='staged changes (pre-commit)')
+    source.add_argument('--base', help='changes since the merge base with this ref (pull requests)')
+    parser.add_argument('--all', action='store_true', help='select every test file')
+    parser.add_argument('--lib', default=DEFAULT_LIB)
+    parser.add_argument('--test-dir', default=DEFAULT_TEST_DIR)
+    parser.add_argument('--format', choices=['text', 'files', 'command'], default='text',
+                        help='summary, the selected paths, or a flutter test command')
+    parser.add_argument('-j', '--jobs', type=int, help='scan processes (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('-o', '--output', help='write the selection as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    for directory in (args.lib, args.test_dir):
+        if not os.path.isdir(directory):
+            print(f"Error: {directory} not found")
+            sys.exit(1)
+
+    try:
+        changed = [path.replace(os.sep, '/') for path in args.files]
+        if not changed and not args.all:
+            changed = changed_files(args.base, args.staged)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error: could not list changed files from git: {e}")
+        sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        selection = select(changed, args.lib, args.test_dir, args.all, args.jobs, not args.no_cache)
+
+    tests = list(selection['tests'])
+    if args.format == 'files':
+        print(' '.join(shlex.quote(path) for path in tests))
+    elif args.format == 'command':
+        if selection['run_all']:
+            print('flutter test')
+        elif tests:
+            print('flutter test ' + ' '.join(shlex.quote(path) for path in tests))
+    else:
+        print_selection(selection)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(selection, f, indent=2)
+        print(f"Output file: {args.output}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Duration-balanced Flutter Test Shard Planner
+Splits test/**/*_test.dart into N shards of near-equal predicted wall time,
+using the per-suite durations recorded by test_timings.py (load + setUpAll +
+tests, median over recent runs). Files that were never timed are predicted
+from their size with a ms-per-byte rate calibrated on the timed files, or a
+conservative default when nothing has been timed yet. Packing is longest
+first onto the least loaded shard.
+
+`flutter test --total-shards/--shard-index` splits by test count instead, so
+one heavy widget suite can still dominate a shard; this planner emits
+explicit file lists, as shell commands or as a GitHub Actions matrix.
+"""
+
+import heapq
+import json
+import os
+import shlex
+import statistics
+
+from test_timings import DEFAULT_DB, load_db, suite_durations
+
+DEFAULT_TEST_DIR = 'test'
+DEFAULT_SHARDS = 4
+DEFAULT_MS_PER_BYTE = 0.25
+DEFAULT_BASE_MS = 3000  # compile + load of a test file with nothing timed yet
+TEST_SUFFIX = '_test.dart'
+
+
+def test_files(test_dir=DEFAULT_TEST_DIR):
+    found = []
+    for directory, _, names in os.walk(test_dir):
+        found.extend(os.path.join(directory, name).replace(os.sep, '/') for name in names
+                     if name.endswith(TEST_SUFFIX))
+    return sorted(found)
+
+
+def size_model(durations, sizes):
+    """(base ms, ms per byte) fitted on the timed files; defaults when there are too few"""
+    known = [(sizes[path], durations[path]) for path in durations if path in sizes and durations[path] > 0]
+    if len(known) < 3:
+        return DEFAULT_BASE_MS, DEFAULT_MS_PER_BYTE
+    xs, ys = zip(*known)
+    try:
+        slope, intercept = statistics.linear_regression(xs, ys)
+    except statistics.StatisticsError:
+        return statistics.median(ys), 0.0
+    if slope <= 0 or intercept < 0:
+        # Size does not explain the timings well; predict the typical file instead
+        return statistics.median(ys), 0.0
+    return intercept, slope
+
+
+def predict(files, durations):
+    """{file: (predicted ms, 'recorded' or 'size')}"""
+    sizes = {path: os.path.getsize(path) for path in files}
+    # Zero durations come from coarse logs (whole seconds) or suites that failed to load
+    durations = {path: ms for path, ms in durations.items() if ms > 0}
+    base, rate = size_model(durations, sizes)
+    return {path: (durations[path], 'recorded') if path in durations else (base + rate * sizes[path], 'size')
+            for path in files}
+
+
+def plan_shards(predictions, shards):
+    """Longest-processing-time-first packing: [{'files', 'predicted_ms'}] per shard"""
+    heap = [(0.0, index) for index in range(shards)]
+    plan = [{'shard': index + 1, 'files': [], 'predicted_ms': 0.0} for index in range(shards)]
+    for path, (ms, _) in sorted(predictions.items(), key=lambda item: (-item[1][0], item[0])):
+        load, index = heapq.heappop(heap)
+        plan[index]['files'].append(path)
+        plan[index]['predicted_ms'] = load + ms
+        heapq.heappush(heap, (load + ms, index))
+    for shard in plan:
+        shard['files'].sort()
+    return plan
+
+
+def shard_command(shard, machine_output=False):
+    files = ' '.join(shlex.quote(path) for path in shard['files'])
+    if machine_output:
+        # Feed the results back into the timing history: test_timings.py ingest test-shard-*.json
+        return f"flutter test --machine {files} > test-shard-{shard['shard']}.json"
+    return f'flutter test {files}'
+
+
+def github_matrix(plan):
+    return {'include': [{'shard': shard['shard'], 'files': ' '.join(shard['files'])}
+                        for shard in plan if shard['files']]}
+
+
+def print_plan(plan, predictions):
+    serial = sum(ms for ms, _ in predictions.values())
+    longest = max(shard['predicted_ms'] for shard in plan)
+    timed = sum(1 for _, source in predictions.values() if source == 'recorded')
+    print(f"{len(predictions)} test files ({timed} with recorded durations, {len(predictions) - timed} estimated "
+          f"from size)")
+    print(f"Predicted: {serial / 1000:.1f}s serial -> {longest / 1000:.1f}s with {len(plan)} shards "
+          f"({serial / longest if longest else 0:.2f}x)")
+    for shard in plan:
+        print(f"  shard {shard['shard']}: {shard['predicted_ms'] / 1000:6.1f}s  {len(shard['files'])} files")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Plan duration-balanced flutter test shards')
+    parser.add_argument('-n', '--shards', type=int, default=DEFAULT_SHARDS)
+    parser.add_argument('--test-dir', default=DEFAULT_TEST_DIR)
+    parser.add_argument('--db', default=DEFAULT_DB, help='timing history from test_timings.py')
+    parser.add_argument('--shard', type=int, help='print only the file list of this shard (1-based)')
+    parser.add_argument('--format', choices=['text', 'commands', 'github'], default='text',
+                        help='summary, one shell command per shard, or a GitHub Actions matrix')
+    parser.add_argument('--machine', action='store_true', help='commands write --machine JSON for test_timings.py')
+    parser.add_argument('-o', '--output', help='write the plan as JSON')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.test_dir):
+        print(f"Error: {args.test_dir} not found")
+        sys.exit(1)
+    if args.shards < 1:
+        print("Error: --shards must be at least 1")
+        sys.exit(1)
+
+    files = test_files(args.test_dir)
+    durations = suite_durations(load_db(args.db)) if os.path.exists(args.db) else {}
+    predictions = predict(files, durations)
+    plan = plan_shards(predictions, args.shards)
+
+    if args.shard is not None:
+        if not 1 <= args.shard <= args.shards:
+            print(f"Error: --shard must be between 1 and {args.shards}")
+            sys.exit(1)
+        print(' '.join(shlex.quote(path) for path in plan[args.shard - 1]['files']))
+    elif args.format == 'commands':
+        for shard in plan:
+            if shard['files']:
+                print(shard_command(shard, args.machine))
+    elif args.format == 'github':
+        print(json.dumps(github_matrix(plan)))
+    else:
+        print_plan(plan, predictions)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'shards': plan, 'predictions': {path: {'ms': ms, 'source': source}
+                                                       for path, (ms, source) in predictions.items()}}, f, indent=2)
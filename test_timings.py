@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Flutter Test Timing Analytics
+Ingests test runs, one line at a time, from either
+  - `flutter test --machine` JSON event streams (millisecond timings, hidden
+    "loading" tests for suite compile/load time, setUpAll/tearDownAll), or
+  - the compact reporter logs run_flutter_tests.sh leaves in test_output.txt
+    (UTF-16 on Windows; "MM:SS +passed ~skipped -failed: description" lines,
+    so durations are only as fine as one second),
+into a historical per-test duration database, and reports the slowest tests,
+suites dominated by load/setup time, timing outliers (runs far from a test's
+own median) and the wall-clock trend of the whole suite.
+"""
+
+import codecs
+import json
+import os
+import re
+import statistics
+import sys
+from datetime import datetime
+
+DEFAULT_DB = '.test_timings.json'
+DB_VERSION = 1
+HISTORY = 30
+RUN_HISTORY = 200
+SETUP_DOMINATED_RATIO = 0.5
+OUTLIER_MADS = 4.0
+OUTLIER_MIN_MS = 250
+
+COMPACT_LINE_RE = re.compile(r'^(\d+):(\d\d) \+(\d+)(?: ~(\d+))?(?: -(\d+))?: (.*?)(?: \[E\])?\s*$')
+TEST_PATH_RE = re.compile(r'(?:^|.*?[/\\])(test[/\\][^:]*?\.dart)')
+HIDDEN_SETUP_RE = re.compile(r'\((?:setUpAll|tearDownAll)\)$')
+
+
+def open_text(path):
+    """Line iterator over a log, honouring a UTF-16/UTF-8 BOM; '-' reads stdin"""
+    if path == '-':
+        return sys.stdin
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return open(path, 'r', encoding='utf-16', errors='replace', newline=None)
+    return open(path, 'r', encoding='utf-8-sig', errors='replace', newline=None)
+
+
+def relative_test_path(path):
+    """test/... portion of an absolute or file:// suite path"""
+    match = TEST_PATH_RE.match(path.replace('file://', ''))
+    return match.group(1).replace('\\', '/') if match else path
+
+
+class RunRecorder:
+    """Per-run accumulator: test durations, suite load/setup time and totals"""
+
+    def __init__(self, source):
+        self.source = source
+        self.tests = {}
+        self.suites = {}
+        self.wall_ms = 0
+        self.success = None
+
+    def suite(self, path):
+        return self.suites.setdefault(path, {'load_ms': 0, 'setup_ms': 0, 'tests_ms': 0, 'tests': 0, 'failed': 0})
+
+    def test(self, suite, name, duration_ms, result):
+        suite_stats = self.suite(suite)
+        suite_stats['tests_ms'] += duration_ms
+        suite_stats['tests'] += 1
+        suite_stats['failed'] += result != 'success'
+        self.tests[f'{suite}::{name}'] = {'ms': duration_ms, 'result': result}
+
+    def summary(self):
+        return {
+            'source': self.source,
+            'ingested': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'wall_ms': self.wall_ms,
+            'tests': len(self.tests),
+            'failed': sum(1 for test in self.tests.values() if test['result'] != 'success'),
+            'success': self.success,
+        }
+
+
+def parse_machine(lines, source):
+    """Record a `flutter test --machine` event stream"""
+    run = RunRecorder(source)
+    suites, tests, started = {}, {}, {}
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        kind = event.get('type')
+        if kind == 'suite':
+            suites[event['suite']['id']] = relative_test_path(event['suite'].get('path') or '')
+        elif kind == 'testStart':
+            test = event['test']
+            tests[test['id']] = test
+            started[test['id']] = event['time']
+        elif kind == 'testDone' and event['testID'] in tests:
+            test = tests[event['testID']]
+            duration = event['time'] - started.pop(event['testID'])
+            suite = suites.get(test.get('suiteID'), relative_test_path(test.get('url') or ''))
+            name = test['name']
+            if event.get('hidden'):
+                if name.startswith('loading '):
+                    run.suite(relative_test_path(name[len('loading '):]))['load_ms'] += duration
+                elif HIDDEN_SETUP_RE.search(name):
+                    run.suite(suite)['setup_ms'] += duration
+                continue
+            if event.get('skipped'):
+                continue
+            run.test(suite, name, duration, event.get('result', 'success'))
+        elif kind == 'done':
+            run.wall_ms = event['time']
+            run.success = event.get('success')
+    return run
+
+
+def parse_compact(lines, source):
+    """
+    Record a compact-reporter log. Each progress line is stamped with elapsed
+    time; a description's duration runs from its first line to the next
+    description's first line.
+    """
+    run = RunRecorder(source)
+    current, current_start, current_failures = None, 0, 0
+    last_failures = 0
+
+    def finish(end_seconds, failures):
+        if current is None or current in ('Some tests failed.', 'All tests passed!'):
+            return
+        duration = (end_seconds - current_start) * 1000
+        if current.startswith('loading '):
+            run.suite(relative_test_path(current[len('loading '):]))['load_ms'] += duration
+            return
+        suite, _, name = current.partition(': ')
+        if not name:
+            suite, name = '', current
+        result = 'failure' if failures > current_failures else 'success'
+        run.test(relative_test_path(suite) if suite else suite, name, duration, result)
+
+    for line in lines:
+        match = COMPACT_LINE_RE.match(line.rstrip('\r\n'))
+        if not match:
+            continue
+        minutes, seconds, _, _, failed, description = match.groups()
+        elapsed = int(minutes) * 60 + int(seconds)
+        failures = int(failed or 0)
+        if description != current:
+            finish(elapsed, failures)
+            current, current_start, current_failures = description, elapsed, last_failures
+        last_failures = failures
+        run.wall_ms = elapsed * 1000
+        if description == 'Some tests failed.':
+            run.success = False
+        elif description == 'All tests passed!':
+            run.success = True
+    finish(run.wall_ms // 1000, last_failures)
+    return run
+
+
+def parse_run(path):
+    """Sniff the format from the first non-blank line and parse the run"""
+    lines = open_text(path)
+    try:
+        first = ''
+        for first in lines:
+            if first.strip():
+                break
+        chained = _chain([first], lines)
+        if first.lstrip().startswith('{'):
+            return parse_machine(chained, path)
+        return parse_compact(chained, path)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+
+def _chain(head, rest):
+    yield from head
+    yield from rest
+
+
+# --- history database ----------------------------------------------------------------
+
+def load_db(path=DEFAULT_DB):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            db = json.load(f)
+        if db.get('version') == DB_VERSION:
+            return db
+    return {'version': DB_VERSION, 'runs': [], 'tests': {}, 'suites': {}}
+
+
+def save_db(db, path=DEFAULT_DB):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(db, f, indent=1)
+    os.replace(temporary, path)
+
+
+def record_run(db, run):
+    """Append a run to the history, keeping the last HISTORY samples per test and suite"""
+    run_id = db['runs'][-1]['id'] + 1 if db['runs'] else 0
+    db['runs'].append(dict(run.summary(), id=run_id))
+    del db['runs'][:-RUN_HISTORY]
+    for key, test in run.tests.items():
+        entry = db['tests'].setdefault(key, {'ms': [], 'runs': 0, 'failures': 0, 'last_run': None})
+        entry['ms'] = (entry['ms'] + [test['ms']])[-HISTORY:]
+        entry['runs'] += 1
+        entry['failures'] += test['result'] != 'success'
+        entry['last_run'] = run_id
+    for path, suite in run.suites.items():
+        entry = db['suites'].setdefault(path, {'load_ms': [], 'setup_ms': [], 'tests_ms': [], 'tests': 0})
+        for field in ('load_ms', 'setup_ms', 'tests_ms'):
+            entry[field] = (entry[field] + [suite[field]])[-HISTORY:]
+        entry['tests'] = suite['tests']
+    return run_id
+
+
+def suite_durations(db):
+    """{suite path: median total ms (load + setup + tests)}, the input for shard planning"""
+    return {path: statistics.median(load + setup + tests for load, setup, tests
+                                    in zip(suite['load_ms'], suite['setup_ms'], suite['tests_ms']))
+            for path, suite in db['suites'].items() if suite['load_ms'] or suite['tests_ms']}
+
+
+# --- reports -------------------------------------------------------------------------
+
+def outliers(samples):
+    """Indexes of samples slower than the median by more than OUTLIER_MADS median absolute deviations"""
+    if len(samples) < 5:
+        return []
+    median = statistics.median(samples)
+    deviation = statistics.median(abs(sample - median) for sample in samples) or 1
+    return [i for i, sample in enumerate(samples)
+            if sample - median > OUTLIER_MADS * deviation and sample - median >= OUTLIER_MIN_MS]
+
+
+def report(db, top=15):
+    tests = []
+    for key, entry in db['tests'].items():
+        if not entry['ms']:
+            continue
+        suite, _, name = key.partition('::')
+        flagged = outliers(entry['ms'])
+        tests.append({
+            'suite': suite,
+            'test': name,
+            'median_ms': statistics.median(entry['ms']),
+            'last_ms': entry['ms'][-1],
+            'max_ms': max(entry['ms']),
+            'samples': len(entry['ms']),
+            'failure_rate': round(entry['failures'] / entry['runs'], 3),
+            'outliers': [entry['ms'][i] for i in flagged],
+        })
+
+    suites = []
+    for path, suite in db['suites'].items():
+        load = statistics.median(suite['load_ms']) if suite['load_ms'] else 0
+        setup = statistics.median(suite['setup_ms']) if suite['setup_ms'] else 0
+        body = statistics.median(suite['tests_ms']) if suite['tests_ms'] else 0
+        total = load + setup + body
+        suites.append({'suite': path, 'load_ms': load, 'setup_ms': setup, 'tests_ms': body, 'total_ms': total,
+                       'tests': suite['tests'], 'setup_share': round((load + setup) / total, 3) if total else 0})
+
+    tests.sort(key=lambda row: -row['median_ms'])
+    suites.sort(key=lambda row: -row['total_ms'])
+    return {
+        'runs': len(db['runs']),
+        'trend': [{'id': run['id'], 'ingested': run['ingested'], 'wall_ms': run['wall_ms'], 'tests': run['tests'],
+                   'failed': run['failed']} for run in db['runs']],
+        'slowest_tests': tests[:top],
+        'slowest_suites': suites[:top],
+        'setup_dominated_suites': [row for row in suites if row['setup_share'] >= SETUP_DOMINATED_RATIO],
+        'timing_outliers': sorted((row for row in tests if row['outliers']),
+                                  key=lambda row: -max(row['outliers']))[:top],
+    }
+
+
+def print_report(result):
+    print(f"Runs recorded: {result['runs']}")
+    if result['trend']:
+        recent = result['trend'][-10:]
+        print("Wall clock (last runs): " + ', '.join(f"{run['wall_ms'] / 1000:.0f}s" for run in recent))
+    print("\nSlowest tests (median):")
+    for row in result['slowest_tests']:
+        print(f"  {row['median_ms'] / 1000:>7.2f}s  {row['suite']}  {row['test']}")
+    print("\nSlowest suites (load + setup + tests):")
+    for row in result['slowest_suites']:
+        print(f"  {row['total_ms'] / 1000:>7.2f}s  {row['setup_share']:>4.0%} setup  {row['suite']}")
+    if result['setup_dominated_suites']:
+        print(f"\nSetup-dominated suites (>= {SETUP_DOMINATED_RATIO:.0%} of time in load/setUpAll):")
+        for row in result['setup_dominated_suites']:
+            print(f"  {row['suite']}  load {row['load_ms'] / 1000:.1f}s, setUpAll {row['setup_ms'] / 1000:.1f}s, "
+                  f"tests {row['tests_ms'] / 1000:.1f}s")
+    if result['timing_outliers']:
+        print("\nTiming outliers:")
+        for row in result['timing_outliers']:
+            spikes = ', '.join(f'{value / 1000:.2f}s' for value in row['outliers'])
+            print(f"  {row['suite']}  {row['test']}: median {row['median_ms'] / 1000:.2f}s, spikes {spikes}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Historical Flutter test timing analytics')
+    parser.add_argument('--db', default=DEFAULT_DB, help='timing history database')
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    sub = subparsers.add_parser('ingest', help='add runs (--machine JSON or compact logs; - for stdin)')
+    sub.add_argument('logs', nargs='+')
+    sub = subparsers.add_parser('report', help='slowest tests, setup-heavy suites, outliers and trend')
+    sub.add_argument('--top', type=int, default=15)
+    sub.add_argument('-o', '--output', help='write the report as JSON')
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    db = load_db(args.db)
+    if args.command == 'ingest':
+        for log in args.logs:
+            if log != '-' and not os.path.exists(log):
+                print(f"Error: {log} not found")
+                sys.exit(1)
+            run = parse_run(log)
+            run_id = record_run(db, run)
+            summary = run.summary()
+            print(f"Run {run_id}: {log} - {summary['tests']} tests, {summary['failed']} failed, "
+                  f"{len(run.suites)} suites, wall {summary['wall_ms'] / 1000:.1f}s")
+        save_db(db, args.db)
+    else:
+        result = report(db, args.top)
+        print_report(result)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+            print(f"\nOutput file: {args.output}")
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Streaming Traffic Analyzer for HAR Exports and Request Logs
+Reads HAR files and JSON-lines request logs incrementally (multi-GB captures
+never sit in memory), maps each request to its registry endpoint template and
+aggregates call counts, latency percentiles, request/response sizes and error
+rates per endpoint, reported by registry category.
+
+JSON-lines records use the fields logged around HttpInterceptorService:
+  {"timestamp": ..., "session": ..., "method": "GET", "url": ".../api/profile/12",
+   "status": 200, "duration_ms": 84.2, "request_bytes": 0, "response_bytes": 1532}
+camelCase spellings (statusCode, durationMs, requestBytes, responseBytes) and
+`endpoint` instead of `url` are accepted too.
+"""
+
+import json
+import math
+import os
+import re
+from datetime import datetime
+
+from api_section_index import endpoint_key
+from endpoint_router import EndpointRouter
+from lgbtinder_api import DEFAULT_COLLECTION
+from pipeline_metrics import count, stage
+
+HAR_ENTRIES_RE = re.compile(r'"entries"\s*:\s*\[')
+CHUNK_SIZE = 1 << 20
+MAX_UNMATCHED = 50
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Constant-memory histogram with log-spaced buckets (about 2% relative error),
+    so percentiles can be estimated over any number of samples and merged.
+    """
+
+    GROWTH = 1.02
+    _LOG_GROWTH = math.log(GROWTH)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value is None or not math.isfinite(value) or value < 0:
+            return
+        index = math.floor(math.log(value) / self._LOG_GROWTH) if value >= 1e-3 else -1000
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def merge(self, other):
+        for index, hits in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + hits
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None or value < self.min else self.min
+                self.max = value if self.max is None or value > self.max else self.max
+
+    def percentile(self, q):
+        """Estimated q-th percentile, clamped to the observed min and max"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Geometric midpoint of the bucket
+                value = 0.0 if index == -1000 else self.GROWTH ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, digits=2):
+        if not self.count:
+            return {'count': 0}
+        result = {'count': self.count, 'mean': round(self.total / self.count, digits),
+                  'min': round(self.min, digits), 'max': round(self.max, digits)}
+        for q in PERCENTILES:
+            result[f'p{q}'] = round(self.percentile(q), digits)
+        return result
+
+
+def iter_har_entries(path, chunk_size=CHUNK_SIZE):
+    """
+    Yield each object of log.entries from a HAR file without loading the whole
+    document: the file is read in chunks and entries are decoded one at a time.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        while True:
+            match = HAR_ENTRIES_RE.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            count('bytes_read', len(chunk))
+            buffer += chunk
+
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                if position >= len(buffer):
+                    raise ValueError('need more data')
+                entry, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    if buffer[position:].strip():
+                        raise ValueError(f"{path}: truncated HAR entry")
+                    return
+                count('bytes_read', len(chunk))
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield entry
+
+
+def har_record(entry):
+    """Normalise a HAR entry into a traffic record"""
+    request = entry.get('request', {})
+    response = entry.get('response', {})
+    request_bytes = request.get('bodySize', -1)
+    if request_bytes is None or request_bytes < 0:
+        request_bytes = len((request.get('postData') or {}).get('text', '').encode('utf-8'))
+    content = response.get('content', {})
+    response_bytes = content.get('size', -1)
+    if response_bytes is None or response_bytes < 0:
+        response_bytes = max(response.get('bodySize', 0) or 0, 0)
+    return {
+        'timestamp': entry.get('startedDateTime'),
+        'session': entry.get('pageref') or entry.get('connection'),
+        'method': request.get('method', 'GET'),
+        'url': request.get('url', ''),
+        'status': response.get('status', 0),
+        'duration_ms': entry.get('time'),
+        'request_bytes': request_bytes,
+        'response_bytes': response_bytes,
+    }
+
+
+def jsonl_record(raw):
+    """Normalise a JSON-lines request log record (snake_case or camelCase)"""
+    def pick(*names, default=None):
+        for name in names:
+            if raw.get(name) is not None:
+                return raw[name]
+        return default
+
+    return {
+        'timestamp': pick('timestamp', 'ts', 'time'),
+        'session': pick('session', 'session_id', 'sessionId'),
+        'method': pick('method', default='GET'),
+        'url': pick('url', 'endpoint', 'path', default=''),
+        'status': pick('status', 'statusCode', 'status_code', default=0),
+        'duration_ms': pick('duration_ms', 'durationMs', 'latency_ms'),
+        'request_bytes': pick('request_bytes', 'requestBytes', default=0),
+        'response_bytes': pick('response_bytes', 'responseBytes', default=0),
+    }
+
+
+def iter_jsonl_records(path):
+    """Yield records from a JSON-lines request log, one line at a time"""
+    with open(path, 'rb') as f:
+        for line in f:
+            count('bytes_read', len(line))
+            if not line.strip():
+                continue
+            try:
+                yield jsonl_record(json.loads(line))
+            except ValueError:
+                count('unparseable_lines')
+
+
+def iter_traffic(path):
+    """Yield normalised traffic records from a .har or JSON-lines file"""
+    if path.endswith('.har'):
+        for entry in iter_har_entries(path):
+            yield har_record(entry)
+    else:
+        yield from iter_jsonl_records(path)
+
+
+def parse_timestamp(value):
+    """Seconds since the epoch from an ISO 8601 string or a number (s or ms)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def is_error(status):
+    """Failed request: no response (status 0) or a 4xx/5xx status"""
+    return not status or status >= 400
+
+
+class EndpointStats:
+    """Aggregates for one endpoint template"""
+
+    __slots__ = ('calls', 'errors', 'statuses', 'latency', 'request_bytes', 'response_bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.statuses = {}
+        self.latency = LatencyHistogram()
+        self.request_bytes = LatencyHistogram()
+        self.response_bytes = LatencyHistogram()
+
+    def add(self, record):
+        status = int(record['status'] or 0)
+        self.calls += 1
+        if is_error(status):
+            self.errors += 1
+        status_class = f'{status // 100}xx' if status else 'failed'
+        self.statuses[status_class] = self.statuses.get(status_class, 0) + 1
+        self.latency.add(record['duration_ms'])
+        self.request_bytes.add(record['request_bytes'])
+        self.response_bytes.add(record['response_bytes'])
+
+    def summary(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'error_rate': round(self.errors / self.calls, 4) if self.calls else 0.0,
+            'statuses': self.statuses,
+            'latency_ms': self.latency.summary(),
+            'request_bytes': self.request_bytes.summary(0),
+            'response_bytes': self.response_bytes.summary(0),
+        }
+
+
+class TrafficAnalyzer:
+    """Joins streamed traffic records to the registry's endpoints and categories"""
+
+    def __init__(self, endpoints, base_path='/api'):
+        self.categories = {}
+        for endpoint in endpoints:
+            self.categories.setdefault(endpoint_key(endpoint['method'], endpoint['path']), endpoint['category'])
+        self.router = EndpointRouter(self.categories, base_path)
+        self.stats = {}
+        self.unmatched = {}
+        self.records = 0
+        self.first_seen = None
+        self.last_seen = None
+
+    @classmethod
+    def from_collection(cls, collection_path=DEFAULT_COLLECTION, base_path='/api'):
+        from generate_verification_log import extract_endpoints_from_postman
+
+        return cls(extract_endpoints_from_postman(collection_path), base_path)
+
+    def add(self, record):
+        self.records += 1
+        moment = parse_timestamp(record['timestamp'])
+        if moment is not None:
+            self.first_seen = moment if self.first_seen is None or moment < self.first_seen else self.first_seen
+            self.last_seen = moment if self.last_seen is None or moment > self.last_seen else self.last_seen
+        key = self.router.match(record['method'], record['url'])
+        if key is None:
+            # Bounded sample of unknown paths, with numeric segments folded
+            path = re.sub(r'/\d+(?=/|$)', '/:id', self.router.path_of(record['url']))
+            unknown = f"{record['method'].upper()} {path}"
+            if unknown in self.unmatched or len(self.unmatched) < MAX_UNMATCHED:
+                self.unmatched[unknown] = self.unmatched.get(unknown, 0) + 1
+            return
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = EndpointStats()
+        stats.add(record)
+
+    def consume(self, path):
+        with stage(f'analyze:{os.path.basename(path)}'):
+            for record in iter_traffic(path):
+                self.add(record)
+
+    def report(self):
+        """Per-category report; endpoints sorted by call count, unused ones listed"""
+        matched = sum(stats.calls for stats in self.stats.values())
+        categories = {}
+        for key, category in self.categories.items():
+            entry = categories.setdefault(category, {'calls': 0, 'errors': 0, 'endpoints': {}, 'unused': []})
+            stats = self.stats.get(key)
+            if stats is None:
+                entry['unused'].append(key)
+                continue
+            entry['calls'] += stats.calls
+            entry['errors'] += stats.errors
+            entry['endpoints'][key] = stats.summary()
+
+        for entry in categories.values():
+            entry['error_rate'] = round(entry['errors'] / entry['calls'], 4) if entry['calls'] else 0.0
+            entry['share'] = round(entry['calls'] / matched, 4) if matched else 0.0
+            entry['endpoints'] = dict(sorted(entry['endpoints'].items(), key=lambda item: -item[1]['calls']))
+
+        window = None
+        if self.first_seen is not None and self.last_seen is not None:
+            window = round(self.last_seen - self.first_seen, 3)
+        return {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'records': self.records,
+            'matched': matched,
+            'unmatched': self.records - matched,
+            'window_s': window,
+            'endpoints_with_traffic': len(self.stats),
+            'endpoints_in_registry': len(self.categories),
+            'categories': dict(sorted(categories.items(), key=lambda item: -item[1]['calls'])),
+            'unmatched_samples': dict(sorted(self.unmatched.items(), key=lambda item: -item[1])),
+        }
+
+
+def print_summary(report, top=15):
+    print(f"Records: {report['records']}  matched: {report['matched']}  unmatched: {report['unmatched']}")
+    print(f"Endpoints with traffic: {report['endpoints_with_traffic']} of {report['endpoints_in_registry']}")
+    print()
+    print(f"{'Category':40} {'Calls':>9} {'Share':>7} {'Errors':>7}")
+    for name, entry in report['categories'].items():
+        if entry['calls']:
+            print(f"{name[:40]:40} {entry['calls']:>9} {entry['share']:>7.1%} {entry['error_rate']:>7.1%}")
+
+    endpoints = [(key, stats) for entry in report['categories'].values() for key, stats in entry['endpoints'].items()]
+    endpoints.sort(key=lambda item: -item[1]['calls'])
+    print()
+    print(f"{'Endpoint':50} {'Calls':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Errors':>7}")
+    for key, stats in endpoints[:top]:
+        latency = stats['latency_ms']
+        print(f"{key[:50]:50} {stats['calls']:>9} {latency.get('p50', '-'):>8} {latency.get('p95', '-'):>8} "
+              f"{latency.get('p99', '-'):>8} {stats['error_rate']:>7.1%}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Aggregate HAR / JSON-lines traffic per registry endpoint')
+    parser.add_argument('inputs', nargs='+', help='.har files or JSON-lines request logs')
+    parser.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    parser.add_argument('--base-path', default='/api', help='API prefix stripped from request paths')
+    parser.add_argument('-o', '--output', help='write the full report as JSON')
+    parser.add_argument('--top', type=int, default=15, help='endpoints shown in the summary')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    for path in [args.collection] + args.inputs:
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    with metrics_session(args.metrics, args.profile):
+        analyzer = TrafficAnalyzer.from_collection(args.collection, args.base_path)
+        for path in args.inputs:
+            analyzer.consume(path)
+        report = analyzer.report()
+
+    print_summary(report, args.top)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nOutput file: {args.output}")
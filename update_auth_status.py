@@ -4,14 +4,14 @@ Update API Verification Log with Authentication Endpoints Status
 Marks authentication endpoints as verified since they are all implemented
 """
 
-import re
 import os
+import re
+
+from api_section_index import load_section_index, read_section, replace_sections
+from pipeline_metrics import metrics_session_from_argv
 
 def update_auth_status_in_log(log_path):
     """Update authentication endpoints status in verification log"""
-    with open(log_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
     # Authentication endpoints that are verified
     auth_endpoints = [
         ('POST /auth/register', 'Register'),
@@ -30,19 +30,19 @@ def update_auth_status_in_log(log_path):
         ('POST /auth/logout', 'Logout'),
     ]
     
-    verified_count = 0
+    verified_status = '**Status:** ✅ Verified\n\n**Implementation:** `lib/services/auth_service.dart` and `lib/services/api_services/login_password_api_service.dart`\n\n**Location in App:** `lib/screens/auth/login_screen.dart`, `lib/screens/auth/register_screen.dart`'
+    
+    # The verified status carries its own Location line; drop the section's old one so it is not duplicated
+    index = load_section_index(log_path, 'log')
+    updates = {}
     for method_path, name in auth_endpoints:
-        # Find the section for this endpoint
-        pattern = rf'### {re.escape(method_path)}'
-        section_start = content.find(pattern)
-        if section_start != -1:
-            # Find the Status line
-            status_start = content.find('**Status:**', section_start)
-            if status_start != -1:
-                status_end = content.find('\n', status_start)
-                # Replace status
-                content = content[:status_start] + '**Status:** ✅ Verified\n\n**Implementation:** `lib/services/auth_service.dart` and `lib/services/api_services/login_password_api_service.dart`\n\n**Location in App:** `lib/screens/auth/login_screen.dart`, `lib/screens/auth/register_screen.dart`' + content[status_end:]
-                verified_count += 1
+        section = read_section(log_path, method_path, index)
+        if section is None or verified_status in section:
+            continue
+        section = re.sub(r'^\*\*Location in App:\*\*.*\n(?:\n)?', '', section, count=1, flags=re.M)
+        updates[method_path] = re.sub(r'^\*\*Status:\*\*.*$', lambda m: verified_status, section, count=1,
+                                      flags=re.M)
+    verified_count = len(replace_sections(log_path, updates, kind='log'))
     
     print(f"Updated authentication endpoints status: {verified_count} endpoints marked as Verified")
     return verified_count
@@ -54,6 +54,7 @@ if __name__ == '__main__':
         print(f"Error: Verification log not found at {log_path}")
         exit(1)
     
-    update_auth_status_in_log(log_path)
+    with metrics_session_from_argv():
+        update_auth_status_in_log(log_path)
 
 
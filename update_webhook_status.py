@@ -7,29 +7,26 @@ Webhooks are backend-only and should be marked as Not Used from Flutter app pers
 import re
 import os
 
+from api_section_index import patch_statuses
+from pipeline_metrics import count, metrics_session_from_argv
+
 def update_webhook_status_in_log(log_path):
     """Update webhook endpoints status in verification log"""
-    with open(log_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
     # Webhook endpoints to mark as Not Used
     webhook_patterns = [
-        (r'### POST /stripe/webhook', 'Stripe Webhook'),
-        (r'### POST /stripe/subscription-webhook', 'Stripe Subscription Webhook'),
-        (r'### POST /superlike-packs/stripe-webhook', 'Superlike Packs Webhook'),
-        (r'### POST /paypal/webhook', 'PayPal Webhook'),
+        ('POST /stripe/webhook', 'Stripe Webhook'),
+        ('POST /stripe/subscription-webhook', 'Stripe Subscription Webhook'),
+        ('POST /superlike-packs/stripe-webhook', 'Superlike Packs Webhook'),
+        ('POST /paypal/webhook', 'PayPal Webhook'),
     ]
     
-    for pattern, name in webhook_patterns:
-        # Find the section for this webhook
-        section_start = content.find(pattern)
-        if section_start != -1:
-            # Find the Status line
-            status_start = content.find('**Status:**', section_start)
-            if status_start != -1:
-                status_end = content.find('\n', status_start)
-                # Replace status
-                content = content[:status_start] + '**Status:** ❌ Not Used (Backend-only endpoint called by Stripe/PayPal servers)' + content[status_end:]
+    # Patch only the indexed status lines instead of re-scanning the whole log
+    not_used_status = '**Status:** ❌ Not Used (Backend-only endpoint called by Stripe/PayPal servers)'
+    patch_statuses(log_path, {key: not_used_status for key, name in webhook_patterns}, kind='log')
+    
+    with open(log_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    count('bytes_read', len(content.encode('utf-8')))
     
     # Update the summary section
     # Count webhooks
@@ -76,6 +73,7 @@ def update_webhook_status_in_log(log_path):
     # Write updated content
     with open(log_path, 'w', encoding='utf-8') as f:
         f.write(content)
+    count('bytes_written', len(content.encode('utf-8')))
     
     print(f"Updated webhook status in verification log: {webhook_count} webhooks marked as Not Used")
 
@@ -86,6 +84,7 @@ if __name__ == '__main__':
         print(f"Error: Verification log not found at {log_path}")
         exit(1)
     
-    update_webhook_status_in_log(log_path)
+    with metrics_session_from_argv():
+        update_webhook_status_in_log(log_path)
 
 
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Watch Mode for the API Artifacts
+Long-running daemon that watches the endpoint registry, the Postman collection,
+api_docs.json and lib/**/*.dart (inotify where available, stat polling
+otherwise) and regenerates only the affected endpoint sections of
+All_API_Methods.md and API_VERIFICATION_LOG.md, reusing parsed state held in
+memory instead of rerunning each script cold.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import importlib
+import json
+import os
+import re
+import select
+import struct
+import sys
+import time
+
+from api_section_index import endpoint_key, load_section_index, read_section, replace_sections
+from generate_api_documentation import document_endpoint, generate_markdown_documentation, refresh_generated_size
+from generate_verification_log import extract_endpoints_from_collection, generate_verification_log, render_endpoint_section
+from lgbtinder_api import DEFAULT_COLLECTION, DEFAULT_DOCS, DEFAULT_LOG
+from pipeline_metrics import count, load_json
+
+REGISTRY_MODULE = 'generate_postman_collection'
+REGISTRY_PATH = 'generate_postman_collection.py'
+OPENAPI_PATH = 'api_docs.json'
+DART_ROOT = 'lib'
+STATUS_PREFIX = '**Status:**'
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Directory watches through inotify(7) via ctypes; yields batches of changed paths"""
+
+    def __init__(self, directories):
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}
+        for directory in directories:
+            self.add_directory(directory)
+
+    def add_directory(self, directory):
+        """Watch one directory (not recursive)"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+        self._dirs[wd] = directory
+
+    def wait(self, timeout=None, debounce=0.02):
+        """Block until something changes, then collect events for a short debounce window"""
+        changed = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        while readable:
+            data = os.read(self._fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b'\0').decode('utf-8', 'replace')
+                offset += name_len
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.normpath(os.path.join(directory, name))
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # New package directories under lib/ need their own watch
+                    for root, _, _ in os.walk(path):
+                        self.add_directory(root)
+                changed.add(path)
+            readable, _, _ = select.select([self._fd], [], [], debounce)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Stat-polling fallback: compares (mtime, size) of the watched files each interval"""
+
+    def __init__(self, list_files, interval=0.2):
+        self._list_files = list_files
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in self._list_files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Poll until a watched file is added, removed or modified"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self._interval)
+            snapshot = self._take_snapshot()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def dart_files(root=DART_ROOT):
+    """All Dart sources under lib/"""
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith('.dart'):
+                yield os.path.normpath(os.path.join(directory, name))
+
+
+def collection_entries(collection):
+    """Map endpoint key -> (category, Postman item, endpoint dict) in collection order"""
+    items = []
+
+    def walk(item, category_name=''):
+        if 'item' in item:
+            for sub_item in item['item']:
+                walk(sub_item, item.get('name', 'Unknown'))
+        else:
+            items.append((category_name or 'Unknown', item))
+
+    for item in collection.get('item', []):
+        walk(item)
+
+    entries = {}
+    for (category, item), endpoint in zip(items, extract_endpoints_from_collection(collection)):
+        entries.setdefault(endpoint_key(endpoint['method'], endpoint['path']), (category, item, endpoint))
+    return entries
+
+
+def template_regex(path):
+    """Regex matching concrete or interpolated occurrences of an endpoint path template"""
+    pattern = re.sub(r'\\:\w+', r'[^/\'"]+', re.escape(path))
+    return re.compile(r"['\"/]" + pattern.lstrip('/') + r"['\"?]")
+
+
+class ArtifactWatcher:
+    """Holds parsed state and patches the docs and log for changed endpoints only"""
+
+    def __init__(self, collection_path=DEFAULT_COLLECTION, docs_path=DEFAULT_DOCS, log_path=DEFAULT_LOG,
+                 registry_path=REGISTRY_PATH, openapi_path=OPENAPI_PATH, dart_root=DART_ROOT):
+        self.collection_path = os.path.normpath(collection_path)
+        self.docs_path = docs_path
+        self.log_path = log_path
+        self.registry_path = os.path.normpath(registry_path)
+        self.openapi_path = os.path.normpath(openapi_path)
+        self.dart_root = os.path.normpath(dart_root)
+        self.collection = load_json(self.collection_path)
+        self.collection_hash = self._file_hash(self.collection_path)
+        self.entries = collection_entries(self.collection)
+        self.openapi = load_json(self.openapi_path) if os.path.exists(self.openapi_path) else {}
+        self._path_regexes = None
+        for path in (self.docs_path, self.log_path):
+            if os.path.exists(path):
+                load_section_index(path)
+
+    @staticmethod
+    def _file_hash(path):
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def watched_files(self):
+        """Every file the daemon reacts to"""
+        yield self.registry_path
+        yield self.collection_path
+        yield self.openapi_path
+        yield from dart_files(self.dart_root)
+
+    def watched_directories(self):
+        """Directories to register with inotify"""
+        directories = {os.path.dirname(path) or '.' for path in
+                       (self.registry_path, self.collection_path, self.openapi_path)}
+        for root, _, _ in os.walk(self.dart_root):
+            directories.add(root)
+        return sorted(directories)
+
+    def handle_changes(self, paths):
+        """Dispatch a batch of changed paths; returns a list of human-readable actions"""
+        actions = []
+        paths = {os.path.normpath(path) for path in paths}
+        if self.registry_path in paths:
+            actions.extend(self.on_registry_change())
+        elif self.collection_path in paths:
+            actions.extend(self.on_collection_change())
+        if self.openapi_path in paths:
+            actions.extend(self.on_openapi_change())
+        dart_changed = sorted(path for path in paths
+                              if path.endswith('.dart') and path.startswith(self.dart_root + os.sep))
+        if dart_changed:
+            actions.extend(self.on_dart_change(dart_changed))
+        return actions
+
+    def on_registry_change(self):
+        """Re-import the registry, rebuild the collection in memory and write it"""
+        module = sys.modules.get(REGISTRY_MODULE)
+        module = importlib.reload(module) if module else importlib.import_module(REGISTRY_MODULE)
+        collection = module.create_postman_collection()
+        # Keep the committed collection stable when only the generation timestamp differs
+        collection['info']['description'] = self.collection.get('info', {}).get(
+            'description', collection['info']['description'])
+        if collection == self.collection:
+            return ['registry changed, collection unchanged']
+        output = json.dumps(collection, indent=2, ensure_ascii=False)
+        with open(self.collection_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+        count('bytes_written', len(output.encode('utf-8')))
+        self.collection_hash = hashlib.sha256(output.encode('utf-8')).hexdigest()
+        return [f'wrote {self.collection_path}'] + self.apply_collection(collection)
+
+    def on_collection_change(self):
+        """Re-parse an externally edited collection"""
+        if not os.path.exists(self.collection_path):
+            return []
+        current_hash = self._file_hash(self.collection_path)
+        if current_hash == self.collection_hash:
+            return []
+        self.collection_hash = current_hash
+        return self.apply_collection(load_json(self.collection_path))
+
+    def on_openapi_change(self):
+        """Refresh the parsed OpenAPI document and report operations that changed"""
+        if not os.path.exists(self.openapi_path):
+            return []
+        openapi = load_json(self.openapi_path)
+        old_paths = self.openapi.get('paths', {})
+        new_paths = openapi.get('paths', {})
+        changed = sorted(path for path in old_paths.keys() | new_paths.keys()
+                         if old_paths.get(path) != new_paths.get(path))
+        self.openapi = openapi
+        # Neither artifact is generated from api_docs.json; keep it warm for consumers
+        return [f'{self.openapi_path}: {len(changed)} paths changed'] if changed else []
+
+    def on_dart_change(self, paths):
+        """Report which endpoints the changed Dart files reference"""
+        if self._path_regexes is None:
+            self._path_regexes = {key: template_regex(entry[2]['path']) for key, entry in self.entries.items()}
+        actions = []
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            except (FileNotFoundError, UnicodeDecodeError):
+                continue
+            referenced = sorted(key for key, regex in self._path_regexes.items() if regex.search(source))
+            if referenced:
+                actions.append(f'{path} references {len(referenced)} endpoints: {", ".join(referenced[:5])}'
+                               + (' ...' if len(referenced) > 5 else ''))
+        return actions
+
+    def apply_collection(self, collection):
+        """Diff a new collection against the in-memory one and patch the affected sections"""
+        entries = collection_entries(collection)
+        old_entries = self.entries
+        self.collection = collection
+        self.entries = entries
+        self._path_regexes = None
+
+        same_layout = list(entries) == list(old_entries) and all(
+            entries[key][0] == old_entries[key][0] and entries[key][1].get('name') == old_entries[key][1].get('name')
+            for key in entries)
+        changed = [key for key in entries if key in old_entries and entries[key][1] != old_entries[key][1]]
+        if same_layout and not changed:
+            return []
+        if not same_layout:
+            return self.regenerate_all(old_entries)
+
+        actions = []
+        docs_updates = {}
+        for key in changed:
+            category, item, _ = entries[key]
+            old_text = read_section(self.docs_path, key)
+            if old_text is None:
+                continue
+            trailing = old_text[len(old_text.rstrip('\n')):]
+            docs_updates[key] = document_endpoint(item, category).strip('\n') + trailing
+        if docs_updates:
+            replace_sections(self.docs_path, docs_updates, kind='docs', finalize=refresh_generated_size)
+            actions.append(f'{self.docs_path}: regenerated {len(docs_updates)} sections')
+
+        log_updates = {}
+        for key in changed:
+            new_text = self._log_section(key, entries[key][2])
+            if new_text is not None:
+                log_updates[key] = new_text
+        if log_updates:
+            replace_sections(self.log_path, log_updates, kind='log')
+            actions.append(f'{self.log_path}: regenerated {len(log_updates)} sections')
+        return actions
+
+    def _log_section(self, key, endpoint):
+        """
+        Render a log section's generated header and keep everything from its
+        **Status:** line on, which is maintained by hand and by the status updaters.
+        """
+        old_text = read_section(self.log_path, key)
+        if old_text is None:
+            return None
+        lines = render_endpoint_section(endpoint)
+        header = '\n'.join(lines[:lines.index('**Status:** 📝 Review Needed')])
+        status_at = old_text.find(STATUS_PREFIX)
+        if status_at == -1:
+            return '\n'.join(lines) + '\n'
+        return header + '\n' + old_text[status_at:]
+
+    def regenerate_all(self, old_entries):
+        """Endpoints were added, removed or moved: rebuild both files, carrying over log statuses"""
+        preserved = {}
+        if os.path.exists(self.log_path):
+            for key in old_entries:
+                if key in self.entries:
+                    text = read_section(self.log_path, key)
+                    if text is not None and STATUS_PREFIX in text:
+                        preserved[key] = text[text.find(STATUS_PREFIX):]
+
+        generate_markdown_documentation(self.collection_path, self.docs_path)
+        generate_verification_log([entry[2] for entry in self.entries.values()], self.log_path)
+        load_section_index(self.docs_path, 'docs')
+        load_section_index(self.log_path, 'log')
+
+        restored = {}
+        for key, tail in preserved.items():
+            lines = render_endpoint_section(self.entries[key][2])
+            header = '\n'.join(lines[:lines.index('**Status:** 📝 Review Needed')])
+            restored[key] = header + '\n' + tail
+        if restored:
+            replace_sections(self.log_path, restored, kind='log')
+        added = len(self.entries.keys() - old_entries.keys())
+        removed = len(old_entries.keys() - self.entries.keys())
+        return [f'endpoints added {added}, removed {removed}: regenerated {self.docs_path} and {self.log_path}',
+                f'{self.log_path}: kept status of {len(restored)} endpoints']
+
+
+def make_watcher(artifacts, force_polling=False, interval=0.2):
+    """Use inotify on Linux, falling back to stat polling elsewhere or on failure"""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(artifacts.watched_directories()), 'inotify'
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(lambda: list(artifacts.watched_files()), interval), 'polling'
+
+
+def watch(artifacts, force_polling=False, interval=0.2):
+    """Run until interrupted, printing each batch of actions with its latency"""
+    watcher, mode = make_watcher(artifacts, force_polling, interval)
+    watched = set(artifacts.watched_files())
+    print(f"Watching {len(watched)} files with {mode} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = watcher.wait()
+            started = time.perf_counter()
+            relevant = {path for path in changed if path in watched or path.endswith('.dart')}
+            if not relevant:
+                continue
+            actions = artifacts.handle_changes(relevant)
+            watched = set(artifacts.watched_files())
+            elapsed = (time.perf_counter() - started) * 1000
+            for action in actions:
+                print(f"  {action}")
+            if actions:
+                print(f"Updated in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Regenerate affected API doc and log sections on change')
+    parser.add_argument('-c', '--collection', default=DEFAULT_COLLECTION)
+    parser.add_argument('--docs', default=DEFAULT_DOCS)
+    parser.add_argument('--log', default=DEFAULT_LOG)
+    parser.add_argument('--poll', action='store_true', help='use stat polling instead of inotify')
+    parser.add_argument('--interval', type=float, default=0.2, help='polling interval in seconds')
+    args = parser.parse_args()
+
+    for path in (args.collection, args.docs, args.log):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            exit(1)
+
+    watch(ArtifactWatcher(args.collection, args.docs, args.log), args.poll, args.interval)
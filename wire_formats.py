@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""
+Wire Format Evaluation for Chat and List Payloads
+Measures, per endpoint and per realtime message type, the size and the
+encode/decode time of three encodings, each with and without gzip:
+  json        the current compact JSON
+  json-short  the same JSON with keys replaced by a shared short-key table
+  binary      a schema-driven encoding: fixed field order, presence bits,
+              varints, enum indexes, no keys on the wire
+Payloads come from JSONL captures ({method, url, status, body} responses or
+{event, data} socket messages), Postman collections with recorded responses,
+or built-in examples shaped like the app's chat and match models.
+
+The binary layout is derived from the api_docs.json response schema where it
+describes the payload (types, enums) and from the sampled payloads where it
+does not (the documented chat and match lists are typed as plain strings);
+the share of fields the OpenAPI schema covers is reported. Every encoding is
+round-tripped against the original before it is timed. Timings are of the
+Python codecs and are meant for comparing formats, not for predicting Dart.
+"""
+
+import gzip
+import json
+import random
+import struct
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from pipeline_metrics import count, stage
+
+DEFAULT_OPENAPI = 'api_docs.json'
+DEFAULT_EXAMPLES = 50
+GZIP_LEVEL = 6
+TIMING_BUDGET_S = 0.05
+MAX_ENUM_VALUES = 16
+SHORT_KEY_ALPHABET = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+KEY_ESCAPE = '~'
+FORMATS = ('json', 'json-short', 'binary')
+
+TAG_NULL, TAG_FALSE, TAG_TRUE, TAG_INT, TAG_FLOAT, TAG_STRING, TAG_LIST, TAG_MAP = range(8)
+FLOAT = struct.Struct('<d')
+
+
+# Varints and the self-describing fallback encoding
+
+def write_varint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def write_zigzag(out, n):
+    write_varint(out, n * 2 if n >= 0 else -n * 2 - 1)
+
+
+def read_zigzag(data, pos):
+    n, pos = read_varint(data, pos)
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+
+
+def write_string(out, text):
+    raw = text.encode('utf-8')
+    write_varint(out, len(raw))
+    out += raw
+
+
+def read_string(data, pos):
+    n, pos = read_varint(data, pos)
+    return data[pos:pos + n].decode('utf-8'), pos + n
+
+
+def encode_dynamic(value, out):
+    """Tagged encoding for values the schema does not describe"""
+    if value is None:
+        out.append(TAG_NULL)
+    elif value is True or value is False:
+        out.append(TAG_TRUE if value else TAG_FALSE)
+    elif type(value) is int:
+        out.append(TAG_INT)
+        write_zigzag(out, value)
+    elif type(value) is float:
+        out.append(TAG_FLOAT)
+        out += FLOAT.pack(value)
+    elif type(value) is str:
+        out.append(TAG_STRING)
+        write_string(out, value)
+    elif type(value) is list:
+        out.append(TAG_LIST)
+        write_varint(out, len(value))
+        for item in value:
+            encode_dynamic(item, out)
+    elif type(value) is dict:
+        out.append(TAG_MAP)
+        write_varint(out, len(value))
+        for key, item in value.items():
+            write_string(out, key)
+            encode_dynamic(item, out)
+    else:
+        raise ValueError(f'cannot encode {type(value).__name__}')
+
+
+def decode_dynamic(data, pos):
+    tag = data[pos]
+    pos += 1
+    if tag == TAG_NULL:
+        return None, pos
+    if tag in (TAG_FALSE, TAG_TRUE):
+        return tag == TAG_TRUE, pos
+    if tag == TAG_INT:
+        return read_zigzag(data, pos)
+    if tag == TAG_FLOAT:
+        return FLOAT.unpack_from(data, pos)[0], pos + 8
+    if tag == TAG_STRING:
+        return read_string(data, pos)
+    if tag == TAG_LIST:
+        n, pos = read_varint(data, pos)
+        items = []
+        for _ in range(n):
+            item, pos = decode_dynamic(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == TAG_MAP:
+        n, pos = read_varint(data, pos)
+        result = {}
+        for _ in range(n):
+            key, pos = read_string(data, pos)
+            result[key], pos = decode_dynamic(data, pos)
+        return result, pos
+    raise ValueError(f'unknown tag {tag}')
+
+
+# Wire schemas: sampled structure, checked against and enriched by OpenAPI
+
+def value_kind(value):
+    if value is True or value is False:
+        return 'boolean'
+    return {int: 'integer', float: 'number', str: 'string', list: 'array', dict: 'object'}.get(type(value), 'dynamic')
+
+
+def infer_schema(values):
+    """
+    Wire schema covering every sampled value (None is always allowed). Fields
+    mixing integers and floats stay dynamic, whose tags keep 1 and 1.0 apart.
+    """
+    present = [value for value in values if value is not None]
+    kinds = {value_kind(value) for value in present}
+    if len(kinds) != 1 or 'dynamic' in kinds:
+        return {'type': 'dynamic'}
+    kind = kinds.pop()
+    if kind == 'object':
+        keys = list(dict.fromkeys(key for value in present for key in value))
+        return {
+            'type': 'object',
+            'properties': {key: infer_schema([value[key] for value in present if key in value]) for key in keys},
+            'always': [key for key in keys if all(value.get(key) is not None for value in present)],
+        }
+    if kind == 'array':
+        return {'type': 'array', 'items': infer_schema([item for value in present for item in value])}
+    if kind == 'string':
+        distinct = list(dict.fromkeys(present))
+        if len(distinct) <= MAX_ENUM_VALUES and len(present) >= 4 * len(distinct):
+            return {'type': 'string', 'enum': distinct, 'enum_source': 'samples'}
+    return {'type': kind}
+
+
+def declared_type(schema):
+    if not isinstance(schema, dict):
+        return None
+    kind = schema.get('type')
+    if isinstance(kind, list):
+        kinds = [item for item in kind if item != 'null']
+        kind = kinds[0] if len(kinds) == 1 else None
+    if kind is None and 'properties' in schema:
+        kind = 'object'
+    return kind
+
+
+def apply_openapi(wire, declared, coverage):
+    """
+    Count the fields the OpenAPI schema describes with a matching type and
+    adopt its enums (sampled values outside them are appended).
+    """
+    coverage['fields'] += 1
+    kind = declared_type(declared)
+    matches = kind == wire['type'] or (kind == 'number' and wire['type'] == 'integer')
+    if matches:
+        coverage['described'] += 1
+    if not matches:
+        declared = None
+    if wire['type'] == 'object':
+        properties = (declared or {}).get('properties') or {}
+        for key, sub in wire['properties'].items():
+            apply_openapi(sub, properties.get(key), coverage)
+    elif wire['type'] == 'array':
+        apply_openapi(wire['items'], (declared or {}).get('items'), coverage)
+    elif wire['type'] == 'string' and declared and declared.get('enum'):
+        members = [value for value in declared['enum'] if isinstance(value, str)]
+        wire['enum'] = members + [value for value in wire.get('enum') or () if value not in members]
+        wire['enum_source'] = 'openapi'
+    return wire
+
+
+def compile_codec(schema):
+    """(encode(value, out), decode(data, pos) -> (value, pos)) for a wire schema"""
+    kind = schema['type']
+    if kind == 'object':
+        return _object_codec(schema)
+    if kind == 'array':
+        encode_item, decode_item = compile_codec(schema['items'])
+
+        def encode(value, out):
+            write_varint(out, len(value))
+            for item in value:
+                encode_item(item, out)
+
+        def decode(data, pos):
+            n, pos = read_varint(data, pos)
+            items = []
+            for _ in range(n):
+                item, pos = decode_item(data, pos)
+                items.append(item)
+            return items, pos
+        return encode, decode
+    if kind == 'string' and schema.get('enum'):
+        index = {value: i + 1 for i, value in enumerate(schema['enum'])}
+        members = [None] + list(schema['enum'])
+
+        def encode(value, out):
+            # 0 escapes a value outside the enum, written as a plain string
+            position = index.get(value) if type(value) is str else None
+            if position is None:
+                if type(value) is not str:
+                    raise ValueError(f'expected string, got {type(value).__name__}')
+                out.append(0)
+                write_string(out, value)
+            else:
+                write_varint(out, position)
+
+        def decode(data, pos):
+            position, pos = read_varint(data, pos)
+            return read_string(data, pos) if position == 0 else (members[position], pos)
+        return encode, decode
+    if kind == 'string':
+        def encode(value, out):
+            if type(value) is not str:
+                raise ValueError(f'expected string, got {type(value).__name__}')
+            write_string(out, value)
+        return encode, read_string
+    if kind == 'integer':
+        def encode(value, out):
+            if type(value) is not int:
+                raise ValueError(f'expected integer, got {type(value).__name__}')
+            write_zigzag(out, value)
+        return encode, read_zigzag
+    if kind == 'number':
+        def encode(value, out):
+            # Integers would come back as floats; they are only valid in integer or dynamic fields
+            if type(value) is not float:
+                raise ValueError(f'expected float, got {type(value).__name__}')
+            out += FLOAT.pack(value)
+
+        def decode(data, pos):
+            return FLOAT.unpack_from(data, pos)[0], pos + 8
+        return encode, decode
+    if kind == 'boolean':
+        def encode(value, out):
+            if value is not True and value is not False:
+                raise ValueError(f'expected boolean, got {type(value).__name__}')
+            out.append(1 if value else 0)
+
+        def decode(data, pos):
+            return data[pos] == 1, pos + 1
+        return encode, decode
+    return encode_dynamic, decode_dynamic
+
+
+def _object_codec(schema):
+    """
+    Fields always present and non-null in the samples are written bare; the
+    others get two bits (absent, null, value) in a header. Keys outside the
+    schema follow as a dynamic map.
+    """
+    properties = schema['properties']
+    always = [key for key in properties if key in schema['always']]
+    optional = [key for key in properties if key not in schema['always']]
+    codecs = {key: compile_codec(sub) for key, sub in properties.items()}
+    header_bytes = (len(optional) * 2 + 7) // 8
+    known = set(properties)
+
+    def encode(value, out):
+        if type(value) is not dict:
+            raise ValueError(f'expected object, got {type(value).__name__}')
+        bits = 0
+        for i, key in enumerate(optional):
+            if key in value:
+                bits |= (1 if value[key] is None else 2) << (2 * i)
+        out += bits.to_bytes(header_bytes, 'little')
+        for key in always:
+            if value.get(key) is None:
+                raise ValueError(f'missing {key}')
+            codecs[key][0](value[key], out)
+        for key in optional:
+            if value.get(key) is not None:
+                codecs[key][0](value[key], out)
+        extra = [key for key in value if key not in known]
+        write_varint(out, len(extra))
+        for key in extra:
+            write_string(out, key)
+            encode_dynamic(value[key], out)
+
+    def decode(data, pos):
+        bits = int.from_bytes(data[pos:pos + header_bytes], 'little')
+        pos += header_bytes
+        result = {}
+        for key in always:
+            result[key], pos = codecs[key][1](data, pos)
+        for i, key in enumerate(optional):
+            state = (bits >> (2 * i)) & 3
+            if state == 1:
+                result[key] = None
+            elif state == 2:
+                result[key], pos = codecs[key][1](data, pos)
+        n, pos = read_varint(data, pos)
+        for _ in range(n):
+            key, pos = read_string(data, pos)
+            result[key], pos = decode_dynamic(data, pos)
+        return result, pos
+
+    return encode, decode
+
+
+# Short keys
+
+def short_key_table(values):
+    """{key: short key}, most frequent keys first so they get the shortest codes"""
+    keys = Counter()
+
+    def walk(value):
+        if type(value) is dict:
+            for key, item in value.items():
+                keys[key] += 1
+                walk(item)
+        elif type(value) is list:
+            for item in value:
+                walk(item)
+
+    for value in values:
+        walk(value)
+    table = {}
+    base = len(SHORT_KEY_ALPHABET)
+    for i, (key, _) in enumerate(keys.most_common()):
+        code, n = '', i
+        while True:
+            code = SHORT_KEY_ALPHABET[n % base] + code
+            n = n // base - 1
+            if n < 0:
+                break
+        table[key] = code if len(code) < len(key) else key
+    return table
+
+
+def rename_keys(value, table, reverse):
+    """Apply a key table; keys that would collide with a code are escaped with KEY_ESCAPE"""
+    if type(value) is dict:
+        renamed = {}
+        for key, item in value.items():
+            if key in table:
+                new = table[key]
+            elif key in reverse or key.startswith(KEY_ESCAPE):
+                new = KEY_ESCAPE + key
+            else:
+                new = key
+            renamed[new] = rename_keys(item, table, reverse)
+        return renamed
+    if type(value) is list:
+        return [rename_keys(item, table, reverse) for item in value]
+    return value
+
+
+def restore_keys(value, reverse):
+    if type(value) is dict:
+        restored = {}
+        for key, item in value.items():
+            if key.startswith(KEY_ESCAPE):
+                key = key[len(KEY_ESCAPE):]
+            else:
+                key = reverse.get(key, key)
+            restored[key] = restore_keys(item, reverse)
+        return restored
+    if type(value) is list:
+        return [restore_keys(item, reverse) for item in value]
+    return value
+
+
+# Codecs per group of payloads
+
+def compact(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def canonical(value):
+    """Compact JSON with sorted keys: tells 1 from 1.0, ignores key order"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, sort_keys=True)
+
+
+def build_codecs(values, declared_schema):
+    """{format: (encode(value) -> bytes, decode(bytes) -> value)} and the OpenAPI coverage of the samples"""
+    table = {key: code for key, code in short_key_table(values).items() if code != key}
+    reverse = {code: key for key, code in table.items()}
+    wire = infer_schema(values)
+    coverage = {'fields': 0, 'described': 0}
+    apply_openapi(wire, declared_schema, coverage)
+    encode_binary, decode_binary = compile_codec(wire)
+
+    def binary_encode(value):
+        out = bytearray()
+        encode_binary(value, out)
+        return bytes(out)
+
+    codecs = {
+        'json': (compact, json.loads),
+        'json-short': (lambda value: compact(rename_keys(value, table, reverse)),
+                       lambda data: restore_keys(json.loads(data), reverse)),
+        'binary': (binary_encode, lambda data: decode_binary(data, 0)[0]),
+    }
+    return codecs, {'short_keys': len(table), 'openapi_fields': coverage['described'], 'fields': coverage['fields']}
+
+
+def time_per_item(function, items):
+    """Seconds per item, repeating the batch until the timing budget is spent"""
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    elapsed = time.perf_counter() - started
+    repeat = max(1, min(1000, int(TIMING_BUDGET_S / elapsed))) if elapsed > 0 else 1000
+    if repeat > 1:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for item in items:
+                function(item)
+        elapsed = (time.perf_counter() - started) / repeat
+    return elapsed / len(items)
+
+
+def evaluate_group(values, declared_schema):
+    """Per-format size (raw and gzip) and encode/decode time for one endpoint or message type"""
+    codecs, schema_info = build_codecs(values, declared_schema)
+    results = {}
+    for name, (encode, decode) in codecs.items():
+        try:
+            encoded = [encode(value) for value in values]
+        except ValueError as e:
+            results[name] = {'error': str(e)}
+            continue
+        mismatches = sum(1 for value, data in zip(values, encoded) if canonical(decode(data)) != canonical(value))
+        compressed = [gzip.compress(data, GZIP_LEVEL) for data in encoded]
+        raw = sum(len(data) for data in encoded)
+        results[name] = {
+            'bytes': round(raw / len(values), 1),
+            'gzip_bytes': round(sum(len(data) for data in compressed) / len(values), 1),
+            'encode_us': round(time_per_item(encode, values) * 1e6, 2),
+            'decode_us': round(time_per_item(decode, encoded) * 1e6, 2),
+            'gzip_us': round(time_per_item(lambda data: gzip.compress(data, GZIP_LEVEL), encoded) * 1e6, 2),
+            'gunzip_us': round(time_per_item(gzip.decompress, compressed) * 1e6, 2),
+            'round_trip_failures': mismatches,
+        }
+        count('bytes_encoded', raw)
+    baseline = results.get('json', {}).get('bytes')
+    for result in results.values():
+        if baseline and 'bytes' in result:
+            result['size_vs_json'] = round(result['bytes'] / baseline, 3)
+            result['gzip_size_vs_json'] = round(result['gzip_bytes'] / baseline, 3)
+    return {'documents': len(values), **schema_info, 'formats': results}
+
+
+# Payload sources
+
+WORDS = ('hey', 'how', 'are', 'you', 'doing', 'today', 'coffee', 'this', 'weekend', 'sounds', 'great', 'love', 'that',
+         'movie', 'concert', 'haha', 'really', 'want', 'to', 'meet', 'soon', 'what', 'about', 'dinner', 'music', 'yes',
+         'maybe', 'later', 'send', 'me', 'your', 'playlist', 'pride', 'parade', 'hike', 'sunday', 'morning', 'night')
+NAMES = ('Alex', 'Sam', 'Jordan', 'Taylor', 'Riley', 'Casey', 'Morgan', 'Jamie', 'Avery', 'Quinn', 'Rowan', 'Skyler')
+CITIES = ('Berlin', 'Toronto', 'Amsterdam', 'San Francisco', 'Madrid', 'Sydney', 'London', 'Montreal', 'Tehran')
+MESSAGE_TYPES = ('text', 'text', 'text', 'text', 'text', 'image', 'video', 'audio', 'file')
+
+
+def _sentence(rng, low=2, high=18):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize()
+
+
+def _timestamp(rng, start):
+    return (start + timedelta(seconds=rng.randint(0, 30 * 86400))).strftime('%Y-%m-%dT%H:%M:%S.000000Z')
+
+
+def _message_data(rng, start, message_id, sender, receiver):
+    return {'message_id': message_id, 'sender_id': sender, 'receiver_id': receiver, 'message': _sentence(rng),
+            'message_type': rng.choice(MESSAGE_TYPES), 'sent_at': _timestamp(rng, start), 'is_read': rng.random() < 0.8}
+
+
+def example_payloads(count_per_kind=DEFAULT_EXAMPLES, seed=7):
+    """
+    Deterministic example documents shaped like the app's models
+    (lib/models/api_models/chat_models.dart and matching_models.dart) and the
+    realtime events of realtime_standin.py, keyed by endpoint or 'socket <event>'.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    groups = {'GET /chat/history': [], 'POST /chat/send': [], 'GET /matching/matches': [],
+              'socket new-message': [], 'socket user-typing': [], 'socket message-read': []}
+    for i in range(count_per_kind):
+        me, other = rng.randint(1, 10 ** 6), rng.randint(1, 10 ** 6)
+        per_page = 50
+        messages = [_message_data(rng, start, rng.randint(1, 10 ** 8), *rng.sample((me, other), 2))
+                    for _ in range(per_page)]
+        total = rng.randint(per_page, 2000)
+        groups['GET /chat/history'].append({'status': True, 'data': {'messages': messages, 'pagination': {
+            'current_page': 1, 'total_pages': -(-total // per_page), 'total_messages': total, 'per_page': per_page}}})
+        groups['POST /chat/send'].append({'status': True, 'message': 'Message sent successfully',
+                                          'data': _message_data(rng, start, rng.randint(1, 10 ** 8), me, other)})
+        matches = []
+        for _ in range(20):
+            user_id = rng.randint(1, 10 ** 6)
+            last = None
+            if rng.random() < 0.7:
+                last = {'id': rng.randint(1, 10 ** 8), 'message': _sentence(rng), 'sent_at': _timestamp(rng, start),
+                        'is_read': rng.random() < 0.6}
+            matches.append({'match_id': rng.randint(1, 10 ** 7), 'user': {
+                'id': user_id, 'name': rng.choice(NAMES), 'age': rng.randint(18, 60),
+                'avatar_url': f'https://lg.abolfazlnajafi.com/storage/images/{user_id}/avatar.jpg'
+                if rng.random() < 0.9 else None,
+                'profile_bio': _sentence(rng, 4, 30), 'city': rng.choice(CITIES)},
+                'matched_at': _timestamp(rng, start), 'last_message': last})
+        groups['GET /matching/matches'].append({'status': True, 'data': matches})
+
+        chat_id = f'chat-{rng.randint(1, 10 ** 6)}'
+        sent = _timestamp(rng, start)
+        groups['socket new-message'].append({'chatId': chat_id, 'message': _sentence(rng), 'messageType': 'text',
+                                             'metadata': None, 'timestamp': sent, 'senderId': str(me),
+                                             'serverTimestamp': sent, 'id': f'm{rng.randint(1, 10 ** 8)}'})
+        groups['socket user-typing'].append({'chatId': chat_id, 'isTyping': True, 'timestamp': sent,
+                                             'senderId': str(me), 'serverTimestamp': sent})
+        groups['socket message-read'].append({'messageId': f'm{rng.randint(1, 10 ** 8)}', 'chatId': chat_id,
+                                              'timestamp': sent, 'senderId': str(other), 'serverTimestamp': sent})
+    return groups
+
+
+def load_payloads(paths, registry):
+    """Group recorded payloads by endpoint (2xx responses) or socket event; returns (groups, skipped)"""
+    from contract_validator import iter_collection_records
+
+    groups, skipped = {}, Counter()
+
+    def add(record):
+        if 'event' in record:
+            groups.setdefault(f"socket {record['event']}", []).append(record.get('data'))
+            return
+        status = record.get('status', 200)
+        if not 200 <= int(status) < 300:
+            skipped['non-2xx'] += 1
+            return
+        key = registry.match(record.get('method', 'GET'), record.get('url') or record.get('path', ''))
+        if key is None:
+            skipped['unmatched'] += 1
+            return
+        if 'raw_body' in record:
+            try:
+                body = json.loads(record['raw_body'])
+            except (TypeError, ValueError):
+                skipped['not JSON'] += 1
+                return
+        else:
+            body = record.get('body')
+        groups.setdefault(key, []).append(body)
+
+    for path in paths:
+        if path.endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                for record in iter_collection_records(json.load(f)):
+                    add(record)
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        add(json.loads(line))
+                    except ValueError:
+                        skipped['unparseable'] += 1
+    return groups, dict(skipped)
+
+
+def evaluate(groups, schemas):
+    """{group: evaluation} for every group of payloads, plus byte-weighted totals per format"""
+    report = {}
+    for key in sorted(groups):
+        values = groups[key]
+        declared = (schemas.get(key) or {}).get('200')
+        with stage('evaluate'):
+            report[key] = evaluate_group(values, declared)
+    totals = {}
+    for name in FORMATS:
+        rows = [(entry['documents'], entry['formats'][name]) for entry in report.values()
+                if 'bytes' in entry['formats'].get(name, {})]
+        totals[name] = {
+            'bytes': round(sum(n * row['bytes'] for n, row in rows)),
+            'gzip_bytes': round(sum(n * row['gzip_bytes'] for n, row in rows)),
+        }
+    return {'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'groups': report, 'totals': totals}
+
+
+def print_report(report):
+    header = f"  {'format':11} {'bytes':>9} {'vs json':>8} {'gzip':>9} {'vs json':>8} {'enc us':>8} {'dec us':>8} " \
+             f"{'gzip us':>8} {'gunzip us':>9}"
+    for key, entry in report['groups'].items():
+        share = f"{entry['openapi_fields']}/{entry['fields']}"
+        print(f"\n{key}  ({entry['documents']} documents, {entry['short_keys']} short keys, "
+              f"OpenAPI describes {share} wire fields)")
+        print(header)
+        for name, row in entry['formats'].items():
+            if 'error' in row:
+                print(f"  {name:11} failed: {row['error']}")
+                continue
+            flag = '  ROUND-TRIP FAILURES' if row['round_trip_failures'] else ''
+            print(f"  {name:11} {row['bytes']:>9,.0f} {row['size_vs_json']:>8.2f} {row['gzip_bytes']:>9,.0f} "
+                  f"{row['gzip_size_vs_json']:>8.2f} {row['encode_us']:>8.1f} {row['decode_us']:>8.1f} "
+                  f"{row['gzip_us']:>8.1f} {row['gunzip_us']:>9.1f}{flag}")
+    totals = report['totals']
+    baseline = totals['json']['bytes'] or 1
+    print("\nAll payloads:")
+    for name, total in totals.items():
+        print(f"  {name:11} {total['bytes']:>12,} bytes ({total['bytes'] / baseline:.2f})  "
+              f"gzip {total['gzip_bytes']:>12,} ({total['gzip_bytes'] / baseline:.2f})")
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+
+    from pipeline_metrics import add_metrics_arguments, metrics_session
+
+    parser = argparse.ArgumentParser(description='Compare JSON, short-key JSON and schema-driven binary payloads')
+    parser.add_argument('inputs', nargs='*', help='JSONL captures ({method, url, status, body} or {event, data} '
+                                                  'per line) or Postman collections; default: built-in examples')
+    parser.add_argument('--openapi', default=DEFAULT_OPENAPI)
+    parser.add_argument('--examples', type=int, default=DEFAULT_EXAMPLES,
+                        help='documents per built-in example type')
+    parser.add_argument('--endpoint', action='append', help='only evaluate these endpoints or socket events')
+    parser.add_argument('-o', '--output', help='write the evaluation as JSON')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    for path in [args.openapi] + args.inputs:
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    import collection_cache
+    from contract_validator import SCHEMAS_CACHE_VERSION, ContractRegistry, extract_response_schemas
+
+    with metrics_session(args.metrics, args.profile):
+        schemas = collection_cache.load_derived(args.openapi, 'response_schemas', extract_response_schemas,
+                                                SCHEMAS_CACHE_VERSION)
+        skipped = {}
+        if args.inputs:
+            with stage('load'):
+                groups, skipped = load_payloads(args.inputs, ContractRegistry.from_openapi(args.openapi))
+        else:
+            groups = example_payloads(args.examples)
+        if args.endpoint:
+            groups = {key: values for key, values in groups.items() if key in args.endpoint}
+        groups = {key: values for key, values in groups.items() if values}
+        if not groups:
+            print("Error: no payloads to evaluate")
+            sys.exit(1)
+        report = evaluate(groups, schemas)
+    report['skipped_records'] = skipped
+    print_report(report)
+    if skipped:
+        print(f"Skipped records: {skipped}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Output file: {args.output}")